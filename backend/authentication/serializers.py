@@ -2,11 +2,10 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.conf import settings
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
-from django.template.loader import render_to_string
+from notifications.outbox import queue_email
 from users.models import Profile
 
 User = get_user_model()
@@ -47,20 +46,15 @@ class PasswordResetSerializer(serializers.Serializer):
         reset_url = f"{settings.FRONTEND_URL}/reset-password/{uid}/{token}"
         
         # Send email
-        subject = "Reset your HOY password"
-        message = render_to_string('authentication/password_reset_email.html', {
-            'user': user,
-            'reset_url': reset_url,
-            'site_name': 'HOY'
-        })
-        
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
+        queue_email(
+            "Reset your HOY password",
             [email],
-            html_message=message,
-            fail_silently=False,
+            html_template='authentication/password_reset_email.html',
+            context={
+                'user': user,
+                'reset_url': reset_url,
+                'site_name': 'HOY'
+            }
         )
         return True
 
@@ -1,9 +1,8 @@
 from django.conf import settings
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
 from django.utils.crypto import get_random_string
 from django.utils import timezone
 from datetime import timedelta
+from notifications.outbox import queue_email
 from .models import User, VerificationToken, PasswordResetToken
 
 def generate_token():
@@ -23,15 +22,12 @@ def send_verification_email(user):
         'verification_url': verification_url
     }
     
-    html_message = render_to_string('emails/verify_email.html', context)
-    plain_message = render_to_string('emails/verify_email.txt', context)
-    
-    send_mail(
+    queue_email(
         'Verify your email address',
-        plain_message,
-        settings.DEFAULT_FROM_EMAIL,
         [user.email],
-        html_message=html_message
+        html_template='emails/verify_email.html',
+        text_template='emails/verify_email.txt',
+        context=context
     )
     
     return token
@@ -68,15 +64,12 @@ def send_password_reset_email(user):
         'reset_url': reset_url
     }
     
-    html_message = render_to_string('emails/reset_password.html', context)
-    plain_message = render_to_string('emails/reset_password.txt', context)
-    
-    send_mail(
+    queue_email(
         'Reset your password',
-        plain_message,
-        settings.DEFAULT_FROM_EMAIL,
         [user.email],
-        html_message=html_message
+        html_template='emails/password_reset_email.html',
+        text_template='emails/password_reset_email.txt',
+        context=context
     )
     
     return token
@@ -1,9 +1,10 @@
 from django.core import mail
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.conf import settings
 from authentication.services import send_verification_email, send_password_reset_email
 from authentication.models import User
 
+@override_settings(EMAIL_DELIVERY='sync')
 class EmailTest(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(
@@ -20,8 +21,10 @@ class EmailTest(TestCase):
         self.assertEqual(mail.outbox[0].to, [self.user.email])
 
     def test_password_reset_email(self):
-        send_password_reset_email(self.user)
+        token = send_password_reset_email(self.user)
         self.assertEqual(len(mail.outbox), 1)
         self.assertEqual(mail.outbox[0].subject, 'Reset your password')
         self.assertEqual(mail.outbox[0].from_email, settings.DEFAULT_FROM_EMAIL)
         self.assertEqual(mail.outbox[0].to, [self.user.email])
+        self.assertIn(token.token, mail.outbox[0].body)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
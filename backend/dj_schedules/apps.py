@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class DjSchedulesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dj_schedules'
+
+    def ready(self):
+        import dj_schedules.signals  # noqa
@@ -0,0 +1,261 @@
+"""WebSocket fan-out of DJ schedule changes.
+
+Clients subscribe to the events (and optionally the DJs) they display,
+see ``DJScheduleConsumer``, and changes are sent only to the groups of
+their event and DJ, rather than to every socket connected for any event.
+
+Changes aren't pushed one by one. ``schedule_changed`` marks an event's
+lineup as dirty once the change commits, and the first change within
+``DJ_SCHEDULE_BROADCAST_WINDOW`` seconds schedules a flush for the end of
+the window, so a burst of edits to a lineup goes out as one message
+(when the cache or the Celery broker can't be reached, the flush runs
+right away instead, as it would with a window of 0). The
+flush serializes the lineup, compares it with the last one sent (kept in
+the cache) and broadcasts a ``lineup_delta``: new rows in full, only the
+changed fields of the others, and the removed ids, under the event's next
+version number. A client whose version isn't the delta's
+``previous_version`` missed something, and asks for a ``snapshot``, as it
+does after reconnecting.
+
+DJ groups get the same messages cut down to the DJ's rows, and only when
+those rows change, so the event's versions have gaps for them: their
+messages carry ``version`` for ordering but no ``previous_version``. A
+DJ subscriber resyncs with a ``dj_snapshot`` of the DJ's slots at every
+event.
+"""
+
+import json
+import logging
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from kombu.exceptions import OperationalError
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+# Lineups and their version counters of events nobody touches expire
+LINEUP_TIMEOUT = 24 * 60 * 60
+LOCK_TIMEOUT = 30
+
+
+def event_group(event_id):
+    return f'dj_schedules.event.{event_id}'
+
+
+def dj_group(dj_id):
+    return f'dj_schedules.dj.{dj_id}'
+
+
+def _window():
+    return getattr(settings, 'DJ_SCHEDULE_BROADCAST_WINDOW', 0.5)
+
+
+def _key(event_id, suffix):
+    return f'dj_schedules:lineup:{event_id}:{suffix}'
+
+
+def _plain(data):
+    # Channel layers serialize with msgpack, which knows nothing of UUIDs
+    return json.loads(JSONRenderer().render(data))
+
+
+def _send(group, message):
+    async_to_sync(get_channel_layer().group_send)(group, message)
+
+
+def current_version(event_id):
+    # Seeded from the clock so an expired or evicted counter never goes backwards
+    return cache.get_or_set(
+        _key(event_id, 'version'), lambda: int(time.time() * 1000), LINEUP_TIMEOUT
+    )
+
+
+def _next_version(event_id):
+    try:
+        version = cache.incr(_key(event_id, 'version'))
+    except ValueError:
+        version = None
+    if version is None:
+        # Evicted, or the cache is unreachable and the incr was ignored
+        version = int(time.time() * 1000)
+        cache.set(_key(event_id, 'version'), version, LINEUP_TIMEOUT)
+    return version
+
+
+def _claim(key, timeout):
+    """``cache.add`` telling a key someone holds from an unreachable cache.
+
+    ``IGNORE_EXCEPTIONS`` turns a Redis outage into a failed add, so a
+    failed add is checked: ``True`` when claimed, ``False`` when the key is
+    held, ``None`` when the cache can't be reached.
+    """
+    if cache.add(key, 1, timeout=timeout):
+        return True
+    return False if cache.get(key) is not None else None
+
+
+def build_lineup(event_id):
+    """Serialized schedules of an event, keyed by schedule id."""
+    from .models import DJSchedule
+    from .serializers import DJScheduleSerializer
+
+    schedules = DJSchedule.objects.filter(event_id=event_id).select_related('dj', 'event')
+    rows = _plain(DJScheduleSerializer(schedules, many=True).data)
+    return {str(row['id']): row for row in rows}
+
+
+def build_dj_schedules(dj_id):
+    """Serialized schedules of a DJ, across events."""
+    from .models import DJSchedule
+    from .serializers import DJScheduleSerializer
+
+    schedules = DJSchedule.objects.filter(dj_id=dj_id).select_related('dj', 'event')
+    return _plain(DJScheduleSerializer(schedules, many=True).data)
+
+
+def _lineup(event_id, version, schedules):
+    return {
+        'version': version,
+        'schedules': schedules,
+        'snapshot': json.dumps({
+            'type': 'lineup_snapshot',
+            'event': str(event_id),
+            'version': version,
+            'schedules': list(schedules.values()),
+        }),
+    }
+
+
+def get_lineup(event_id):
+    """An event's lineup, from the cache, or ``None`` if there is no such event.
+
+    ``{'version': ..., 'schedules': {id: row}, 'snapshot': json}``, where
+    ``snapshot`` is the rendered ``lineup_snapshot`` message.
+    """
+    from events.models import Event
+
+    lineup = cache.get(_key(event_id, 'state'))
+    if lineup is None:
+        schedules = build_lineup(event_id)
+        if not schedules and not Event.objects.filter(pk=event_id).exists():
+            # Nothing is cached for ids sockets make up
+            return None
+        lineup = _lineup(event_id, current_version(event_id), schedules)
+        if not cache.get(_key(event_id, 'pending')):
+            # With a flush on its way the rows may be ahead of the version
+            cache.set(_key(event_id, 'state'), lineup, LINEUP_TIMEOUT)
+    return lineup
+
+
+def lineup_delta(previous, current):
+    """``(changed, removed)`` between two ``build_lineup`` results."""
+    changed = []
+    for schedule_id, row in current.items():
+        old = previous.get(schedule_id)
+        if old is None:
+            changed.append(row)
+            continue
+        fields = {name: value for name, value in row.items() if old.get(name) != value}
+        if fields:
+            changed.append({'id': row['id'], **fields})
+    removed = [previous[schedule_id]['id'] for schedule_id in previous if schedule_id not in current]
+    return changed, removed
+
+
+def schedule_changed(*event_ids):
+    """Broadcast the lineups of ``event_ids`` once the current transaction commits."""
+    for event_id in {str(event_id) for event_id in event_ids if event_id}:
+        transaction.on_commit(lambda event_id=event_id: _kick(event_id))
+
+
+def _kick(event_id):
+    window = _window()
+    if window <= 0:
+        flush_lineup(event_id)
+        return
+    pending = _claim(_key(event_id, 'pending'), window + LOCK_TIMEOUT)
+    if pending is None or (pending and not _schedule_flush(event_id, window)):
+        # Without the cache or the broker nothing is coalesced; send now
+        flush_lineup(event_id)
+
+
+def _schedule_flush(event_id, countdown):
+    """Queue a flush in ``countdown`` seconds; ``False`` if the broker is down."""
+    from .tasks import flush_lineup_updates
+
+    try:
+        flush_lineup_updates.apply_async((event_id,), countdown=countdown)
+    except OperationalError:
+        logger.warning('Could not queue a lineup flush for event %s', event_id, exc_info=True)
+        return False
+    return True
+
+
+def flush_lineup(event_id):
+    """Send what changed in an event's lineup since the last broadcast."""
+    locked = _claim(_key(event_id, 'lock'), LOCK_TIMEOUT)
+    if locked is False:
+        # Another flush is running; go again once it has finished
+        cache.set(_key(event_id, 'pending'), 1, timeout=LOCK_TIMEOUT)
+        if _schedule_flush(event_id, max(_window(), 1)):
+            return
+        # Nothing would retry without the broker, and the mark would hold
+        # back later changes; send now without the lock
+        cache.delete(_key(event_id, 'pending'))
+    # With the cache unreachable (locked is None) there is nothing to lock
+    # or compare with, and the whole lineup goes out
+    try:
+        # Changes committed from now on schedule another flush
+        cache.delete(_key(event_id, 'pending'))
+        previous = cache.get(_key(event_id, 'state'))
+        schedules = build_lineup(event_id)
+        if previous is not None:
+            changed, removed = lineup_delta(previous['schedules'], schedules)
+            if not changed and not removed:
+                return
+        version = _next_version(event_id)
+        cache.set(_key(event_id, 'state'), _lineup(event_id, version, schedules), LINEUP_TIMEOUT)
+    finally:
+        if locked:
+            cache.delete(_key(event_id, 'lock'))
+
+    if previous is None:
+        # Nothing to compare with: subscribers replace the whole lineup
+        message = {'type': 'lineup_snapshot', 'event': event_id, 'version': version}
+        _send(event_group(event_id), {**message, 'schedules': list(schedules.values())})
+        by_dj = {}
+        for row in schedules.values():
+            by_dj.setdefault(row['dj'], []).append(row)
+        for dj_id, rows in by_dj.items():
+            _send(dj_group(dj_id), {**message, 'schedules': rows})
+        return
+
+    message = {
+        'type': 'lineup_delta',
+        'event': event_id,
+        'version': version,
+        'previous_version': previous['version'],
+    }
+    _send(event_group(event_id), {**message, 'changed': changed, 'removed': removed})
+
+    # DJ subscribers get the rows of their DJ. They don't see every version
+    # of the event, so a gap means nothing to them
+    del message['previous_version']
+    by_dj = {}
+    for row in changed:
+        current = schedules[str(row['id'])]
+        old = previous['schedules'].get(str(row['id']))
+        if old is not None and old['dj'] != current['dj']:
+            # Handed over: gone for the old DJ, new in full for the new one
+            by_dj.setdefault(old['dj'], ([], []))[1].append(row['id'])
+            row = current
+        by_dj.setdefault(current['dj'], ([], []))[0].append(row)
+    for schedule_id in removed:
+        by_dj.setdefault(previous['schedules'][str(schedule_id)]['dj'], ([], []))[1].append(schedule_id)
+    for dj_id, (dj_changed, dj_removed) in by_dj.items():
+        _send(dj_group(dj_id), {**message, 'changed': dj_changed, 'removed': dj_removed})
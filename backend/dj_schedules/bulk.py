@@ -0,0 +1,139 @@
+"""Editing a whole lineup in one request.
+
+Setting up a night means adding dozens of slots and shuffling them
+around. ``edit_lineup`` takes every slot of the edit at once: rows with
+an ``id`` update (or move) that schedule, rows without one create a slot.
+The lineup as it would be after the edit is checked for overlapping sets
+in one pass, sorting the slots by start time and sweeping them while
+tracking the latest end so far. The edit is applied all or nothing, with
+one ``bulk_create`` and one ``bulk_update``.
+
+Bulk writes don't send signals, so the lineup is marked as changed once
+for the whole edit and goes out as a single broadcast.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from events.models import Event
+from rest_framework import serializers
+from .broadcast import schedule_changed
+from .models import DJSchedule
+
+User = get_user_model()
+
+MAX_SLOTS = 200
+UPDATE_FIELDS = ['dj', 'start_time', 'end_time', 'status', 'updated_at']
+# Cancelled sets leave their slot free
+INACTIVE_STATUSES = ('cancelled',)
+
+
+class SlotSerializer(serializers.Serializer):
+    id = serializers.IntegerField(required=False)
+    dj = serializers.UUIDField(required=False)
+    start_time = serializers.DateTimeField(required=False)
+    end_time = serializers.DateTimeField(required=False)
+    status = serializers.ChoiceField(
+        choices=DJSchedule._meta.get_field('status').choices, required=False
+    )
+
+
+def find_overlaps(slots):
+    """Overlapping intervals among ``(start, end, key)`` slots.
+
+    Returns ``[(key, earlier key)]`` for every slot that starts before an
+    earlier one has ended. Slots that merely touch don't overlap.
+    """
+    overlaps = []
+    latest = None
+    for start, end, key in sorted(slots, key=lambda slot: (slot[0], slot[1])):
+        if latest is not None and start < latest[1]:
+            overlaps.append((key, latest[2]))
+        if latest is None or end > latest[1]:
+            latest = (start, end, key)
+    return overlaps
+
+
+def edit_lineup(event_id, rows):
+    """Create and update the slots of an event's lineup.
+
+    Raises ``ValidationError`` with a list of errors per row if any row is
+    invalid, in which case nothing is written. Returns ``(created,
+    updated)`` schedules otherwise.
+    """
+    errors = [{} for _ in rows]
+    slots = []
+    seen = set()
+    with transaction.atomic():
+        # Concurrent edits of the same lineup would each pass the overlap check
+        event = Event.objects.select_for_update().get(pk=event_id)
+        existing = {schedule.pk: schedule for schedule in DJSchedule.objects.filter(event=event)}
+        for index, row in enumerate(rows):
+            serializer = SlotSerializer(data=row)
+            if not serializer.is_valid():
+                errors[index] = serializer.errors
+                continue
+            data = dict(serializer.validated_data)
+            if 'id' in data:
+                schedule_id = data.pop('id')
+                if schedule_id not in existing:
+                    errors[index] = {'id': ['Not a schedule of this event.']}
+                    continue
+                if schedule_id in seen:
+                    errors[index] = {'id': ['Appears more than once.']}
+                    continue
+                seen.add(schedule_id)
+                schedule = existing[schedule_id]
+            else:
+                missing = [field for field in ('dj', 'start_time', 'end_time') if field not in data]
+                if missing:
+                    errors[index] = {field: ['This field is required.'] for field in missing}
+                    continue
+                schedule = DJSchedule(event=event)
+            if 'dj' in data:
+                schedule.dj_id = data.pop('dj')
+            for field, value in data.items():
+                setattr(schedule, field, value)
+            if schedule.end_time <= schedule.start_time:
+                errors[index] = {'end_time': ['Must be after start_time.']}
+                continue
+            slots.append((index, schedule))
+
+        djs = set(
+            User.objects.filter(pk__in={schedule.dj_id for _index, schedule in slots})
+            .values_list('pk', flat=True)
+        )
+        for index, schedule in slots:
+            if schedule.dj_id not in djs:
+                errors[index] = {'dj': ['No such user.']}
+
+        intervals = [
+            (schedule.start_time, schedule.end_time, ('row', index))
+            for index, schedule in slots if schedule.status not in INACTIVE_STATUSES
+        ] + [
+            (schedule.start_time, schedule.end_time, ('schedule', schedule.pk))
+            for schedule in existing.values()
+            if schedule.pk not in seen and schedule.status not in INACTIVE_STATUSES
+        ]
+        for key, other in find_overlaps(intervals):
+            if key[0] != 'row':
+                # Report it on the edited row when only one side was edited
+                key, other = other, key
+                if key[0] != 'row':
+                    continue
+            described = f'row {other[1]}' if other[0] == 'row' else f'schedule {other[1]}'
+            errors[key[1]].setdefault('start_time', []).append(f'Overlaps {described}.')
+
+        if any(errors):
+            raise serializers.ValidationError({'schedules': errors})
+
+        now = timezone.now()
+        created = [schedule for _index, schedule in slots if schedule.pk is None]
+        updated = [schedule for _index, schedule in slots if schedule.pk is not None]
+        for schedule in updated:
+            # bulk_update skips auto_now
+            schedule.updated_at = now
+        DJSchedule.objects.bulk_create(created)
+        DJSchedule.objects.bulk_update(updated, UPDATE_FIELDS)
+        schedule_changed(event.pk)
+    return created, updated
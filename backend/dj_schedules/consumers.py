@@ -1,37 +1,138 @@
 import json
+import uuid
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
-from django.core.serializers import serialize
-from .models import DJSchedule
+from .broadcast import build_dj_schedules, dj_group, event_group, get_lineup
+
+# Keeps one socket from joining an unbounded number of groups
+MAX_SUBSCRIPTIONS = 20
+SUBSCRIPTION_GROUPS = {'event': event_group, 'dj': dj_group}
+
 
 class DJScheduleConsumer(AsyncWebsocketConsumer):
+    """Live lineup updates for the events and DJs a client subscribes to.
+
+    Connect to ``ws/dj-schedules/events/<event id>/`` or
+    ``ws/dj-schedules/djs/<dj id>/`` to subscribe straight away, or to
+    ``ws/dj-schedules/`` and send ``{"action": "subscribe", "event": id}``
+    (or ``"dj"``); ``"unsubscribe"`` leaves again.
+
+    Subscribing to an event sends its whole lineup as a ``lineup_snapshot``
+    straight away; changes then arrive as versioned ``lineup_delta``
+    messages (see ``dj_schedules.broadcast``). ``{"action": "snapshot",
+    "event": id}`` sends the snapshot again, for clients that notice a gap
+    in the versions; ``{"action": "snapshot", "dj": id}`` sends a
+    ``dj_snapshot`` of a DJ's slots at every event.
+    """
+
     async def connect(self):
-        # Join the DJ schedules group
-        await self.channel_layer.group_add(
-            "dj_schedules",
-            self.channel_name
-        )
+        self.subscriptions = set()
         await self.accept()
+        kwargs = self.scope.get('url_route', {}).get('kwargs', {})
+        for kind in SUBSCRIPTION_GROUPS:
+            if kwargs.get(f'{kind}_id'):
+                await self.subscribe(kind, kwargs[f'{kind}_id'])
 
     async def disconnect(self, close_code):
-        # Leave the DJ schedules group
-        await self.channel_layer.group_discard(
-            "dj_schedules",
-            self.channel_name
-        )
-
-    async def receive(self, text_data):
-        # Handle incoming messages (if needed)
-        pass
-
-    async def schedule_update(self, event):
-        # Send schedule update to WebSocket
-        await self.send(text_data=json.dumps({
-            'type': 'schedule_update',
-            'schedule': event['schedule']
-        }))
+        for group in getattr(self, 'subscriptions', ()):
+            await self.channel_layer.group_discard(group, self.channel_name)
+
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            message = json.loads(text_data or '')
+        except ValueError:
+            message = None
+        if not isinstance(message, dict):
+            await self.send_error('Messages must be JSON objects')
+            return
+
+        action = message.get('action')
+        kinds = [kind for kind in SUBSCRIPTION_GROUPS if message.get(kind)]
+        if action == 'snapshot' and len(kinds) == 1:
+            await self.send_snapshot(kinds[0], message[kinds[0]])
+        elif action in ('subscribe', 'unsubscribe') and len(kinds) == 1:
+            kind = kinds[0]
+            if action == 'subscribe':
+                await self.subscribe(kind, message[kind])
+            else:
+                await self.unsubscribe(kind, message[kind])
+        else:
+            await self.send_error(
+                'Expected {"action": "subscribe" or "unsubscribe", "event" or "dj": <id>} '
+                'or {"action": "snapshot", "event" or "dj": <id>}'
+            )
+
+    async def subscribe(self, kind, object_id):
+        try:
+            object_id = str(uuid.UUID(str(object_id)))
+        except ValueError:
+            await self.send_error(f'Invalid {kind} id')
+            return
+        group = SUBSCRIPTION_GROUPS[kind](object_id)
+        joined = group not in self.subscriptions
+        if joined:
+            if len(self.subscriptions) >= MAX_SUBSCRIPTIONS:
+                await self.send_error(f'At most {MAX_SUBSCRIPTIONS} subscriptions per connection')
+                return
+            await self.channel_layer.group_add(group, self.channel_name)
+            self.subscriptions.add(group)
+        if kind == 'event':
+            # Joined first, so no change slips in between snapshot and deltas
+            lineup = await self.get_lineup(object_id)
+            if lineup is None:
+                if joined:
+                    await self.channel_layer.group_discard(group, self.channel_name)
+                    self.subscriptions.discard(group)
+                await self.send_error('No such event')
+                return
+        await self.send(text_data=json.dumps({'type': 'subscribed', kind: object_id}))
+        if kind == 'event':
+            await self.send(text_data=lineup['snapshot'])
+
+    async def unsubscribe(self, kind, object_id):
+        try:
+            object_id = str(uuid.UUID(str(object_id)))
+        except ValueError:
+            await self.send_error(f'Invalid {kind} id')
+            return
+        group = SUBSCRIPTION_GROUPS[kind](object_id)
+        if group in self.subscriptions:
+            await self.channel_layer.group_discard(group, self.channel_name)
+            self.subscriptions.discard(group)
+        await self.send(text_data=json.dumps({'type': 'unsubscribed', kind: object_id}))
+
+    async def send_error(self, error):
+        await self.send(text_data=json.dumps({'type': 'error', 'error': error}))
+
+    async def send_snapshot(self, kind, object_id):
+        try:
+            object_id = str(uuid.UUID(str(object_id)))
+        except ValueError:
+            await self.send_error(f'Invalid {kind} id')
+            return
+        if kind == 'event':
+            lineup = await self.get_lineup(object_id)
+            if lineup is None:
+                await self.send_error('No such event')
+            else:
+                await self.send(text_data=lineup['snapshot'])
+        else:
+            await self.send(text_data=json.dumps({
+                'type': 'dj_snapshot',
+                'dj': object_id,
+                'schedules': await self.get_dj_schedules(object_id),
+            }))
+
+    async def lineup_delta(self, message):
+        await self.send(text_data=json.dumps(message))
+
+    async def lineup_snapshot(self, message):
+        await self.send(text_data=json.dumps(message))
+
+    @database_sync_to_async
+    def get_lineup(self, event_id):
+        return get_lineup(event_id)
 
     @database_sync_to_async
-    def get_schedule(self, schedule_id):
-        schedule = DJSchedule.objects.get(id=schedule_id)
-        return json.loads(serialize('json', [schedule]))[0]
+    def get_dj_schedules(self, dj_id):
+        return build_dj_schedules(dj_id)
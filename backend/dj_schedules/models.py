@@ -20,5 +20,12 @@ class DJSchedule(models.Model):
     class Meta:
         ordering = ['start_time']
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Event as stored, so moving a schedule updates both lineups
+        instance._stored_event_id = instance.__dict__.get('event_id')
+        return instance
+
     def __str__(self):
-        return f"{self.dj.username} - {self.event.name} ({self.start_time})"
+        return f"{self.dj.get_full_name()} - {self.event.title} ({self.start_time})"
@@ -3,4 +3,6 @@ from . import consumers
 
 websocket_urlpatterns = [
     re_path(r'ws/dj-schedules/$', consumers.DJScheduleConsumer.as_asgi()),
+    re_path(r'ws/dj-schedules/events/(?P<event_id>[0-9a-f-]+)/$', consumers.DJScheduleConsumer.as_asgi()),
+    re_path(r'ws/dj-schedules/djs/(?P<dj_id>[0-9a-f-]+)/$', consumers.DJScheduleConsumer.as_asgi()),
 ]
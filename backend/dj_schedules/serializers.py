@@ -2,8 +2,8 @@ from rest_framework import serializers
 from .models import DJSchedule
 
 class DJScheduleSerializer(serializers.ModelSerializer):
-    dj_name = serializers.CharField(source='dj.username', read_only=True)
-    event_name = serializers.CharField(source='event.name', read_only=True)
+    dj_name = serializers.CharField(source='dj.get_full_name', read_only=True)
+    event_name = serializers.CharField(source='event.title', read_only=True)
 
     class Meta:
         model = DJSchedule
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .broadcast import schedule_changed
+from .models import DJSchedule
+
+
+@receiver(post_save, sender=DJSchedule)
+def schedule_saved(sender, instance, **kwargs):
+    """Broadcast the lineups the schedule was and now is part of."""
+    schedule_changed(getattr(instance, '_stored_event_id', None), instance.event_id)
+    instance._stored_event_id = instance.event_id
+
+
+@receiver(post_delete, sender=DJSchedule)
+def schedule_deleted(sender, instance, **kwargs):
+    schedule_changed(instance.event_id)
@@ -0,0 +1,8 @@
+from celery import shared_task
+from .broadcast import flush_lineup
+
+
+@shared_task(ignore_result=True)
+def flush_lineup_updates(event_id):
+    """Broadcast the changes made to an event's lineup since the last flush."""
+    flush_lineup(event_id)
@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+from django.utils import timezone
+from dj_schedules.models import DJSchedule
+from dj_schedules.routing import websocket_urlpatterns
+from events.models import Event
+
+
+@pytest.fixture(autouse=True)
+def channel_layer(settings, monkeypatch):
+    settings.CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+    # Lineup state lives in the cache; keep it local so tests don't need Redis
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    # Broadcast at commit instead of from a Celery task
+    settings.DJ_SCHEDULE_BROADCAST_WINDOW = 0
+    cache.clear()
+    # Consumers close stale connections, which would end the test transaction
+    monkeypatch.setattr('channels.db.close_old_connections', lambda: None)
+
+
+@pytest.fixture
+def make_event():
+    def make(title='Warehouse Night'):
+        return Event.objects.create(
+            title=title,
+            description='Test Description',
+            date=timezone.now().date(),
+            start_time=timezone.now().time(),
+            location={'name': 'Test Venue'},
+            capacity=100,
+            status='published',
+        )
+    return make
+
+
+@pytest.fixture
+def event(make_event):
+    return make_event()
+
+
+@pytest.fixture
+def dj(create_user):
+    return create_user(email='dj@example.com', first_name='Jane', last_name='Doe')
+
+
+@pytest.fixture
+def make_schedule(dj):
+    def make(event, hour=22, **fields):
+        start = timezone.now().replace(hour=hour, minute=0, second=0, microsecond=0)
+        return DJSchedule.objects.create(
+            dj=fields.pop('dj', dj), event=event, start_time=start,
+            end_time=start + timedelta(hours=1), **fields,
+        )
+    return make
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine function from a synchronous test."""
+    return lambda coroutine_function, *args: async_to_sync(coroutine_function)(*args)
+
+
+@pytest.fixture
+def committed(django_capture_on_commit_callbacks):
+    """Call a function and run the on-commit callbacks it registers."""
+    def call(function, *args, **kwargs):
+        with django_capture_on_commit_callbacks(execute=True):
+            return function(*args, **kwargs)
+    return call
+
+
+@pytest.fixture
+def connect():
+    async def _connect(path):
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), path)
+        connected, _subprotocol = await communicator.connect()
+        assert connected
+        return communicator
+    return _connect
@@ -0,0 +1,243 @@
+import json
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from kombu.exceptions import OperationalError
+from dj_schedules import broadcast
+from dj_schedules.models import DJSchedule
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    messages = []
+    monkeypatch.setattr(broadcast, '_send', lambda group, message: messages.append((group, message)))
+    return messages
+
+
+@pytest.fixture
+def scheduled(monkeypatch):
+    calls = []
+    monkeypatch.setattr(broadcast, '_schedule_flush', lambda *args: calls.append(args) or True)
+    return calls
+
+
+class TestLineupDelta:
+    def test_only_changed_fields(self):
+        previous = {
+            '1': {'id': 1, 'dj': 'a', 'status': 'scheduled'},
+            '2': {'id': 2, 'dj': 'a', 'status': 'scheduled'},
+            '3': {'id': 3, 'dj': 'b', 'status': 'scheduled'},
+        }
+        current = {
+            '1': {'id': 1, 'dj': 'a', 'status': 'scheduled'},
+            '2': {'id': 2, 'dj': 'a', 'status': 'performing'},
+            '4': {'id': 4, 'dj': 'b', 'status': 'scheduled'},
+        }
+        assert broadcast.lineup_delta(previous, current) == (
+            [{'id': 2, 'status': 'performing'}, {'id': 4, 'dj': 'b', 'status': 'scheduled'}],
+            [3],
+        )
+
+
+class TestLineupCache:
+    def test_served_from_the_cache_until_schedules_change(
+        self, sent, committed, django_assert_num_queries, event, make_schedule
+    ):
+        make_schedule(event)
+        with django_assert_num_queries(1):
+            lineup = broadcast.get_lineup(event.pk)
+            assert broadcast.get_lineup(event.pk) == lineup
+        assert json.loads(lineup['snapshot']) == {
+            'type': 'lineup_snapshot',
+            'event': str(event.pk),
+            'version': lineup['version'],
+            'schedules': list(lineup['schedules'].values()),
+        }
+
+        schedule = committed(make_schedule, event, hour=23)
+        with django_assert_num_queries(0):
+            rebuilt = broadcast.get_lineup(event.pk)
+        assert rebuilt['version'] > lineup['version']
+        assert str(schedule.pk) in rebuilt['schedules']
+
+    def test_not_cached_while_a_flush_is_pending(self, settings, scheduled, committed, event, make_schedule):
+        settings.DJ_SCHEDULE_BROADCAST_WINDOW = 0.5
+        committed(make_schedule, event)
+        broadcast.get_lineup(event.pk)
+        assert cache.get(f'dj_schedules:lineup:{event.pk}:state') is None
+
+
+class TestFlush:
+    def test_first_flush_sends_a_snapshot_then_deltas(self, sent, committed, event, dj, make_schedule):
+        schedule = committed(make_schedule, event)
+        [(group, snapshot), (dj_group, dj_snapshot)] = sent
+        assert group == broadcast.event_group(event.pk)
+        assert snapshot['type'] == 'lineup_snapshot'
+        assert [row['id'] for row in snapshot['schedules']] == [schedule.pk]
+        assert dj_group == broadcast.dj_group(dj.pk)
+        assert dj_snapshot['schedules'] == snapshot['schedules']
+
+        sent.clear()
+        schedule.status = 'performing'
+        committed(schedule.save)
+        [(group, delta), (dj_group, dj_delta)] = sent
+        assert delta['type'] == 'lineup_delta'
+        assert delta['previous_version'] == snapshot['version']
+        assert delta['version'] == snapshot['version'] + 1
+        assert delta['removed'] == []
+        [row] = delta['changed']
+        assert set(row) == {'id', 'status', 'updated_at'}
+        assert row['status'] == 'performing'
+        # DJ groups skip the versions of other DJs' changes
+        assert 'previous_version' not in dj_delta
+        assert dj_delta['version'] == delta['version']
+        assert dj_delta['changed'] == delta['changed']
+
+    def test_unchanged_lineup_sends_nothing(self, sent, event, make_schedule):
+        make_schedule(event)
+        broadcast.flush_lineup(str(event.pk))
+        sent.clear()
+        broadcast.flush_lineup(str(event.pk))
+        assert sent == []
+
+    def test_handover_between_djs(self, sent, committed, event, dj, make_schedule, create_user):
+        other_dj = create_user(email='other@example.com')
+        schedule = committed(make_schedule, event)
+        sent.clear()
+
+        schedule.dj = other_dj
+        committed(schedule.save)
+        messages = dict(sent)
+        assert messages[broadcast.dj_group(dj.pk)]['removed'] == [schedule.pk]
+        assert messages[broadcast.dj_group(dj.pk)]['changed'] == []
+        handed_over = messages[broadcast.dj_group(other_dj.pk)]['changed'][0]
+        assert handed_over['dj'] == str(other_dj.pk)
+        assert 'start_time' in handed_over
+
+    def test_move_between_events_updates_both(self, sent, committed, event, make_event, make_schedule):
+        rooftop = make_event('Rooftop')
+        schedule = committed(make_schedule, event)
+        broadcast.flush_lineup(str(rooftop.pk))
+        sent.clear()
+
+        schedule = DJSchedule.objects.get(pk=schedule.pk)
+        schedule.event = rooftop
+        committed(schedule.save)
+        messages = {group: message for group, message in sent if 'event' in group}
+        assert messages[broadcast.event_group(event.pk)]['removed'] == [schedule.pk]
+        assert messages[broadcast.event_group(rooftop.pk)]['changed'][0]['id'] == schedule.pk
+
+    def test_busy_flush_goes_again_later(self, sent, scheduled, event):
+        cache.add(f'dj_schedules:lineup:{event.pk}:lock', 1)
+        broadcast.flush_lineup(str(event.pk))
+        assert sent == []
+        assert scheduled == [(str(event.pk), 1)]
+
+    def test_versions_survive_eviction(self, sent, committed, event, make_schedule):
+        schedule = committed(make_schedule, event)
+        version = sent[0][1]['version']
+        cache.delete(f'dj_schedules:lineup:{event.pk}:version')
+
+        schedule.status = 'completed'
+        committed(schedule.save)
+        assert sent[-2][1]['version'] > version
+
+
+class TestCoalescing:
+    def test_burst_of_changes_is_one_broadcast(
+        self, settings, sent, scheduled, committed, event, make_schedule
+    ):
+        settings.DJ_SCHEDULE_BROADCAST_WINDOW = 0.5
+        broadcast.flush_lineup(str(event.pk))
+        sent.clear()
+
+        def edit_lineup():
+            for hour in (20, 21, 22):
+                make_schedule(event, hour=hour)
+        committed(edit_lineup)
+        committed(make_schedule, event, hour=23)
+        assert scheduled == [(str(event.pk), 0.5)]
+        assert sent == []
+
+        broadcast.flush_lineup(str(event.pk))
+        [(_group, delta), _dj] = sent
+        assert len(delta['changed']) == 4
+
+        # Changes after the flush started wait for the next window
+        committed(make_schedule, event, hour=19)
+        assert len(scheduled) == 2
+
+    def test_task_flushes(self, sent, event, make_schedule):
+        from dj_schedules.tasks import flush_lineup_updates
+
+        schedule = make_schedule(event)
+        flush_lineup_updates(str(event.pk))
+        assert [row['id'] for row in sent[0][1]['schedules']] == [schedule.pk]
+
+
+class UnreachableCache:
+    """The cache as seen with IGNORE_EXCEPTIONS while Redis is down."""
+
+    def add(self, *args, **kwargs):
+        return False
+
+    def get(self, key, default=None):
+        return default
+
+    def get_or_set(self, key, default, *args, **kwargs):
+        return default() if callable(default) else default
+
+    def incr(self, *args, **kwargs):
+        return None
+
+    def set(self, *args, **kwargs):
+        pass
+
+    def delete(self, *args, **kwargs):
+        pass
+
+
+class TestOutages:
+    @pytest.fixture(autouse=True)
+    def window(self, settings):
+        settings.DJ_SCHEDULE_BROADCAST_WINDOW = 0.5
+
+    def test_unreachable_cache_sends_right_away(
+        self, monkeypatch, sent, scheduled, committed, event, make_schedule
+    ):
+        monkeypatch.setattr(broadcast, 'cache', UnreachableCache())
+        schedule = committed(make_schedule, event)
+        assert scheduled == []
+        [(_group, message), _dj] = sent
+        assert message['type'] == 'lineup_snapshot'
+        assert [row['id'] for row in message['schedules']] == [schedule.pk]
+        assert isinstance(message['version'], int)
+
+    def test_unreachable_broker_sends_right_away(self, sent, committed, event, make_schedule):
+        from dj_schedules.tasks import flush_lineup_updates
+
+        with mock.patch.object(
+            flush_lineup_updates, 'apply_async', side_effect=OperationalError('down')
+        ):
+            committed(make_schedule, event)
+        assert sent[0][1]['type'] == 'lineup_snapshot'
+        # The inline flush cleared the mark, so the next change isn't held back
+        assert cache.get(f'dj_schedules:lineup:{event.pk}:pending') is None
+
+    def test_unreachable_broker_while_locked_sends_right_away(self, sent, event, make_schedule):
+        from dj_schedules.tasks import flush_lineup_updates
+
+        schedule = make_schedule(event)
+        cache.set(f'dj_schedules:lineup:{event.pk}:lock', 1)
+        with mock.patch.object(
+            flush_lineup_updates, 'apply_async', side_effect=OperationalError('down')
+        ):
+            broadcast.flush_lineup(str(event.pk))
+        assert sent[0][1]['type'] == 'lineup_snapshot'
+        assert [row['id'] for row in sent[0][1]['schedules']] == [schedule.pk]
+        assert cache.get(f'dj_schedules:lineup:{event.pk}:pending') is None
+        # The other flush still holds its lock
+        assert cache.get(f'dj_schedules:lineup:{event.pk}:lock') == 1
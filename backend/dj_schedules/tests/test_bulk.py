@@ -0,0 +1,128 @@
+from datetime import datetime, timezone
+
+import pytest
+from django.urls import reverse
+from dj_schedules import broadcast
+from dj_schedules.bulk import find_overlaps
+from dj_schedules.models import DJSchedule
+from rest_framework import status
+
+pytestmark = pytest.mark.django_db
+
+
+def at(hour, minute=0):
+    return datetime(2026, 10, 19, hour, minute, tzinfo=timezone.utc).isoformat()
+
+
+def slot(dj, start, end, **fields):
+    return {'dj': str(dj.pk), 'start_time': at(*start), 'end_time': at(*end), **fields}
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    messages = []
+    monkeypatch.setattr(broadcast, '_send', lambda group, message: messages.append((group, message)))
+    return messages
+
+
+@pytest.fixture
+def post(staff_client, committed):
+    def post(event, schedules):
+        return committed(
+            staff_client.post, reverse('djschedule-bulk'),
+            {'event': str(event.pk), 'schedules': schedules}, format='json',
+        )
+    return post
+
+
+class TestFindOverlaps:
+    def test_sweep(self):
+        slots = [(22, 23, 'c'), (20, 22, 'a'), (21, 22, 'b'), (23, 24, 'd'), (20, 21, 'e')]
+        # Touching slots are fine; each overlap is reported against the latest end so far
+        assert find_overlaps(slots) == [('a', 'e'), ('b', 'a')]
+
+
+class TestBulkLineup:
+    def test_create_a_night_in_one_broadcast(
+        self, post, sent, django_assert_max_num_queries, event, dj, create_user
+    ):
+        other = create_user(email='other@example.com')
+        schedules = [slot(dj if hour % 2 else other, (hour,), (hour + 1,)) for hour in range(17, 23)]
+        # However long the lineup: lookups, one insert, the response and the broadcast
+        with django_assert_max_num_queries(10):
+            response = post(event, schedules)
+        assert response.status_code == status.HTTP_201_CREATED
+        assert (response.data['created'], response.data['updated']) == (6, 0)
+        assert [row['start_time'] for row in response.data['schedules']] == [
+            row['start_time'].replace('+00:00', 'Z') for row in schedules
+        ]
+        [(group, message)] = [item for item in sent if item[0] == broadcast.event_group(event.pk)]
+        assert len(message['schedules']) == 6
+
+    def test_reorder_and_update(self, post, sent, event, dj, make_schedule):
+        first, second = make_schedule(event, hour=20), make_schedule(event, hour=21)
+        broadcast.flush_lineup(str(event.pk))
+        sent.clear()
+
+        response = post(event, [
+            {'id': first.pk, 'start_time': at(21), 'end_time': at(22)},
+            {'id': second.pk, 'start_time': at(20), 'end_time': at(21), 'status': 'performing'},
+            slot(dj, (22,), (23, 30)),
+        ])
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [row['id'] for row in response.data['schedules']][:2] == [second.pk, first.pk]
+        second.refresh_from_db()
+        assert second.status == 'performing'
+        assert second.updated_at > second.created_at
+        [(_group, delta), _dj] = sent
+        assert delta['type'] == 'lineup_delta'
+        assert len(delta['changed']) == 3
+
+    def test_overlaps_reject_the_whole_edit(self, post, sent, event, dj, make_schedule):
+        kept = make_schedule(event, hour=22)
+        response = post(event, [
+            slot(dj, (19,), (20, 30)),
+            slot(dj, (20,), (21,)),
+            slot(dj, (22, 30), (23,)),
+            slot(dj, (23,), (23, 30), status='cancelled'),
+        ])
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        errors = response.data['schedules']
+        assert errors[1] == {'start_time': ['Overlaps row 0.']}
+        assert errors[2] == {'start_time': [f'Overlaps schedule {kept.pk}.']}
+        assert errors[0] == errors[3] == {}
+        assert list(DJSchedule.objects.all()) == [kept]
+        assert sent == []
+
+    def test_invalid_rows(self, post, event, dj, make_event, make_schedule):
+        elsewhere = make_schedule(make_event('Rooftop'))
+        response = post(event, [
+            {'id': elsewhere.pk, 'start_time': at(20)},
+            {'dj': str(dj.pk)},
+            slot(dj, (21,), (20,)),
+            {**slot(dj, (21,), (22,)), 'dj': '00000000-0000-0000-0000-000000000000'},
+            slot(dj, (22,), (23,), status='late'),
+        ])
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        errors = response.data['schedules']
+        assert errors[0] == {'id': ['Not a schedule of this event.']}
+        assert set(errors[1]) == {'start_time', 'end_time'}
+        assert errors[2] == {'end_time': ['Must be after start_time.']}
+        assert errors[3] == {'dj': ['No such user.']}
+        assert set(errors[4]) == {'status'}
+
+    @pytest.mark.parametrize('data', [
+        {'event': 'tonight', 'schedules': [{}]},
+        {'schedules': []},
+    ])
+    def test_bad_requests(self, staff_client, event, data):
+        data.setdefault('event', str(event.pk))
+        response = staff_client.post(reverse('djschedule-bulk'), data, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_staff_only(self, authenticated_client, event, dj):
+        response = authenticated_client.post(
+            reverse('djschedule-bulk'),
+            {'event': str(event.pk), 'schedules': [slot(dj, (20,), (21,))]}, format='json',
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,206 @@
+import uuid
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.urls import reverse
+from dj_schedules.broadcast import get_lineup
+from rest_framework import status
+
+pytestmark = pytest.mark.django_db
+
+
+async def database_sync(function, *args, **kwargs):
+    return await sync_to_async(function)(*args, **kwargs)
+
+
+class TestSubscriptions:
+    def test_event_url_subscribes_to_that_event_only(
+        self, run, connect, committed, make_event, make_schedule
+    ):
+        tonight, elsewhere = make_event(), make_event('Rooftop')
+
+        async def scenario():
+            communicator = await connect(f'/ws/dj-schedules/events/{tonight.pk}/')
+            assert await communicator.receive_json_from() == {
+                'type': 'subscribed', 'event': str(tonight.pk)
+            }
+            snapshot = await communicator.receive_json_from()
+            assert (snapshot['type'], snapshot['schedules']) == ('lineup_snapshot', [])
+            await database_sync(committed, make_schedule, elsewhere)
+            assert await communicator.receive_nothing()
+            schedule = await database_sync(committed, make_schedule, tonight)
+            message = await communicator.receive_json_from()
+            assert message['event'] == str(tonight.pk)
+            assert message['previous_version'] == snapshot['version']
+            assert [row['id'] for row in message['changed']] == [schedule.pk]
+            await communicator.disconnect()
+
+        run(scenario)
+
+    def test_dj_url_and_subscribe_messages(
+        self, run, connect, committed, event, dj, make_schedule, create_user
+    ):
+        other_dj = create_user(email='other@example.com')
+        get_lineup(event.pk)
+
+        async def scenario():
+            by_dj = await connect(f'/ws/dj-schedules/djs/{dj.pk}/')
+            assert (await by_dj.receive_json_from())['dj'] == str(dj.pk)
+            plain = await connect('/ws/dj-schedules/')
+            await plain.send_json_to({'action': 'subscribe', 'event': str(event.pk)})
+            assert await plain.receive_json_from() == {'type': 'subscribed', 'event': str(event.pk)}
+            assert (await plain.receive_json_from())['type'] == 'lineup_snapshot'
+
+            someone_else = await database_sync(committed, make_schedule, event, dj=other_dj)
+            assert (await plain.receive_json_from())['changed'][0]['id'] == someone_else.pk
+            assert await by_dj.receive_nothing()
+            schedule = await database_sync(committed, make_schedule, event, hour=23)
+            assert (await plain.receive_json_from())['changed'][0]['id'] == schedule.pk
+            assert (await by_dj.receive_json_from())['changed'][0]['id'] == schedule.pk
+
+            await plain.send_json_to({'action': 'unsubscribe', 'event': str(event.pk)})
+            assert (await plain.receive_json_from())['type'] == 'unsubscribed'
+            await database_sync(committed, make_schedule, event, hour=21)
+            assert await plain.receive_nothing()
+            await plain.disconnect()
+            await by_dj.disconnect()
+
+        run(scenario)
+
+    @pytest.mark.parametrize('message', [
+        'not json',
+        '[]',
+        '{"action": "subscribe"}',
+        '{"action": "listen", "event": "x"}',
+        '{"action": "subscribe", "event": "not-a-uuid"}',
+        '{"action": "snapshot", "dj": "x"}',
+    ])
+    def test_invalid_messages(self, run, connect, message):
+        async def scenario():
+            communicator = await connect('/ws/dj-schedules/')
+            await communicator.send_to(text_data=message)
+            assert (await communicator.receive_json_from())['type'] == 'error'
+            await communicator.disconnect()
+
+        run(scenario)
+
+    def test_unknown_events_are_refused_and_not_cached(self, run, connect):
+        missing = str(uuid.uuid4())
+
+        async def scenario():
+            communicator = await connect(f'/ws/dj-schedules/events/{missing}/')
+            assert await communicator.receive_json_from() == {'type': 'error', 'error': 'No such event'}
+            await communicator.send_json_to({'action': 'snapshot', 'event': missing})
+            assert (await communicator.receive_json_from())['type'] == 'error'
+            await communicator.disconnect()
+
+        run(scenario)
+        assert cache.get(f'dj_schedules:lineup:{missing}:state') is None
+        assert cache.get(f'dj_schedules:lineup:{missing}:version') is None
+
+    def test_subscription_limit(self, run, connect):
+        async def scenario():
+            communicator = await connect('/ws/dj-schedules/')
+            for _ in range(20):
+                await communicator.send_json_to({'action': 'subscribe', 'dj': str(uuid.uuid4())})
+                assert (await communicator.receive_json_from())['type'] == 'subscribed'
+            await communicator.send_json_to({'action': 'subscribe', 'dj': str(uuid.uuid4())})
+            assert (await communicator.receive_json_from())['type'] == 'error'
+            await communicator.disconnect()
+
+        run(scenario)
+
+
+class TestSnapshots:
+    def test_snapshot_on_connect(self, run, connect, committed, event, dj, make_schedule):
+        schedule = committed(make_schedule, event)
+        version = get_lineup(event.pk)['version']
+
+        async def scenario():
+            communicator = await connect(f'/ws/dj-schedules/events/{event.pk}/')
+            await communicator.receive_json_from()
+            message = await communicator.receive_json_from()
+            assert message['type'] == 'lineup_snapshot'
+            assert message['version'] == version
+            [row] = message['schedules']
+            assert row['id'] == schedule.pk
+            assert (row['dj_name'], row['event_name']) == ('Jane Doe', 'Warehouse Night')
+            await communicator.disconnect()
+
+        run(scenario)
+
+    def test_snapshot_on_request(self, run, connect, committed, event, make_schedule):
+        schedule = committed(make_schedule, event)
+        version = get_lineup(event.pk)['version']
+
+        async def scenario():
+            communicator = await connect('/ws/dj-schedules/')
+            await communicator.send_json_to({'action': 'snapshot', 'event': str(event.pk)})
+            message = await communicator.receive_json_from()
+            assert message['type'] == 'lineup_snapshot'
+            assert message['version'] == version
+            assert [row['id'] for row in message['schedules']] == [schedule.pk]
+            await communicator.disconnect()
+
+        run(scenario)
+
+    def test_dj_snapshot(self, run, connect, committed, event, dj, make_event, make_schedule, create_user):
+        tonight = committed(make_schedule, event)
+        rooftop = committed(make_schedule, make_event('Rooftop'), hour=23)
+        committed(make_schedule, event, hour=20, dj=create_user(email='other@example.com'))
+
+        async def scenario():
+            communicator = await connect(f'/ws/dj-schedules/djs/{dj.pk}/')
+            await communicator.receive_json_from()
+            await communicator.send_json_to({'action': 'snapshot', 'dj': str(dj.pk)})
+            message = await communicator.receive_json_from()
+            assert (message['type'], message['dj']) == ('dj_snapshot', str(dj.pk))
+            assert [row['id'] for row in message['schedules']] == [tonight.pk, rooftop.pk]
+            await communicator.disconnect()
+
+        run(scenario)
+
+
+class TestViewBroadcasts:
+    def test_changes_reach_event_and_dj_groups(
+        self, run, connect, committed, authenticated_client, event, dj, make_event
+    ):
+        url = reverse('djschedule-list')
+        data = {
+            'dj': str(dj.pk), 'event': str(event.pk),
+            'start_time': '2026-10-19T22:00:00Z', 'end_time': '2026-10-19T23:00:00Z',
+        }
+        rooftop = make_event('Rooftop')
+        get_lineup(event.pk)
+        get_lineup(rooftop.pk)
+
+        async def scenario():
+            by_event = await connect(f'/ws/dj-schedules/events/{event.pk}/')
+            moved_to = await connect(f'/ws/dj-schedules/events/{rooftop.pk}/')
+            by_dj = await connect(f'/ws/dj-schedules/djs/{dj.pk}/')
+            for communicator in (by_event, moved_to, by_dj):
+                await communicator.receive_json_from()
+            for communicator in (by_event, moved_to):
+                await communicator.receive_json_from()
+
+            response = await database_sync(committed, authenticated_client.post, url, data)
+            assert response.status_code == status.HTTP_201_CREATED
+            schedule_id = response.data['id']
+            for communicator in (by_event, by_dj):
+                assert (await communicator.receive_json_from())['changed'][0]['id'] == schedule_id
+            assert await moved_to.receive_nothing()
+
+            detail = reverse('djschedule-detail', args=[schedule_id])
+            await database_sync(
+                committed, authenticated_client.patch, detail, {'event': str(rooftop.pk)}
+            )
+            assert (await by_event.receive_json_from())['removed'] == [schedule_id]
+            assert (await moved_to.receive_json_from())['changed'][0]['id'] == schedule_id
+
+            await database_sync(committed, authenticated_client.delete, detail)
+            assert (await moved_to.receive_json_from())['removed'] == [schedule_id]
+            for communicator in (by_event, moved_to, by_dj):
+                await communicator.disconnect()
+
+        run(scenario)
@@ -0,0 +1,26 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+pytestmark = pytest.mark.django_db
+
+
+class TestDJScheduleViews:
+    def test_list_one_event_in_constant_queries(
+        self, authenticated_client, django_assert_num_queries, event, make_event, make_schedule, create_user
+    ):
+        for hour in (20, 21, 22):
+            make_schedule(event, hour=hour, dj=create_user(email=f'dj{hour}@example.com'))
+        make_schedule(make_event('Rooftop'))
+
+        # The token's user, then the schedules with their DJs and event
+        with django_assert_num_queries(2):
+            response = authenticated_client.get(reverse('djschedule-list'), {'event': str(event.pk)})
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 3
+        assert {item['event_name'] for item in response.data} == {'Warehouse Night'}
+        assert response.data[0]['dj_name'] == 'Test User'
+
+    def test_invalid_event_filter(self, authenticated_client):
+        response = authenticated_client.get(reverse('djschedule-list'), {'event': 'tonight'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -1,8 +1,13 @@
-from django.shortcuts import render
-from rest_framework import viewsets
-from rest_framework.permissions import IsAuthenticated
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+import uuid
+from django.shortcuts import get_object_or_404, render
+from events.models import Event
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from .broadcast import build_lineup
+from .bulk import MAX_SLOTS, edit_lineup
 from .models import DJSchedule
 from .serializers import DJScheduleSerializer
 
@@ -13,35 +18,46 @@ class DJScheduleViewSet(viewsets.ModelViewSet):
     serializer_class = DJScheduleSerializer
     permission_classes = [IsAuthenticated]
 
-    def perform_create(self, serializer):
-        schedule = serializer.save()
-        self._broadcast_schedule_update(schedule)
+    def get_queryset(self):
+        queryset = DJSchedule.objects.select_related('dj', 'event')
+        if self.action == 'list':
+            # One event's lineup: ?event=<event id>
+            event = self.request.query_params.get('event', None)
+            if event is not None:
+                try:
+                    queryset = queryset.filter(event_id=uuid.UUID(event))
+                except ValueError:
+                    raise ValidationError({'event': 'Invalid event id'})
+        return queryset
 
-    def perform_update(self, serializer):
-        schedule = serializer.save()
-        self._broadcast_schedule_update(schedule)
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
+    def bulk(self, request):
+        """Create, update and reorder the slots of one event's lineup at once."""
+        try:
+            event = get_object_or_404(Event, pk=uuid.UUID(str(request.data.get('event'))))
+        except ValueError:
+            return Response(
+                {'error': 'event must be an event id'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        rows = request.data.get('schedules')
+        if not isinstance(rows, list) or not rows:
+            return Response(
+                {'error': 'schedules must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(rows) > MAX_SLOTS:
+            return Response(
+                {'error': f'At most {MAX_SLOTS} schedules per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-    def perform_destroy(self, instance):
-        schedule_id = instance.id
-        super().perform_destroy(instance)
-        self._broadcast_schedule_delete(schedule_id)
-
-    def _broadcast_schedule_update(self, schedule):
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            "dj_schedules",
-            {
-                "type": "schedule_update",
-                "schedule": DJScheduleSerializer(schedule).data
-            }
-        )
-
-    def _broadcast_schedule_delete(self, schedule_id):
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            "dj_schedules",
+        created, updated = edit_lineup(event.pk, rows)
+        return Response(
             {
-                "type": "schedule_update",
-                "schedule": {"id": schedule_id, "deleted": True}
-            }
+                'created': len(created),
+                'updated': len(updated),
+                'schedules': list(build_lineup(event.pk).values()),
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
         )
@@ -0,0 +1,96 @@
+"""Response cache for the public, read-heavy event endpoints.
+
+Cached payloads are stored under versioned namespaces: invalidating a
+namespace bumps its version so every key built from the old version is
+simply never read again, which avoids scanning Redis for keys to delete.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import urlencode
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+EVENT_LIST = 'list'
+EVENT_FEATURED = 'featured'
+
+FEATURED_IDS_KEY = 'events:featured:ids'
+
+
+def _timeout():
+    return getattr(settings, 'EVENT_CACHE_TIMEOUT', 300)
+
+
+def _version_key(namespace):
+    return f'events:{namespace}:version'
+
+
+def get_version(namespace):
+    # Seed with a timestamp so an evicted counter never reuses an old version
+    return cache.get_or_set(_version_key(namespace), time.time_ns, timeout=None)
+
+
+def invalidate(*namespaces):
+    """Drop every cached response in the given namespaces."""
+    for namespace in namespaces:
+        try:
+            cache.incr(_version_key(namespace))
+        except ValueError:
+            cache.set(_version_key(namespace), time.time_ns(), timeout=None)
+
+
+def make_key(namespace, request):
+    """Build a cache key covering the query params and response shape."""
+    params = urlencode(sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    ))
+    renderer = getattr(request, 'accepted_renderer', None)
+    variant = '|'.join([
+        request.get_host(),
+        getattr(renderer, 'format', ''),
+        params,
+    ])
+    digest = hashlib.md5(variant.encode()).hexdigest()
+    return f'events:{namespace}:v{get_version(namespace)}:{digest}'
+
+
+def cached_response(request, namespace, queryset, serialize):
+    """Return a (possibly cached) response for ``queryset``.
+
+    ``serialize`` turns the queryset into response data and only runs on a
+    cache miss. Responses carry an ETag (a hash of the payload) and a 304 is
+    returned when the client's copy is still current. There is no
+    Last-Modified: events that were deleted or dropped out of the listing
+    don't move the latest ``updated_at``, so a date could vouch for a stale
+    copy.
+    """
+    key = make_key(namespace, request)
+    entry = cache.get(key)
+    if entry is None:
+        data = serialize(queryset)
+        entry = {
+            'data': data,
+            'etag': '"%s"' % hashlib.md5(JSONRenderer().render(data)).hexdigest(),
+        }
+        cache.set(key, entry, _timeout())
+        if namespace == EVENT_FEATURED:
+            cache.set(FEATURED_IDS_KEY, {str(item['id']) for item in data}, _timeout())
+
+    not_modified = get_conditional_response(request, etag=entry['etag'])
+    if not_modified is not None:
+        return not_modified
+
+    response = Response(entry['data'])
+    response['ETag'] = entry['etag']
+    return response
+
+
+def is_featured_cached(event_id):
+    """Whether ``event_id`` appears in a cached featured payload."""
+    return str(event_id) in (cache.get(FEATURED_IDS_KEY) or ())
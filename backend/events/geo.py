@@ -0,0 +1,103 @@
+"""Helpers for location-based event queries."""
+
+import math
+
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LATITUDE = 111.045
+DEFAULT_RADIUS_KM = 10.0
+MAX_RADIUS_KM = 500.0
+
+
+def extract_coordinates(location):
+    """Return ``(latitude, longitude)`` from an event location payload.
+
+    Venues are stored as ``{"name", "address", "city", "latitude", "longitude"}``;
+    a nested ``coordinates`` object is accepted as well. Missing or invalid
+    values yield ``(None, None)``.
+    """
+    if not isinstance(location, dict):
+        return None, None
+
+    source = location.get('coordinates') if isinstance(location.get('coordinates'), dict) else location
+    lat = source.get('latitude', source.get('lat'))
+    lng = source.get('longitude', source.get('lng'))
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None, None
+
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None, None
+    return lat, lng
+
+
+def parse_near(value, radius=None):
+    """Parse ``near=lat,lng`` and ``radius`` (km) query params.
+
+    Raises ``ValueError`` with a user-facing message on bad input.
+    """
+    try:
+        lat, lng = (float(part) for part in value.split(','))
+    except (AttributeError, ValueError):
+        raise ValueError("'near' must be formatted as 'lat,lng'")
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError("'near' coordinates are out of range")
+
+    if radius in (None, ''):
+        radius = DEFAULT_RADIUS_KM
+    try:
+        radius = float(radius)
+    except (TypeError, ValueError):
+        raise ValueError("'radius' must be a number of kilometres")
+    if not 0 < radius <= MAX_RADIUS_KM:
+        raise ValueError(f"'radius' must be between 0 and {MAX_RADIUS_KM:g} km")
+    return lat, lng, radius
+
+
+def bounding_box(lat, lng, radius_km):
+    """Return ``(min_lat, max_lat, min_lng, max_lng)`` enclosing the radius.
+
+    The box is used as an index-friendly pre-filter on the latitude/longitude
+    B-tree index before the exact distance is computed.
+    """
+    delta_lat = radius_km / KM_PER_DEGREE_LATITUDE
+    cos_lat = math.cos(math.radians(lat))
+    if cos_lat < 1e-6:
+        delta_lng = 180.0
+    else:
+        delta_lng = min(radius_km / (KM_PER_DEGREE_LATITUDE * cos_lat), 180.0)
+    return (
+        max(lat - delta_lat, -90.0),
+        min(lat + delta_lat, 90.0),
+        max(lng - delta_lng, -180.0),
+        min(lng + delta_lng, 180.0),
+    )
+
+
+def haversine_distance(lat, lng):
+    """Database expression for the great-circle distance (km) to a point."""
+    lat_rad = Value(math.radians(lat), output_field=FloatField())
+    lng_rad = Value(math.radians(lng), output_field=FloatField())
+    half_dlat = (Radians(F('latitude')) - lat_rad) / 2
+    half_dlng = (Radians(F('longitude')) - lng_rad) / 2
+    a = (
+        Power(Sin(half_dlat), 2)
+        + Cos(lat_rad) * Cos(Radians(F('latitude'))) * Power(Sin(half_dlng), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a))
+
+
+def filter_near(queryset, lat, lng, radius_km):
+    """Restrict ``queryset`` to events within ``radius_km``, nearest first."""
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    return queryset.filter(
+        latitude__range=(min_lat, max_lat),
+        longitude__range=(min_lng, max_lng),
+    ).annotate(
+        distance=haversine_distance(lat, lng)
+    ).filter(
+        distance__lte=radius_km
+    ).order_by('distance')
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from hoy.counters import reconcile
+from events.models import Event, EventInteraction
+from gallery.models import Gallery, Image, ImageLike, ImageDownload
+from feedback.models import Survey, SurveyResponse
+
+# (model, counter field, related model, foreign key on related model, filters)
+COUNTERS = [
+    (Event, 'interested_count', EventInteraction, 'event', {'interested': True}),
+    (Event, 'going_count', EventInteraction, 'event', {'going': True}),
+    (Gallery, 'images_count', Image, 'gallery', {}),
+    (Image, 'likes_count', ImageLike, 'image', {}),
+    (Image, 'downloads_count', ImageDownload, 'image', {}),
+    (Survey, 'responses_count', SurveyResponse, 'survey', {}),
+]
+
+class Command(BaseCommand):
+    help = 'Recompute denormalized counter columns and repair any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted rows without fixing them'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        total = 0
+
+        for model, field, related_model, fk, filters in COUNTERS:
+            with transaction.atomic():
+                drifted = reconcile(model, field, related_model, fk, dry_run=dry_run, **filters)
+            total += drifted
+            self.stdout.write(f'{model.__name__}.{field}: {drifted} drifted')
+
+        verb = 'Found' if dry_run else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {total} drifted counter(s)'))
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Frozen copy of events.geo.extract_coordinates as of this migration, so
+# later changes to that module can't alter (or break) the backfill
+def extract_coordinates(location):
+    if not isinstance(location, dict):
+        return None, None
+
+    source = location.get('coordinates') if isinstance(location.get('coordinates'), dict) else location
+    lat = source.get('latitude', source.get('lat'))
+    lng = source.get('longitude', source.get('lng'))
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None, None
+
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None, None
+    return lat, lng
+
+
+def backfill_coordinates(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    batch = []
+    for event in Event.objects.only('id', 'location').iterator(chunk_size=500):
+        event.latitude, event.longitude = extract_coordinates(event.location)
+        if event.latitude is not None:
+            batch.append(event)
+        if len(batch) >= 500:
+            Event.objects.bulk_update(batch, ['latitude', 'longitude'])
+            batch = []
+    if batch:
+        Event.objects.bulk_update(batch, ['latitude', 'longitude'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_remove_event_category_remove_eventimage_event_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['latitude', 'longitude'], name='events_even_latitud_fbe0e6_idx'),
+        ),
+        migrations.RunPython(backfill_coordinates, migrations.RunPython.noop),
+    ]
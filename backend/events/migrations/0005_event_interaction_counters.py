@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:36
+
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    from hoy.counters import reconcile
+
+    Event = apps.get_model('events', 'Event')
+    EventInteraction = apps.get_model('events', 'EventInteraction')
+    reconcile(Event, 'interested_count', EventInteraction, 'event', interested=True)
+    reconcile(Event, 'going_count', EventInteraction, 'event', going=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_event_latitude_longitude'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='going_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='interested_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
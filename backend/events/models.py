@@ -2,20 +2,27 @@ from django.db import models
 from django.conf import settings
 from django.utils.text import slugify
 import uuid
+from .geo import extract_coordinates
+from hoy.counters import CounterFieldsMixin
+from hoy.thumbnails import DerivativesMixin
 
-class DJ(models.Model):
+class DJ(DerivativesMixin, models.Model):
     """Model for DJs performing at events."""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=100)
     artist_name = models.CharField(max_length=100, blank=True)
     bio = models.TextField()
     profile_image = models.ImageField(upload_to='dj_profiles/')
+    # Resized renditions of profile_image, see hoy.thumbnails
+    derivatives = models.JSONField(default=dict, blank=True, editable=False)
     genres = models.JSONField(default=list)
     social_media = models.JSONField(default=dict)
     website = models.URLField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    derivative_field = 'profile_image'
+
     class Meta:
         verbose_name = 'DJ'
         verbose_name_plural = 'DJs'
@@ -23,7 +30,7 @@ class DJ(models.Model):
     def __str__(self):
         return self.artist_name or self.name
 
-class Event(models.Model):
+class Event(CounterFieldsMixin, DerivativesMixin, models.Model):
     """Model for events/parties."""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     STATUS_CHOICES = [
@@ -39,7 +46,12 @@ class Event(models.Model):
     date = models.DateField()
     start_time = models.TimeField()
     location = models.JSONField()  # Stores venue details including coordinates
+    # Extracted from ``location`` on save so proximity queries can use an index
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
     featured_image = models.ImageField(upload_to='event_images/')
+    # Resized renditions of featured_image, see hoy.thumbnails
+    derivatives = models.JSONField(default=dict, blank=True, editable=False)
     gallery_images = models.JSONField(default=list)  # Stores multiple image URLs
     
     # Event details
@@ -55,6 +67,12 @@ class Event(models.Model):
     is_featured = models.BooleanField(default=False)
     is_private = models.BooleanField(default=False)
     
+    # Denormalized interaction counters, maintained by the interact action
+    interested_count = models.PositiveIntegerField(default=0, editable=False)
+    going_count = models.PositiveIntegerField(default=0, editable=False)
+    counter_fields = ('interested_count', 'going_count')
+    derivative_field = 'featured_image'
+    
     # Relationships
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -72,6 +90,7 @@ class Event(models.Model):
         indexes = [
             models.Index(fields=['date', 'start_time']),
             models.Index(fields=['status']),
+            models.Index(fields=['latitude', 'longitude']),
         ]
         ordering = ['-date', '-start_time']
 
@@ -81,6 +100,10 @@ class Event(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+        self.latitude, self.longitude = extract_coordinates(self.location)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'location' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'latitude', 'longitude'}
         super().save(*args, **kwargs)
 
     @property
@@ -1,30 +1,38 @@
 from rest_framework import serializers
+from hoy.thumbnails import SrcsetField
 from .models import Event, DJ, EventInteraction
 
 class DJSerializer(serializers.ModelSerializer):
+    profile_image_srcset = SrcsetField()
+
     class Meta:
         model = DJ
-        fields = '__all__'
+        exclude = ('derivatives',)
 
 class EventListSerializer(serializers.ModelSerializer):
     djs = DJSerializer(many=True, read_only=True)
     is_past = serializers.BooleanField(read_only=True)
+    # Only present when the list is filtered with ?near=lat,lng
+    distance = serializers.FloatField(read_only=True)
+    featured_image_srcset = SrcsetField()
     
     class Meta:
         model = Event
         fields = ('id', 'title', 'slug', 'date', 'start_time',
-                 'location', 'featured_image', 'djs', 'status', 'is_featured',
-                 'is_past', 'capacity', 'age_restriction')
+                 'location', 'featured_image', 'featured_image_srcset', 'djs',
+                 'status', 'is_featured', 'is_past', 'capacity',
+                 'age_restriction', 'distance')
 
 class EventDetailSerializer(serializers.ModelSerializer):
     djs = DJSerializer(many=True, read_only=True)
     is_past = serializers.BooleanField(read_only=True)
     created_by = serializers.StringRelatedField()
     user_interaction = serializers.SerializerMethodField()
+    featured_image_srcset = SrcsetField()
     
     class Meta:
         model = Event
-        fields = '__all__'
+        exclude = ('derivatives',)
         
     def get_user_interaction(self, obj):
         request = self.context.get('request')
@@ -1,21 +1,71 @@
-from django.db.models.signals import post_save, post_delete
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
+from hoy.counters import adjust
+from hoy.thumbnails import schedule_derivatives
 from .models import Event, DJ, EventInteraction
+from . import cache as event_cache
+
+
+def _invalidate_event_caches(event):
+    """Invalidate cached listings that may contain ``event``."""
+    namespaces = [event_cache.EVENT_LIST]
+    if event.is_featured or event_cache.is_featured_cached(event.pk):
+        namespaces.append(event_cache.EVENT_FEATURED)
+    # Defer until commit so a concurrent read can't re-cache stale rows
+    transaction.on_commit(lambda: event_cache.invalidate(*namespaces))
 
 
 @receiver(post_save, sender=Event)
 def event_saved(sender, instance, created, **kwargs):
     """Handle post-save actions for events."""
-    pass  # Add any necessary post-save logic here
+    schedule_derivatives(instance)
+    _invalidate_event_caches(instance)
+
+
+@receiver(post_delete, sender=Event)
+def event_deleted(sender, instance, **kwargs):
+    """Handle post-delete actions for events."""
+    _invalidate_event_caches(instance)
+
+
+@receiver(m2m_changed, sender=Event.djs.through)
+def event_djs_changed(sender, instance, action, **kwargs):
+    """Event listings embed their DJs, so lineup changes invalidate them."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if isinstance(instance, Event):
+        _invalidate_event_caches(instance)
+    else:
+        transaction.on_commit(lambda: event_cache.invalidate(
+            event_cache.EVENT_LIST, event_cache.EVENT_FEATURED
+        ))
 
 
 @receiver(post_save, sender=DJ)
 def dj_saved(sender, instance, created, **kwargs):
     """Handle post-save actions for DJs."""
-    pass  # Add any necessary post-save logic here
+    schedule_derivatives(instance)
+    # A new DJ isn't attached to any event yet
+    if created or not instance.events.exists():
+        return
+    namespaces = [event_cache.EVENT_LIST]
+    if instance.events.filter(is_featured=True).exists():
+        namespaces.append(event_cache.EVENT_FEATURED)
+    transaction.on_commit(lambda: event_cache.invalidate(*namespaces))
 
 
 @receiver(post_save, sender=EventInteraction)
 def event_interaction_saved(sender, instance, created, **kwargs):
     """Handle post-save actions for event interactions."""
-    pass  # Add any necessary post-save logic here
+    pass  # Counters are adjusted with the known delta in EventViewSet.interact
+
+
+@receiver(post_delete, sender=EventInteraction)
+def event_interaction_deleted(sender, instance, **kwargs):
+    """Keep the event interaction counters in sync."""
+    adjust(
+        Event, instance.event_id, touch=True,
+        interested_count=-int(instance.interested),
+        going_count=-int(instance.going),
+    )
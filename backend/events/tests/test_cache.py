@@ -0,0 +1,143 @@
+import time
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import status
+from events.models import Event
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    settings.CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    }
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def featured_event():
+    return Event.objects.create(
+        title='Featured Event',
+        description='Test Description',
+        date=timezone.now().date(),
+        start_time=timezone.now().time(),
+        location={'name': 'Test Venue'},
+        featured_image='event_images/test.jpg',
+        capacity=100,
+        status='published',
+        is_featured=True,
+    )
+
+
+@pytest.mark.django_db
+class TestEventResponseCache:
+    def test_featured_is_cached(self, authenticated_client, featured_event, django_assert_num_queries):
+        url = reverse('event-featured')
+        first = authenticated_client.get(url)
+        assert first.status_code == status.HTTP_200_OK
+        assert first['ETag']
+
+        # Only the JWT user lookup hits the database on a cache hit
+        with django_assert_num_queries(1):
+            second = authenticated_client.get(url)
+        assert second.data == first.data
+
+    def test_conditional_get_returns_304(self, authenticated_client, featured_event):
+        url = reverse('event-featured')
+        etag = authenticated_client.get(url)['ETag']
+
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_list_key_includes_query_params(self, authenticated_client, featured_event):
+        url = reverse('event-list')
+        assert len(authenticated_client.get(url).data) == 1
+        assert len(authenticated_client.get(url, {'upcoming': 'false'}).data) == 0
+
+    def test_unfeatured_event_is_not_hidden_by_if_modified_since(
+        self, authenticated_client, featured_event, django_capture_on_commit_callbacks
+    ):
+        url = reverse('event-featured')
+        assert 'Last-Modified' not in authenticated_client.get(url)
+        since = http_date(time.time() + 60)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            featured_event.is_featured = False
+            featured_event.save()
+
+        response = authenticated_client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == []
+
+    def test_event_save_invalidates(self, authenticated_client, featured_event, django_capture_on_commit_callbacks):
+        url = reverse('event-featured')
+        authenticated_client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            featured_event.title = 'Renamed Event'
+            featured_event.save()
+
+        response = authenticated_client.get(url)
+        assert response.data[0]['title'] == 'Renamed Event'
+
+    def test_unfeaturing_invalidates(self, authenticated_client, featured_event, django_capture_on_commit_callbacks):
+        url = reverse('event-featured')
+        authenticated_client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            featured_event.is_featured = False
+            featured_event.save()
+
+        assert authenticated_client.get(url).data == []
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    def test_retrieve_returns_304_until_changed(self, authenticated_client, featured_event):
+        url = reverse('event-detail', kwargs={'pk': featured_event.id})
+        first = authenticated_client.get(url)
+        assert first.status_code == status.HTTP_200_OK
+        etag = first['ETag']
+
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        featured_event.capacity = 150
+        featured_event.save()
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+
+    def test_staff_list_skips_serialization_when_current(self, staff_client, featured_event, django_assert_num_queries):
+        url = reverse('event-list')
+        etag = staff_client.get(url)['ETag']
+
+        # JWT user lookup plus the single validator aggregate
+        with django_assert_num_queries(2):
+            response = staff_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_deletions_are_not_hidden_by_if_modified_since(self, staff_client, featured_event):
+        url = reverse('event-list')
+        first = staff_client.get(url)
+        assert 'Last-Modified' not in first
+        since = http_date(time.time() + 60)
+
+        Event.objects.create(
+            title='Older Event',
+            description='Test Description',
+            date=featured_event.date,
+            start_time=featured_event.start_time,
+            location={'name': 'Test Venue'},
+            featured_image='event_images/test.jpg',
+            capacity=100,
+        )
+        Event.objects.filter(pk=featured_event.pk).delete()
+        response = staff_client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        assert response.status_code == status.HTTP_200_OK
+        assert [event['title'] for event in response.data] == ['Older Event']
@@ -0,0 +1,69 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from events.models import Event
+from events.geo import extract_coordinates, parse_near, bounding_box
+
+
+class TestGeoHelpers:
+    def test_extract_coordinates(self):
+        assert extract_coordinates({'latitude': 39.47, 'longitude': -0.38}) == (39.47, -0.38)
+        assert extract_coordinates({'coordinates': {'lat': '39.47', 'lng': '-0.38'}}) == (39.47, -0.38)
+        assert extract_coordinates({'name': 'Venue'}) == (None, None)
+        assert extract_coordinates({'latitude': 120, 'longitude': 0}) == (None, None)
+        assert extract_coordinates('Test Venue') == (None, None)
+
+    def test_parse_near(self):
+        assert parse_near('39.47,-0.38', '5') == (39.47, -0.38, 5.0)
+        assert parse_near('39.47,-0.38')[2] == 10.0
+        with pytest.raises(ValueError):
+            parse_near('39.47')
+        with pytest.raises(ValueError):
+            parse_near('39.47,-0.38', '-1')
+
+    def test_bounding_box_contains_point(self):
+        min_lat, max_lat, min_lng, max_lng = bounding_box(39.47, -0.38, 10)
+        assert min_lat < 39.47 < max_lat
+        assert min_lng < -0.38 < max_lng
+
+
+@pytest.mark.django_db
+class TestNearbyEvents:
+    def make_event(self, title, latitude, longitude):
+        return Event.objects.create(
+            title=title,
+            description='Test Description',
+            date=timezone.now().date(),
+            start_time=timezone.now().time(),
+            location={'name': title, 'latitude': latitude, 'longitude': longitude},
+            featured_image='event_images/test.jpg',
+            capacity=100,
+            status='published',
+        )
+
+    def test_coordinates_extracted_on_save(self):
+        event = self.make_event('Valencia', 39.4699, -0.3763)
+        assert (event.latitude, event.longitude) == (39.4699, -0.3763)
+
+        event.location = {'name': 'Unknown'}
+        event.save(update_fields=['location'])
+        event.refresh_from_db()
+        assert event.latitude is None
+
+    def test_near_filter_orders_by_distance(self, authenticated_client):
+        self.make_event('Far', 39.52, -0.40)
+        self.make_event('Near', 39.47, -0.377)
+        self.make_event('Madrid', 40.4168, -3.7038)
+
+        url = reverse('event-list')
+        response = authenticated_client.get(url, {'near': '39.4699,-0.3763', 'radius': '20'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [e['title'] for e in response.data] == ['Near', 'Far']
+        assert response.data[0]['distance'] < response.data[1]['distance']
+
+    def test_near_filter_rejects_bad_input(self, authenticated_client):
+        url = reverse('event-list')
+        response = authenticated_client.get(url, {'near': 'valencia'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,39 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from events.models import Event
+
+
+@pytest.fixture
+def event():
+    return Event.objects.create(
+        title='Warehouse Night',
+        description='Test Description',
+        date=timezone.now().date(),
+        start_time=timezone.now().time(),
+        location={'name': 'Test Venue'},
+        capacity=100,
+        status='published',
+    )
+
+
+@pytest.mark.django_db
+class TestInteract:
+    def test_repeated_requests_count_once(self, staff_client, event):
+        url = reverse('event-interact', args=[event.pk])
+        with CaptureQueriesContext(connection) as queries:
+            staff_client.post(url, {'interested': True}, format='json')
+        # The interaction row is locked before its old state is read
+        assert any(
+            'FOR UPDATE' in query['sql'] and 'events_eventinteraction' in query['sql']
+            for query in queries.captured_queries
+        )
+        staff_client.post(url, {'interested': True}, format='json')
+        event.refresh_from_db()
+        assert (event.interested_count, event.going_count) == (1, 0)
+
+        staff_client.post(url, {'interested': False, 'going': True}, format='json')
+        event.refresh_from_db()
+        assert (event.interested_count, event.going_count) == (0, 1)
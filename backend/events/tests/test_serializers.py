@@ -1,6 +1,4 @@
 import pytest
-from django.contrib.auth import get_user_model
-from events.models import Event, DJ, EventInteraction
 from events.serializers import (
     EventListSerializer,
     EventDetailSerializer,
@@ -8,166 +6,84 @@ from events.serializers import (
     DJSerializer,
     EventInteractionSerializer
 )
+from events.models import EventInteraction
 from django.utils import timezone
 from datetime import timedelta
 
-User = get_user_model()
 
 @pytest.mark.django_db
 class TestEventSerializer:
-    @pytest.fixture
-    def user(self):
-        return User.objects.create_user(
-            email='test@example.com',
-            password='testpass123'
-        )
-
-    @pytest.fixture
-    def dj(self, user):
-        return DJ.objects.create(
-            user=user,
-            stage_name='DJ Test',
-            bio='Test bio'
-        )
-
-    @pytest.fixture
-    def event_data(self, dj):
-        return {
-            'title': 'Test Event',
-            'description': 'Test Description',
-            'dj': str(dj.id),
-            'date': (timezone.now().date() + timedelta(days=1)).isoformat(),
-            'start_time': timezone.now().time().isoformat(),
-            'venue': 'Test Venue',
-            'capacity': 100,
-            'price': '50.00',
-            'status': 'SCHEDULED'
-        }
+    def test_serialize_event(self, event):
+        data = EventListSerializer(event).data
 
-    def test_serialize_event(self, dj):
-        event = Event.objects.create(
-            title='Test Event',
-            description='Test Description',
-            dj=dj,
-            date=timezone.now().date() + timedelta(days=1),
-            start_time=timezone.now().time(),
-            venue='Test Venue',
-            capacity=100,
-            price=50.00,
-            status='SCHEDULED'
-        )
-        
-        serializer = EventListSerializer(event)
-        data = serializer.data
-        
         assert data['title'] == 'Test Event'
+        assert data['location'] == {'name': 'Test Venue'}
+        assert data['capacity'] == 100
+        assert data['djs'][0]['artist_name'] == 'DJ Test'
+        assert data['is_past'] is False
+        assert 'description' not in data
+
+    def test_detail_hides_derivatives(self, event):
+        data = EventDetailSerializer(event).data
         assert data['description'] == 'Test Description'
-        assert data['venue'] == 'Test Venue'
-        assert float(data['price']) == 50.00
+        assert 'derivatives' not in data
+        assert data['user_interaction'] is None
 
-    def test_deserialize_event(self, event_data):
-        serializer = EventCreateUpdateSerializer(data=event_data)
-        assert serializer.is_valid()
+    def test_deserialize_event(self, dj, upload):
+        serializer = EventCreateUpdateSerializer(data={
+            'title': 'New Event',
+            'description': 'New Description',
+            'date': (timezone.now().date() + timedelta(days=1)).isoformat(),
+            'start_time': '22:00:00',
+            'location': {'name': 'New Venue', 'latitude': 39.47, 'longitude': -0.38},
+            'featured_image': upload(),
+            'djs': [str(dj.id)],
+            'capacity': 200,
+        })
+        assert serializer.is_valid(), serializer.errors
         event = serializer.save()
-        assert event.title == event_data['title']
-        assert event.venue == event_data['venue']
-        assert float(event.price) == float(event_data['price'])
+        assert event.slug == 'new-event'
+        assert (event.latitude, event.longitude) == (39.47, -0.38)
+        assert list(event.djs.all()) == [dj]
+
 
 @pytest.mark.django_db
 class TestDJSerializer:
-    @pytest.fixture
-    def user(self):
-        return User.objects.create_user(
-            email='dj@example.com',
-            password='testpass123'
-        )
-
-    @pytest.fixture
-    def dj_data(self, user):
-        return {
-            'user': str(user.id),
-            'stage_name': 'DJ Test',
-            'bio': 'Test bio',
-            'genre_specialization': ['House', 'Techno'],
-            'years_of_experience': 5
-        }
+    def test_serialize_dj(self, dj):
+        data = DJSerializer(dj).data
 
-    def test_serialize_dj(self, user):
-        dj = DJ.objects.create(
-            user=user,
-            stage_name='DJ Test',
-            bio='Test bio',
-            genre_specialization=['House', 'Techno']
-        )
-        
-        serializer = DJSerializer(dj)
-        data = serializer.data
-        
-        assert data['stage_name'] == 'DJ Test'
+        assert data['artist_name'] == 'DJ Test'
         assert data['bio'] == 'Test bio'
-        assert data['genre_specialization'] == ['House', 'Techno']
+        assert data['genres'] == ['House', 'Techno']
+        assert 'derivatives' not in data
 
-    def test_deserialize_dj(self, dj_data):
-        serializer = DJSerializer(data=dj_data)
-        assert serializer.is_valid()
+    def test_deserialize_dj(self, dj_data, upload):
+        serializer = DJSerializer(data={**dj_data, 'profile_image': upload()})
+        assert serializer.is_valid(), serializer.errors
         dj = serializer.save()
-        assert dj.stage_name == dj_data['stage_name']
-        assert dj.genre_specialization == dj_data['genre_specialization']
+        assert dj.artist_name == dj_data['artist_name']
+        assert dj.genres == dj_data['genres']
+
 
 @pytest.mark.django_db
 class TestEventInteractionSerializer:
-    @pytest.fixture
-    def user(self):
-        return User.objects.create_user(
-            email='test@example.com',
-            password='testpass123'
-        )
-
-    @pytest.fixture
-    def dj(self, user):
-        return DJ.objects.create(
-            user=user,
-            stage_name='DJ Test'
-        )
-
-    @pytest.fixture
-    def event(self, dj):
-        return Event.objects.create(
-            title='Test Event',
-            description='Test Description',
-            dj=dj,
-            date=timezone.now().date() + timedelta(days=1),
-            start_time=timezone.now().time(),
-            venue='Test Venue',
-            capacity=100,
-            price=50.00,
-            status='SCHEDULED'
-        )
-
-    @pytest.fixture
-    def interaction_data(self, user, event):
-        return {
-            'user': str(user.id),
-            'event': str(event.id),
-            'interaction_type': 'INTERESTED'
-        }
-
     def test_serialize_interaction(self, user, event):
         interaction = EventInteraction.objects.create(
             user=user,
             event=event,
-            interaction_type='INTERESTED'
+            interested=True
         )
-        
-        serializer = EventInteractionSerializer(interaction)
-        data = serializer.data
-        
-        assert data['interaction_type'] == 'INTERESTED'
-        assert data['user'] == str(user.id)
-        assert data['event'] == str(event.id)
 
-    def test_deserialize_interaction(self, interaction_data):
-        serializer = EventInteractionSerializer(data=interaction_data)
-        assert serializer.is_valid()
-        interaction = serializer.save()
-        assert interaction.interaction_type == interaction_data['interaction_type']
+        data = EventInteractionSerializer(interaction).data
+
+        assert data['interested'] is True
+        assert data['going'] is False
+        assert data['event'] == event.id
+        assert 'user' not in data
+
+    def test_deserialize_interaction(self, user, event):
+        serializer = EventInteractionSerializer(data={'event': str(event.id), 'going': True})
+        assert serializer.is_valid(), serializer.errors
+        interaction = serializer.save(user=user)
+        assert interaction.going
+        assert interaction.user == user
@@ -1,8 +1,11 @@
 from rest_framework import viewsets, permissions, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
+from django.db import transaction
+from django.db.models import Count, Max
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.authentication import SessionAuthentication
 from .models import Event, DJ, EventInteraction
@@ -14,6 +17,10 @@ from .serializers import (
     EventInteractionSerializer
 )
 from .permissions import IsStaffOrReadOnly
+from hoy.mixins import ConditionalGetMixin
+from hoy.counters import adjust
+from .geo import parse_near, filter_near
+from . import cache as event_cache
 
 class DJViewSet(viewsets.ModelViewSet):
     queryset = DJ.objects.all()
@@ -22,7 +29,7 @@ class DJViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter]
     search_fields = ['name', 'artist_name', 'genres']
 
-class EventViewSet(viewsets.ModelViewSet):
+class EventViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Event.objects.all()
     permission_classes = [permissions.IsAuthenticated, IsStaffOrReadOnly]
     authentication_classes = [JWTAuthentication, SessionAuthentication]
@@ -30,6 +37,7 @@ class EventViewSet(viewsets.ModelViewSet):
     filterset_fields = ['status', 'is_featured', 'date']
     search_fields = ['title', 'description', 'djs__name', 'djs__artist_name']
     ordering_fields = ['date', 'created_at', 'title']
+    conditional_vary_on_user = True
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -53,27 +61,69 @@ class EventViewSet(viewsets.ModelViewSet):
                     queryset = queryset.filter(date__gte=today)
                 else:
                     queryset = queryset.filter(date__lt=today)
+
+            # Proximity search: ?near=lat,lng&radius=km (nearest first)
+            near = self.request.query_params.get('near', None)
+            if near is not None:
+                try:
+                    lat, lng, radius = parse_near(
+                        near, self.request.query_params.get('radius')
+                    )
+                except ValueError as e:
+                    raise ValidationError({'near': str(e)})
+                queryset = filter_near(queryset, lat, lng, radius)
         return queryset
     
     def list(self, request, *args, **kwargs):
         """Override list to ensure we always return an array of events"""
         queryset = self.filter_queryset(self.get_queryset())
-        page = self.paginate_queryset(queryset)
-        
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-            
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+
+        # Published-only listing is identical for every non-staff user
+        if not request.user.is_staff and self.paginator is None:
+            return event_cache.cached_response(
+                request,
+                event_cache.EVENT_LIST,
+                queryset,
+                lambda qs: self.get_serializer(qs, many=True).data,
+            )
+
+        def build_response():
+            page = self.paginate_queryset(queryset)
+
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+
+            serializer = self.get_serializer(queryset, many=True)
+            return Response(serializer.data)
+
+        return self.conditional_response(request, queryset, build_response)
+
+    def get_conditional_validators(self, queryset):
+        # Listings embed DJs, so DJ edits must change the validators too
+        validators = queryset.aggregate(
+            last_modified=Max('updated_at'),
+            djs_last_modified=Max('djs__updated_at'),
+            count=Count('pk', distinct=True),
+        )
+        if self.action == 'retrieve' and self.request.user.is_authenticated:
+            validators.update(EventInteraction.objects.filter(
+                event__in=queryset,
+                user=self.request.user
+            ).aggregate(interaction_last_modified=Max('updated_at')))
+        return validators
     
     @action(detail=True, methods=['post'])
+    @transaction.atomic
     def interact(self, request, pk=None):
         event = self.get_object()
-        interaction, created = EventInteraction.objects.get_or_create(
+        # Locked, so concurrent identical requests see each other's changes
+        # and the counters move once
+        interaction, created = EventInteraction.objects.select_for_update().get_or_create(
             user=request.user,
             event=event
         )
+        was_interested, was_going = interaction.interested, interaction.going
         
         serializer = EventInteractionSerializer(
             interaction,
@@ -84,6 +134,11 @@ class EventViewSet(viewsets.ModelViewSet):
         
         if serializer.is_valid():
             serializer.save()
+            adjust(
+                Event, event.pk, touch=True,
+                interested_count=int(interaction.interested) - int(was_interested),
+                going_count=int(interaction.going) - int(was_going),
+            )
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
@@ -101,8 +156,12 @@ class EventViewSet(viewsets.ModelViewSet):
             status='published',
             date__gte=timezone.now().date()
         )
-        serializer = EventListSerializer(featured_events, many=True)
-        return Response(serializer.data)
+        return event_cache.cached_response(
+            request,
+            event_cache.EVENT_FEATURED,
+            featured_events,
+            lambda qs: EventListSerializer(qs, many=True).data,
+        )
     
     @action(detail=False, methods=['get'])
     def recommended(self, request):
@@ -0,0 +1,244 @@
+"""Survey response analytics.
+
+Answers are aggregated per question, depending on its type:
+
+* ``multiple_choice``/``single_choice``: how often each option was picked
+  (every option of a list answer counts)
+* ``rating``: average and count of numeric answers
+* ``text``: number of answers
+
+Empty answers (``null``, ``""``, ``0``, ``false``, ``[]``, ``{}``) are
+ignored.
+
+Totals are kept in ``SurveyAnswerRollup`` rows, one per question plus one
+per picked option of choice questions, which ``feedback.signals`` adjusts
+by the difference every time a response is created, changed or deleted.
+Reading analytics is then a single query over a survey's rollups, however
+many responses it has. ``compute_rows`` recomputes the totals from the
+raw responses (one ``GROUP BY`` over ``jsonb_each`` on PostgreSQL, a
+streaming single pass in Python elsewhere) for ``rebuild_rollups`` and
+``check_rollups``.
+"""
+
+import json
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from .models import Survey, SurveyAnswerRollup, SurveyResponse
+
+CHOICE_TYPES = ('multiple_choice', 'single_choice')
+EMPTY_ANSWERS = ('null', '""', '0', 'false', '[]', '{}')
+OPTION_LENGTH = SurveyAnswerRollup._meta.get_field('option').max_length
+
+ROWS_SQL = f"""
+    SELECT answer.key,
+           LEFT(COALESCE(
+               choice.option,
+               CASE WHEN answer.key = ANY(%(choice_ids)s)
+                         AND jsonb_typeof(answer.value) <> 'array'
+                    THEN answer.value #>> '{{}}' END
+           ), {OPTION_LENGTH}) AS option,
+           COUNT(*) AS answers,
+           COUNT(*) FILTER (WHERE jsonb_typeof(answer.value) = 'number') AS numeric_answers,
+           SUM((answer.value #>> '{{}}')::numeric)
+               FILTER (WHERE jsonb_typeof(answer.value) = 'number') AS numeric_total
+    FROM {SurveyResponse._meta.db_table} AS response
+    CROSS JOIN LATERAL jsonb_each(
+        CASE WHEN jsonb_typeof(response.responses) = 'object'
+             THEN response.responses ELSE '{{}}'::jsonb END
+    ) AS answer
+    LEFT JOIN LATERAL jsonb_array_elements_text(
+        CASE WHEN answer.key = ANY(%(choice_ids)s) AND jsonb_typeof(answer.value) = 'array'
+             THEN answer.value ELSE '[]'::jsonb END
+    ) AS choice(option) ON TRUE
+    WHERE response.survey_id = %(survey_id)s
+      AND answer.key = ANY(%(question_ids)s)
+      AND answer.value NOT IN ({', '.join(f"'{value}'::jsonb" for value in EMPTY_ANSWERS)})
+    GROUP BY 1, 2
+"""
+
+
+def question_types(questions):
+    """``{question id: type}`` for a survey's ``questions`` list."""
+    return {str(question['id']): question['type'] for question in questions or []}
+
+
+def add_totals(rows, key, answers, numeric_answers, numeric_total):
+    """Add to the totals of ``key`` in a ``new_totals()`` mapping."""
+    row = rows[key]
+    row[0] += answers
+    row[1] += numeric_answers
+    row[2] += numeric_total
+
+
+def new_totals():
+    """Empty ``(question id, option) -> [answers, numeric answers, numeric sum]``."""
+    return defaultdict(lambda: [0, 0, Decimal(0)])
+
+
+def contributions(questions, responses):
+    """Totals one response adds, keyed by ``(question id, option)``.
+
+    ``option`` is the picked option for choice questions and ``''``
+    otherwise.
+    """
+    rows = new_totals()
+    if not isinstance(responses, dict):
+        return rows
+    for question_id, question_type in questions.items():
+        answer = responses.get(question_id)
+        if not answer:
+            continue
+        if question_type in CHOICE_TYPES:
+            for option in answer if isinstance(answer, list) else [answer]:
+                if option in (None, ''):
+                    continue
+                # Same text as PostgreSQL gives for non-string JSON values
+                option = option if isinstance(option, str) else json.dumps(option)
+                add_totals(rows, (question_id, option[:OPTION_LENGTH]), 1, 0, 0)
+        elif isinstance(answer, (int, float)) and not isinstance(answer, bool):
+            add_totals(rows, (question_id, ''), 1, 1, Decimal(str(answer)))
+        else:
+            add_totals(rows, (question_id, ''), 1, 0, 0)
+    return rows
+
+
+def compute_rows(survey):
+    """Recompute a survey's rollup totals from its raw responses."""
+    questions = question_types(survey.questions)
+    rows = new_totals()
+    if not questions:
+        return rows
+
+    if connection.vendor == 'postgresql':
+        params = {
+            'survey_id': survey.pk,
+            'question_ids': list(questions),
+            'choice_ids': [key for key, kind in questions.items() if kind in CHOICE_TYPES],
+        }
+        with connection.cursor() as cursor:
+            cursor.execute(ROWS_SQL, params)
+            for question_id, option, answers, numeric_answers, numeric_total in cursor:
+                if not option and questions[question_id] in CHOICE_TYPES:
+                    # Null or empty elements of a list answer
+                    continue
+                add_totals(rows, (question_id, option or ''), answers, numeric_answers,
+                     numeric_total or Decimal(0))
+        return rows
+
+    answers = SurveyResponse.objects.filter(survey=survey).values_list('responses', flat=True)
+    for response in answers.iterator(chunk_size=2000):
+        for key, values in contributions(questions, response).items():
+            add_totals(rows, key, *values)
+    return rows
+
+
+def format_analytics(questions, rows):
+    """Build the analytics payload from ``(question id, option)`` totals."""
+    analytics = {}
+    for question_id, question_type in questions.items():
+        if question_type in CHOICE_TYPES:
+            analytics[question_id] = {}
+        elif question_type == 'text':
+            analytics[question_id] = {'response_count': 0}
+
+    for (question_id, option), (answers, numeric_answers, numeric_total) in rows.items():
+        question_type = questions.get(question_id)
+        if question_type in CHOICE_TYPES:
+            if option and answers:
+                analytics[question_id][option] = answers
+        elif option:
+            # Left over from when the question was a choice question
+            continue
+        elif question_type == 'rating':
+            if numeric_answers:
+                analytics[question_id] = {
+                    'average': round(float(numeric_total) / numeric_answers, 2),
+                    'count': numeric_answers,
+                }
+        elif question_type == 'text':
+            analytics[question_id]['response_count'] = answers
+    return analytics
+
+
+def _stored_rows(survey):
+    rows = new_totals()
+    for question_id, option, *values in SurveyAnswerRollup.objects.filter(survey=survey).values_list(
+        'question_id', 'option', 'answers', 'numeric_answers', 'numeric_total'
+    ):
+        add_totals(rows, (question_id, option), *values)
+    return rows
+
+
+def survey_analytics(survey):
+    """Per-question analytics for ``survey``, keyed by question id."""
+    return format_analytics(question_types(survey.questions), _stored_rows(survey))
+
+
+def apply_response_change(survey_id, old_responses, new_responses):
+    """Adjust a survey's rollups by the difference between two responses."""
+    questions = question_types(
+        Survey.objects.filter(pk=survey_id).values_list('questions', flat=True).first()
+    )
+    if not questions:
+        return
+    delta = contributions(questions, new_responses)
+    for key, values in contributions(questions, old_responses).items():
+        add_totals(delta, key, *(-value for value in values))
+    apply_totals(survey_id, delta)
+
+
+def apply_totals(survey_id, delta):
+    """Add ``(question id, option)`` totals to a survey's rollups."""
+    for (question_id, option), (answers, numeric_answers, numeric_total) in delta.items():
+        if not (answers or numeric_answers or numeric_total):
+            continue
+        rollup = SurveyAnswerRollup.objects.filter(
+            survey_id=survey_id, question_id=question_id, option=option
+        )
+        updates = {
+            'answers': F('answers') + answers,
+            'numeric_answers': F('numeric_answers') + numeric_answers,
+            'numeric_total': F('numeric_total') + numeric_total,
+        }
+        if rollup.update(**updates) or answers < 0:
+            continue
+        try:
+            with transaction.atomic():
+                SurveyAnswerRollup.objects.create(
+                    survey_id=survey_id, question_id=question_id, option=option,
+                    answers=answers, numeric_answers=numeric_answers, numeric_total=numeric_total,
+                )
+        except IntegrityError:
+            # Created concurrently since the update
+            rollup.update(**updates)
+
+
+def rebuild_rollups(survey):
+    """Replace a survey's rollups with totals recomputed from its responses."""
+    with transaction.atomic():
+        SurveyAnswerRollup.objects.filter(survey=survey).delete()
+        SurveyAnswerRollup.objects.bulk_create([
+            SurveyAnswerRollup(
+                survey=survey, question_id=question_id, option=option,
+                answers=answers, numeric_answers=numeric_answers, numeric_total=numeric_total,
+            )
+            for (question_id, option), (answers, numeric_answers, numeric_total)
+            in compute_rows(survey).items()
+        ])
+
+
+def check_rollups(survey):
+    """Keys whose stored totals differ from the raw responses.
+
+    Returns ``{(question id, option): (stored, expected)}``.
+    """
+    stored, expected = _stored_rows(survey), compute_rows(survey)
+    empty = [0, 0, Decimal(0)]
+    return {
+        key: (stored.get(key, empty), expected.get(key, empty))
+        for key in set(stored) | set(expected)
+        if stored.get(key, empty) != expected.get(key, empty)
+    }
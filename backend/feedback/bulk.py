@@ -0,0 +1,196 @@
+"""Bulk ingestion of survey responses collected offline (kiosks, tablets).
+
+A sync uploads many responses to one survey at once. The survey's
+questions are compiled into a ``SurveyValidator`` once, every row is
+checked against it, and the valid rows are written with one
+``bulk_create`` (plus one ``bulk_update`` when existing responses are
+replaced). Each user answers a survey once (``unique_together (user,
+survey)``): by default a row for a user who already responded is
+skipped, so re-sending a batch is harmless; ``on_conflict='update'``
+replaces the stored answers instead.
+
+``bulk_create`` doesn't send signals, so the response counter and answer
+rollups are adjusted here, once per batch.
+"""
+
+import uuid
+from numbers import Number
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from hoy.counters import adjust
+from .analytics import CHOICE_TYPES, add_totals, apply_totals, contributions, new_totals, question_types
+from .models import Survey, SurveyResponse
+
+User = get_user_model()
+
+TEXT_MAX_LENGTH = 5000
+
+
+class SurveyValidator:
+    """Checks answers against a survey's questions, compiled once per survey.
+
+    Questions may declare ``options`` (choice questions), ``min``/``max``
+    (ratings) and ``required``.
+    """
+
+    def __init__(self, questions):
+        self.types = question_types(questions)
+        self.checks = {str(question['id']): self._compile(question) for question in questions}
+        self.required = [
+            str(question['id']) for question in questions if question.get('required')
+        ]
+
+    def _compile(self, question):
+        question_type = question['type']
+        if question_type in CHOICE_TYPES:
+            options = {str(option) for option in question.get('options') or ()}
+            multiple = question_type == 'multiple_choice'
+
+            def check(answer):
+                picked = answer if multiple and isinstance(answer, list) else [answer]
+                if not all(isinstance(option, (str, Number)) for option in picked):
+                    return 'Answer must be an option or a list of options.'
+                invalid = [option for option in picked if options and str(option) not in options]
+                if invalid:
+                    return f'Unknown option(s): {", ".join(map(str, invalid))}.'
+            return check
+
+        if question_type == 'rating':
+            low, high = question.get('min'), question.get('max')
+
+            def check(answer):
+                if isinstance(answer, bool) or not isinstance(answer, Number):
+                    return 'Rating must be a number.'
+                if (low is not None and answer < low) or (high is not None and answer > high):
+                    return f'Rating must be between {low} and {high}.'
+            return check
+
+        def check(answer):
+            if not isinstance(answer, str):
+                return 'Answer must be text.'
+            if len(answer) > TEXT_MAX_LENGTH:
+                return f'Answer must be at most {TEXT_MAX_LENGTH} characters.'
+        return check
+
+    def errors(self, answers):
+        """Errors per question id for one response, empty when valid."""
+        if not isinstance(answers, dict):
+            return {'responses': 'Responses must be an object keyed by question id.'}
+        errors = {}
+        for question_id, answer in answers.items():
+            check = self.checks.get(str(question_id))
+            if check is None:
+                errors[str(question_id)] = 'Unknown question.'
+            elif answer not in (None, ''):
+                error = check(answer)
+                if error:
+                    errors[str(question_id)] = error
+        for question_id in self.required:
+            if answers.get(question_id) in (None, '', []):
+                errors[question_id] = 'This question is required.'
+        return errors
+
+
+def _resolve_users(rows):
+    """Map each row to a user id, from ``user`` (id) or ``email``."""
+    ids, emails = set(), set()
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        try:
+            if row.get('user'):
+                ids.add(uuid.UUID(str(row['user'])))
+        except ValueError:
+            pass
+        if row.get('email'):
+            emails.add(str(row['email']).lower())
+    found = {}
+    if ids:
+        found.update({str(pk): pk for pk in User.objects.filter(pk__in=ids).values_list('pk', flat=True)})
+    if emails:
+        found.update({
+            email.lower(): pk
+            for pk, email in User.objects.filter(email__in=emails).values_list('pk', 'email')
+        })
+    return [
+        found.get(str(row.get('user') or '')) or found.get(str(row.get('email') or '').lower())
+        if isinstance(row, dict) else None
+        for row in rows
+    ]
+
+
+def ingest_responses(survey, rows, on_conflict='skip'):
+    """Validate and store ``rows`` for ``survey``.
+
+    Each row is ``{"user": <id>, "responses": {...}}`` (or ``"email"``
+    instead of ``"user"``). Returns one result per row with a ``status``
+    of ``created``, ``updated``, ``skipped`` or ``invalid``.
+    """
+    validator = SurveyValidator(survey.questions or [])
+    user_ids = _resolve_users(rows)
+    results = [{'index': index} for index in range(len(rows))]
+    pending = {}
+
+    for index, (row, user_id) in enumerate(zip(rows, user_ids)):
+        result = results[index]
+        if user_id is None:
+            result.update(status='invalid', errors={'user': 'Unknown user.'})
+            continue
+        errors = validator.errors(row.get('responses'))
+        if errors:
+            result.update(status='invalid', errors=errors)
+        elif user_id in pending:
+            result.update(status='skipped', errors={'user': 'Duplicate of an earlier row.'})
+        else:
+            pending[user_id] = (index, row['responses'])
+
+    with transaction.atomic():
+        existing = dict(
+            SurveyResponse.objects.select_for_update()
+            .filter(survey=survey, user_id__in=pending)
+            .values_list('user_id', 'pk')
+        )
+        to_create = [
+            SurveyResponse(survey=survey, user_id=user_id, responses=answers)
+            for user_id, (index, answers) in pending.items()
+            if user_id not in existing
+        ]
+        # Rows inserted concurrently since the lookup are ignored here
+        SurveyResponse.objects.bulk_create(to_create, ignore_conflicts=True)
+        created = set(
+            SurveyResponse.objects.filter(pk__in=[response.pk for response in to_create])
+            .values_list('user_id', flat=True)
+        )
+
+        replaced = {}
+        if on_conflict == 'update':
+            stored = SurveyResponse.objects.filter(pk__in=existing.values()).in_bulk()
+            for response in stored.values():
+                replaced[response.user_id] = response.responses
+                response.responses = pending[response.user_id][1]
+            SurveyResponse.objects.bulk_update(stored.values(), ['responses'])
+
+        questions = validator.types
+        delta = new_totals()
+        for user_id in created:
+            for key, values in contributions(questions, pending[user_id][1]).items():
+                add_totals(delta, key, *values)
+        for user_id, previous in replaced.items():
+            for key, values in contributions(questions, pending[user_id][1]).items():
+                add_totals(delta, key, *values)
+            for key, values in contributions(questions, previous).items():
+                add_totals(delta, key, *(-value for value in values))
+        apply_totals(survey.pk, delta)
+        adjust(Survey, survey.pk, responses_count=len(created))
+
+    for user_id, (index, _answers) in pending.items():
+        if user_id in created:
+            results[index]['status'] = 'created'
+        elif user_id in replaced:
+            results[index]['status'] = 'updated'
+        else:
+            results[index].update(
+                status='skipped', errors={'user': 'Already responded to this survey.'}
+            )
+    return results
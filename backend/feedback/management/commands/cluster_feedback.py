@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from feedback.models import Feedback
+from feedback.similarity import OPEN_STATUSES, cluster_feedback, mark_clusters
+
+
+class Command(BaseCommand):
+    help = 'Group near-duplicate feedback into clusters staff can respond to together'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=getattr(settings, 'FEEDBACK_SIMILARITY_THRESHOLD', 0.6),
+            help='Minimum estimated similarity (0-1) for two entries to count as duplicates'
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Include resolved and closed feedback'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report clusters without changing anything'
+        )
+
+    def handle(self, *args, **options):
+        feedback = Feedback.objects.all()
+        if not options['all']:
+            feedback = feedback.filter(status__in=OPEN_STATUSES)
+
+        duplicates = cluster_feedback(feedback, options['threshold'])
+        sizes = {}
+        for root_pk in duplicates.values():
+            sizes[root_pk] = sizes.get(root_pk, 1) + 1
+        subjects = dict(Feedback.objects.filter(pk__in=sizes).values_list('pk', 'subject'))
+        for root_pk, size in sorted(sizes.items(), key=lambda item: -item[1]):
+            self.stdout.write(f'{subjects[root_pk]} ({root_pk}): {size} entries')
+
+        if not options['dry_run']:
+            mark_clusters(feedback, duplicates)
+        verb = 'Found' if options['dry_run'] else 'Marked'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {len(duplicates)} duplicate(s) in {len(sizes)} cluster(s)'
+        ))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from feedback.analytics import check_rollups, rebuild_rollups
+from feedback.models import Survey
+
+
+def _totals(values):
+    answers, numeric_answers, numeric_total = values
+    return f'{answers} answers ({numeric_answers} numeric, sum {numeric_total:g})'
+
+
+class Command(BaseCommand):
+    help = 'Recompute survey answer rollups from the raw responses'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--survey',
+            help='Only this survey id'
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Report surveys whose rollups drifted without rebuilding them'
+        )
+
+    def handle(self, *args, **options):
+        surveys = Survey.objects.all()
+        if options['survey']:
+            surveys = surveys.filter(pk=options['survey'])
+
+        drifted = 0
+        for survey in surveys.iterator():
+            if options['check']:
+                mismatches = check_rollups(survey)
+                if mismatches:
+                    drifted += 1
+                    self.stdout.write(f'{survey.pk} ({survey.title}): {len(mismatches)} drifted total(s)')
+                    for (question_id, option), (stored, expected) in sorted(mismatches.items()):
+                        self.stdout.write(
+                            f'  question {question_id} {option!r}: '
+                            f'stored {_totals(stored)}, expected {_totals(expected)}'
+                        )
+            else:
+                rebuild_rollups(survey)
+
+        if options['check']:
+            self.stdout.write(self.style.SUCCESS(f'Found {drifted} survey(s) with drifted rollups'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt rollups for {surveys.count()} survey(s)'))
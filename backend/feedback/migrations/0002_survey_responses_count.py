@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:36
+
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    from hoy.counters import reconcile
+
+    Survey = apps.get_model('feedback', 'Survey')
+    SurveyResponse = apps.get_model('feedback', 'SurveyResponse')
+    reconcile(Survey, 'responses_count', SurveyResponse, 'survey')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='survey',
+            name='responses_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
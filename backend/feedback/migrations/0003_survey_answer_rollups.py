@@ -0,0 +1,95 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:22
+
+import json
+from collections import defaultdict
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copies of the feedback.analytics helpers as of this migration, so
+# later changes to that module can't alter (or break) the backfill
+CHOICE_TYPES = ('multiple_choice', 'single_choice')
+OPTION_LENGTH = 255
+
+
+def question_types(questions):
+    return {str(question['id']): question['type'] for question in questions or []}
+
+
+def add_totals(rows, key, answers, numeric_answers, numeric_total):
+    row = rows[key]
+    row[0] += answers
+    row[1] += numeric_answers
+    row[2] += numeric_total
+
+
+def new_totals():
+    return defaultdict(lambda: [0, 0, Decimal(0)])
+
+
+def contributions(questions, responses):
+    rows = new_totals()
+    if not isinstance(responses, dict):
+        return rows
+    for question_id, question_type in questions.items():
+        answer = responses.get(question_id)
+        if not answer:
+            continue
+        if question_type in CHOICE_TYPES:
+            for option in answer if isinstance(answer, list) else [answer]:
+                if option in (None, ''):
+                    continue
+                option = option if isinstance(option, str) else json.dumps(option)
+                add_totals(rows, (question_id, option[:OPTION_LENGTH]), 1, 0, 0)
+        elif isinstance(answer, (int, float)) and not isinstance(answer, bool):
+            add_totals(rows, (question_id, ''), 1, 1, Decimal(str(answer)))
+        else:
+            add_totals(rows, (question_id, ''), 1, 0, 0)
+    return rows
+
+
+def backfill_rollups(apps, schema_editor):
+    Survey = apps.get_model('feedback', 'Survey')
+    SurveyResponse = apps.get_model('feedback', 'SurveyResponse')
+    SurveyAnswerRollup = apps.get_model('feedback', 'SurveyAnswerRollup')
+    for survey in Survey.objects.only('pk', 'questions').iterator():
+        questions = question_types(survey.questions)
+        rows = new_totals()
+        answers = SurveyResponse.objects.filter(survey=survey).values_list('responses', flat=True)
+        for response in answers.iterator():
+            for key, values in contributions(questions, response).items():
+                add_totals(rows, key, *values)
+        SurveyAnswerRollup.objects.bulk_create([
+            SurveyAnswerRollup(
+                survey=survey, question_id=question_id, option=option,
+                answers=answers, numeric_answers=numeric_answers, numeric_total=numeric_total,
+            )
+            for (question_id, option), (answers, numeric_answers, numeric_total) in rows.items()
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0002_survey_responses_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SurveyAnswerRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_id', models.CharField(max_length=50)),
+                ('option', models.CharField(blank=True, max_length=255)),
+                ('answers', models.IntegerField(default=0)),
+                ('numeric_answers', models.IntegerField(default=0)),
+                ('numeric_total', models.DecimalField(decimal_places=4, default=0, max_digits=20)),
+                ('survey', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answer_rollups', to='feedback.survey')),
+            ],
+            options={
+                'unique_together': {('survey', 'question_id', 'option')},
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
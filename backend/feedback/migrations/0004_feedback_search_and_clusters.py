@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:41
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_image_derivatives'),
+        ('feedback', '0003_survey_answer_rollups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.TrigramExtension(),
+        migrations.AddField(
+            model_name='feedback',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='feedback.feedback'),
+        ),
+        migrations.AddField(
+            model_name='feedback',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('subject', config='english', weight='A'), '||', django.contrib.postgres.search.SearchVector('message', config='english', weight='B'), django.contrib.postgres.search.SearchConfig('english')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='feedback_search_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['subject'], name='feedback_subject_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['message'], name='feedback_message_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -1,10 +1,14 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from events.models import Event, DJ
+from hoy.counters import CounterFieldsMixin
 from django.utils import timezone
+import copy
 import uuid
 
-class Survey(models.Model):
+class Survey(CounterFieldsMixin, models.Model):
     """Model for creating and managing surveys."""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     SURVEY_TYPES = [
@@ -21,6 +25,8 @@ class Survey(models.Model):
     is_active = models.BooleanField(default=True)
     start_date = models.DateTimeField()
     end_date = models.DateTimeField()
+    # Denormalized counter, maintained by feedback.signals
+    responses_count = models.PositiveIntegerField(default=0, editable=False)
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -30,6 +36,8 @@ class Survey(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    counter_fields = ('responses_count',)
+
     class Meta:
         ordering = ['-created_at']
 
@@ -59,6 +67,30 @@ class SurveyResponse(models.Model):
     def __str__(self):
         return f"{self.user.email}'s response to {self.survey.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'responses' in instance.__dict__:
+            # Answers as stored, so saves can roll up just the difference
+            instance._stored_responses = copy.deepcopy(instance.responses)
+        return instance
+
+class SurveyAnswerRollup(models.Model):
+    """Running answer totals for a survey question, see feedback.analytics."""
+    survey = models.ForeignKey(Survey, on_delete=models.CASCADE, related_name='answer_rollups')
+    question_id = models.CharField(max_length=50)
+    # Picked option of a choice question, blank for other question types
+    option = models.CharField(max_length=255, blank=True)
+    answers = models.IntegerField(default=0)
+    numeric_answers = models.IntegerField(default=0)
+    numeric_total = models.DecimalField(max_digits=20, decimal_places=4, default=0)
+
+    class Meta:
+        unique_together = ('survey', 'question_id', 'option')
+
+    def __str__(self):
+        return f"{self.survey_id} {self.question_id} {self.option}".strip()
+
 class Feedback(models.Model):
     """Model for general user feedback and suggestions."""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -91,22 +123,44 @@ class Feedback(models.Model):
         related_name='feedback',
         to_field='id'
     )
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('in_progress', 'In Progress'),
+        ('resolved', 'Resolved'),
+        ('closed', 'Closed'),
+    ]
+
     rating = models.PositiveSmallIntegerField(null=True, blank=True)
-    status = models.CharField(
-        max_length=20,
-        choices=[
-            ('pending', 'Pending'),
-            ('in_progress', 'In Progress'),
-            ('resolved', 'Resolved'),
-            ('closed', 'Closed'),
-        ],
-        default='pending'
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    # Earliest feedback of its near-duplicate cluster, see feedback.similarity
+    duplicate_of = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='duplicates'
+    )
+    # Maintained by PostgreSQL for ranked search, see feedback.search
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('subject', weight='A', config='english')
+            + SearchVector('message', weight='B', config='english')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='feedback_search_gin'),
+            # Typo-tolerant fallback lookups (pg_trgm)
+            GinIndex(fields=['subject'], name='feedback_subject_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['message'], name='feedback_message_trgm', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return f"{self.user.email} - {self.subject}"
@@ -0,0 +1,49 @@
+"""Ranked full-text search over feedback.
+
+``Feedback.search_vector`` is a generated ``tsvector`` over the subject
+(weight A) and message (weight B) with a GIN index, so a search is an
+index lookup ranked with ``ts_rank`` instead of an ``ILIKE`` scan of
+every row. The ``search`` parameter accepts web search syntax
+(``"exact phrase"``, ``or``, ``-excluded``).
+
+When no feedback matches the words as typed, which is usually a typo,
+the search falls back to trigram word similarity on the subject and
+message (``pg_trgm``, also GIN-indexed), ranked by how close the best
+match is.
+"""
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from rest_framework import filters
+
+SEARCH_CONFIG = 'english'
+
+
+def search_feedback(queryset, text):
+    """Feedback in ``queryset`` matching ``text``, best matches first."""
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+    matches = queryset.filter(search_vector=query)
+    if matches.exists():
+        return matches.annotate(
+            rank=SearchRank(F('search_vector'), query)
+        ).order_by('-rank', '-created_at')
+
+    return queryset.filter(
+        Q(subject__trigram_word_similar=text) | Q(message__trigram_word_similar=text)
+    ).annotate(
+        rank=Greatest(
+            TrigramWordSimilarity(text, 'subject'),
+            TrigramWordSimilarity(text, 'message'),
+        )
+    ).order_by('-rank', '-created_at')
+
+
+class FeedbackSearchFilter(filters.SearchFilter):
+    """``?search=`` backed by ``search_feedback`` instead of ``search_fields``."""
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').replace('\x00', '').strip()
+        if not text:
+            return queryset
+        return search_feedback(queryset, text)
@@ -1,10 +1,10 @@
 from rest_framework import serializers
 from .models import Survey, SurveyResponse, Feedback, FeedbackResponse
+from .analytics import survey_analytics
 from django.utils import timezone
 from datetime import timedelta
 
 class SurveySerializer(serializers.ModelSerializer):
-    responses_count = serializers.SerializerMethodField()
     has_user_responded = serializers.SerializerMethodField()
     
     class Meta:
@@ -12,9 +12,6 @@ class SurveySerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('created_by',)
     
-    def get_responses_count(self, obj):
-        return obj.responses.count()
-    
     def get_has_user_responded(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
@@ -65,8 +62,9 @@ class FeedbackSerializer(serializers.ModelSerializer):
         model = Feedback
         fields = ('id', 'user', 'user_name', 'feedback_type', 'subject',
                  'message', 'event', 'event_title', 'dj', 'dj_name',
-                 'rating', 'status', 'created_at', 'updated_at', 'responses')
-        read_only_fields = ('user', 'status')
+                 'rating', 'status', 'duplicate_of', 'created_at', 'updated_at',
+                 'responses')
+        read_only_fields = ('user', 'status', 'duplicate_of')
 
     def create(self, validated_data):
         request = self.context.get('request')
@@ -88,34 +86,4 @@ class SurveyAnalyticsSerializer(serializers.ModelSerializer):
     
     def get_response_data(self, obj):
         """Aggregate and analyze survey responses."""
-        responses = obj.responses.all()
-        questions = obj.questions
-        analytics = {}
-        
-        for question in questions:
-            question_id = question['id']
-            question_type = question['type']
-            answers = [
-                response.responses.get(str(question_id))
-                for response in responses
-                if response.responses.get(str(question_id))
-            ]
-            
-            if question_type in ['multiple_choice', 'single_choice']:
-                # Count frequency of each option
-                from collections import Counter
-                analytics[question_id] = dict(Counter(answers))
-            elif question_type == 'rating':
-                # Calculate average rating
-                if answers:
-                    analytics[question_id] = {
-                        'average': sum(answers) / len(answers),
-                        'count': len(answers)
-                    }
-            elif question_type == 'text':
-                # Just count number of responses
-                analytics[question_id] = {
-                    'response_count': len(answers)
-                }
-        
-        return analytics
+        return survey_analytics(obj)
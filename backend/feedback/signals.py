@@ -1,9 +1,61 @@
-from django.db.models.signals import post_save
+import copy
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from django.core.mail import send_mail
 from django.conf import settings
-from django.template.loader import render_to_string
-from .models import Feedback, FeedbackResponse
+from hoy.counters import adjust
+from notifications.outbox import queue_email
+from . import statistics
+from .analytics import apply_response_change, rebuild_rollups
+from .models import Survey, SurveyResponse, Feedback, FeedbackResponse
+
+@receiver(pre_save, sender=SurveyResponse)
+def survey_response_saving(sender, instance, **kwargs):
+    """Load the stored answers of instances that weren't read from the database."""
+    if not instance._state.adding and not hasattr(instance, '_stored_responses'):
+        instance._stored_responses = SurveyResponse.objects.filter(
+            pk=instance.pk
+        ).values_list('responses', flat=True).first()
+
+@receiver(post_save, sender=SurveyResponse)
+def survey_response_saved(sender, instance, created, update_fields=None, **kwargs):
+    """Keep the survey response counter and answer rollups in sync."""
+    if created:
+        adjust(Survey, instance.survey_id, responses_count=1)
+    if update_fields is not None and 'responses' not in update_fields:
+        return
+    previous = None if created else getattr(instance, '_stored_responses', None)
+    apply_response_change(instance.survey_id, previous, instance.responses)
+    instance._stored_responses = copy.deepcopy(instance.responses)
+
+@receiver(post_delete, sender=SurveyResponse)
+def survey_response_deleted(sender, instance, **kwargs):
+    """Keep the survey response counter and answer rollups in sync."""
+    adjust(Survey, instance.survey_id, responses_count=-1)
+    apply_response_change(
+        instance.survey_id, getattr(instance, '_stored_responses', instance.responses), None
+    )
+
+@receiver(pre_save, sender=Survey)
+def survey_saving(sender, instance, **kwargs):
+    """Note whether the questions are being changed."""
+    instance._questions_changed = not instance._state.adding and Survey.objects.filter(
+        pk=instance.pk
+    ).exclude(questions=instance.questions).exists()
+
+@receiver(post_save, sender=Survey)
+def survey_saved(sender, instance, created, **kwargs):
+    """Recompute answer rollups when question types may have changed."""
+    if getattr(instance, '_questions_changed', False):
+        rebuild_rollups(instance)
+
+@receiver(post_save, sender=Feedback)
+@receiver(post_delete, sender=Feedback)
+@receiver(post_save, sender=FeedbackResponse)
+@receiver(post_delete, sender=FeedbackResponse)
+def feedback_changed(sender, instance, **kwargs):
+    """Drop cached statistics once the change is visible to other requests."""
+    transaction.on_commit(statistics.invalidate)
 
 @receiver(post_save, sender=Feedback)
 def notify_staff_new_feedback(sender, instance, created, **kwargs):
@@ -14,16 +66,12 @@ def notify_staff_new_feedback(sender, instance, created, **kwargs):
             'admin_url': f"{settings.ADMIN_URL}feedback/feedback/{instance.id}/change/"
         }
         
-        html_message = render_to_string('feedback/email/new_feedback.html', context)
-        plain_message = render_to_string('feedback/email/new_feedback.txt', context)
-        
-        send_mail(
+        queue_email(
             subject=f'New Feedback: {instance.subject}',
-            message=plain_message,
-            html_message=html_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[settings.STAFF_NOTIFICATION_EMAIL],
-            fail_silently=True
+            to=[settings.STAFF_NOTIFICATION_EMAIL],
+            html_template='feedback/email/new_feedback.html',
+            text_template='feedback/email/new_feedback.txt',
+            context=context
         )
 
 @receiver(post_save, sender=FeedbackResponse)
@@ -36,14 +84,10 @@ def notify_user_feedback_response(sender, instance, created, **kwargs):
             'user': instance.feedback.user
         }
         
-        html_message = render_to_string('feedback/email/feedback_response.html', context)
-        plain_message = render_to_string('feedback/email/feedback_response.txt', context)
-        
-        send_mail(
+        queue_email(
             subject=f'Response to your feedback: {instance.feedback.subject}',
-            message=plain_message,
-            html_message=html_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[instance.feedback.user.email],
-            fail_silently=True
+            to=[instance.feedback.user.email],
+            html_template='feedback/email/feedback_response.html',
+            text_template='feedback/email/feedback_response.txt',
+            context=context
         )
@@ -0,0 +1,139 @@
+"""Near-duplicate feedback clustering with MinHash and LSH.
+
+The same complaint tends to arrive many times in slightly different
+words. Each feedback's subject and message are normalized and cut into
+overlapping character shingles, and ``NUM_PERM`` hash functions turn the
+shingle set into a MinHash signature: the fraction of positions where two
+signatures agree estimates the Jaccard similarity of their shingle sets.
+
+Comparing every pair of signatures would be quadratic, so signatures are
+split into ``BANDS`` bands of ``ROWS`` values (locality-sensitive
+hashing). Only feedback sharing an identical band is compared; with 32
+bands of 4 rows, pairs at 0.6 similarity share a band 99% of the time and
+pairs at 0.2 about 5% of the time. Pairs at or above the threshold are
+joined into clusters, and every member points at the cluster's earliest
+feedback through ``Feedback.duplicate_of``, the way ``dedup_galleries``
+marks duplicate images.
+"""
+
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from .models import Feedback
+
+SHINGLE_SIZE = 5
+BANDS = 32
+ROWS = 4
+NUM_PERM = BANDS * ROWS
+# Smallest prime above 2**32, so every 32-bit shingle hash stays distinct
+PRIME = (1 << 32) + 15
+OPEN_STATUSES = ('pending', 'in_progress')
+
+_random = np.random.default_rng(20241019)
+_A = _random.integers(1, 1 << 32, NUM_PERM, dtype=np.uint64)[:, None]
+_B = _random.integers(0, 1 << 32, NUM_PERM, dtype=np.uint64)[:, None]
+
+
+def _threshold():
+    return getattr(settings, 'FEEDBACK_SIMILARITY_THRESHOLD', 0.6)
+
+
+def shingles(text):
+    """Hashes of the character shingles of ``text``, ignoring case and punctuation."""
+    text = ' '.join(re.findall(r'\w+', text.lower()))
+    if len(text) <= SHINGLE_SIZE:
+        return {zlib.crc32(text.encode())} if text else set()
+    return {
+        zlib.crc32(text[i:i + SHINGLE_SIZE].encode())
+        for i in range(len(text) - SHINGLE_SIZE + 1)
+    }
+
+
+def signature(text):
+    """MinHash signature of ``text``, or ``None`` if it has no words."""
+    hashes = shingles(text)
+    if not hashes:
+        return None
+    values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+    # (a * x + b) mod p stays below 2**64 for 32-bit a, b and x
+    return ((_A * values + _B) % PRIME).min(axis=1)
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.count_nonzero(first == second)) / NUM_PERM
+
+
+def find_clusters(items, threshold=None):
+    """Cluster ``(key, text)`` pairs, given oldest first.
+
+    Returns ``{key: earliest key of its cluster}`` for every item that is
+    a near-duplicate of an earlier one.
+    """
+    threshold = _threshold() if threshold is None else threshold
+    keys, signatures, parent = [], [], []
+    buckets = defaultdict(list)
+
+    def root(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    for key, text in items:
+        current = signature(text)
+        if current is None:
+            continue
+        index = len(keys)
+        keys.append(key)
+        signatures.append(current)
+        parent.append(index)
+
+        band_keys = [
+            (band, current[band * ROWS:(band + 1) * ROWS].tobytes()) for band in range(BANDS)
+        ]
+        candidates = {other for band_key in band_keys for other in buckets[band_key]}
+        for other in candidates:
+            if similarity(current, signatures[other]) >= threshold:
+                # The earlier item stays the root
+                first, second = sorted((root(index), root(other)))
+                parent[second] = first
+        for band_key in band_keys:
+            buckets[band_key].append(index)
+
+    return {
+        keys[index]: keys[root(index)]
+        for index in range(len(keys))
+        if root(index) != index
+    }
+
+
+def cluster_feedback(feedback=None, threshold=None):
+    """Find near-duplicate clusters among ``feedback`` (open feedback by default).
+
+    Returns ``{duplicate pk: earliest pk of its cluster}``.
+    """
+    if feedback is None:
+        feedback = Feedback.objects.filter(status__in=OPEN_STATUSES)
+    rows = feedback.order_by('created_at', 'pk').values_list('pk', 'subject', 'message')
+    return find_clusters(
+        ((pk, f'{subject}\n{message}') for pk, subject, message in rows.iterator(chunk_size=2000)),
+        threshold,
+    )
+
+
+def mark_clusters(feedback, duplicates):
+    """Point every feedback in ``feedback`` at its cluster from ``duplicates``."""
+    members = defaultdict(list)
+    for pk, root_pk in duplicates.items():
+        members[root_pk].append(pk)
+    with transaction.atomic():
+        feedback.filter(duplicate_of__isnull=False).exclude(pk__in=duplicates).update(
+            duplicate_of=None
+        )
+        for root_pk, pks in members.items():
+            Feedback.objects.filter(pk__in=pks).update(duplicate_of_id=root_pk)
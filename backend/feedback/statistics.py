@@ -0,0 +1,191 @@
+"""Feedback statistics for the staff dashboard.
+
+The headline counts (total, per type, per status, average rating) come
+from a single ``aggregate`` with one filtered ``COUNT`` per bucket. The
+report also has a per day or per week series over the last ``days``
+days, the average rating per event and per DJ, and percentiles of the
+time until feedback got its first reply visible to the user
+(``percentile_cont`` on PostgreSQL, interpolated in Python elsewhere).
+
+Reports are cached for ``FEEDBACK_STATISTICS_CACHE_TIMEOUT`` seconds
+under a version that ``feedback.signals`` bumps whenever feedback or a
+response is saved or deleted, so a stale report is never read.
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Avg, Count, Min, Q
+from django.db.models.functions import TruncDay, TruncWeek
+from django.utils import timezone
+from .models import Feedback, FeedbackResponse
+
+VERSION_KEY = 'feedback:statistics:version'
+PERIODS = {'day': TruncDay, 'week': TruncWeek}
+PERCENTILES = (0.5, 0.9, 0.99)
+TOP_RATED_LIMIT = 20
+
+RESPONSE_TIME_SQL = f"""
+    SELECT COUNT(*), AVG(seconds),
+           percentile_cont(%(percentiles)s::float8[]) WITHIN GROUP (ORDER BY seconds)
+    FROM (
+        SELECT EXTRACT(EPOCH FROM MIN(response.created_at) - feedback.created_at) AS seconds
+        FROM {Feedback._meta.db_table} AS feedback
+        JOIN {FeedbackResponse._meta.db_table} AS response ON response.feedback_id = feedback.id
+        WHERE NOT response.is_internal AND feedback.created_at >= %(since)s
+        GROUP BY feedback.id, feedback.created_at
+    ) AS first_responses
+"""
+
+
+def _timeout():
+    return getattr(settings, 'FEEDBACK_STATISTICS_CACHE_TIMEOUT', 60)
+
+
+def get_version():
+    # Seed with a timestamp so an evicted counter never reuses an old version
+    return cache.get_or_set(VERSION_KEY, time.time_ns, timeout=None)
+
+
+def invalidate():
+    """Make every cached report stale."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def totals():
+    """Counts per type and status plus the average rating, in one query."""
+    aggregates = {
+        'total': Count('pk'),
+        'average_rating': Avg('rating'),
+    }
+    for value, _label in Feedback.FEEDBACK_TYPES:
+        aggregates[f'type_{value}'] = Count('pk', filter=Q(feedback_type=value))
+    for value, _label in Feedback.STATUS_CHOICES:
+        aggregates[f'status_{value}'] = Count('pk', filter=Q(status=value))
+    counts = Feedback.objects.aggregate(**aggregates)
+
+    average = counts['average_rating']
+    return {
+        'total_feedback': counts['total'],
+        'average_rating': round(average, 2) if average is not None else None,
+        'feedback_by_type': [
+            {'feedback_type': value, 'count': counts[f'type_{value}']}
+            for value, _label in Feedback.FEEDBACK_TYPES
+            if counts[f'type_{value}']
+        ],
+        'feedback_by_status': [
+            {'status': value, 'count': counts[f'status_{value}']}
+            for value, _label in Feedback.STATUS_CHOICES
+            if counts[f'status_{value}']
+        ],
+    }
+
+
+def series(since, period='day'):
+    """Feedback count and average rating per ``period`` since ``since``."""
+    rows = (
+        Feedback.objects.filter(created_at__gte=since)
+        .annotate(bucket=PERIODS[period]('created_at'))
+        .values('bucket')
+        .annotate(count=Count('pk'), average_rating=Avg('rating'))
+        .order_by('bucket')
+    )
+    return [
+        {
+            'period': row['bucket'].date().isoformat(),
+            'count': row['count'],
+            'average_rating': round(row['average_rating'], 2)
+            if row['average_rating'] is not None else None,
+        }
+        for row in rows
+    ]
+
+
+def ratings_by(field, label_field):
+    """Average rating per ``field`` (``event`` or ``dj``), most rated first."""
+    rows = (
+        Feedback.objects.filter(**{f'{field}__isnull': False, 'rating__isnull': False})
+        .values(field, f'{field}__{label_field}')
+        .annotate(ratings=Count('pk'), average_rating=Avg('rating'))
+        .order_by('-ratings', '-average_rating')[:TOP_RATED_LIMIT]
+    )
+    return [
+        {
+            'id': row[field],
+            'name': row[f'{field}__{label_field}'],
+            'ratings': row['ratings'],
+            'average_rating': round(row['average_rating'], 2),
+        }
+        for row in rows
+    ]
+
+
+def _percentile(values, fraction):
+    """Linear interpolation between closest ranks, as ``percentile_cont``."""
+    position = (len(values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def response_times(since):
+    """Seconds until feedback created since ``since`` got its first public reply."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(RESPONSE_TIME_SQL, {'percentiles': list(PERCENTILES), 'since': since})
+            count, average, percentiles = cursor.fetchone()
+        percentiles = percentiles or [None] * len(PERCENTILES)
+    else:
+        replied = (
+            Feedback.objects.filter(created_at__gte=since)
+            .annotate(first_reply=Min('responses__created_at', filter=Q(responses__is_internal=False)))
+            .filter(first_reply__isnull=False)
+            .values_list('created_at', 'first_reply')
+        )
+        seconds = sorted(
+            (first_reply - created_at).total_seconds()
+            for created_at, first_reply in replied.iterator()
+        )
+        count = len(seconds)
+        average = sum(seconds) / count if count else None
+        percentiles = [
+            _percentile(seconds, fraction) if count else None for fraction in PERCENTILES
+        ]
+
+    result = {
+        'responded': count,
+        'average_seconds': round(float(average), 1) if average is not None else None,
+    }
+    for fraction, value in zip(PERCENTILES, percentiles):
+        result[f'p{round(fraction * 100)}_seconds'] = (
+            round(float(value), 1) if value is not None else None
+        )
+    return result
+
+
+def build_statistics(days=30, period='day'):
+    """The full statistics report, uncached."""
+    since = timezone.now() - timedelta(days=days)
+    return {
+        **totals(),
+        'series': {'period': period, 'days': days, 'data': series(since, period)},
+        'rating_by_event': ratings_by('event', 'title'),
+        'rating_by_dj': ratings_by('dj', 'artist_name'),
+        'response_time': response_times(since),
+    }
+
+
+def feedback_statistics(days=30, period='day'):
+    """The statistics report, served from the cache while feedback is unchanged."""
+    key = f'feedback:statistics:v{get_version()}:{period}:{days}'
+    report = cache.get(key)
+    if report is None:
+        report = build_statistics(days, period)
+        cache.set(key, report, _timeout())
+    return report
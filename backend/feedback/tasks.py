@@ -0,0 +1,12 @@
+from celery import shared_task
+from .models import Feedback
+from .similarity import OPEN_STATUSES, cluster_feedback, mark_clusters
+
+
+@shared_task(ignore_result=True)
+def cluster_similar_feedback():
+    """Group open near-duplicate feedback so staff can answer it together."""
+    feedback = Feedback.objects.filter(status__in=OPEN_STATUSES)
+    duplicates = cluster_feedback(feedback)
+    mark_clusters(feedback, duplicates)
+    return len(duplicates)
@@ -0,0 +1,117 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from feedback import analytics
+from feedback.models import Survey, SurveyAnswerRollup, SurveyResponse
+
+pytestmark = pytest.mark.django_db
+
+ANSWERS = [
+    {'1': 'Very Satisfied', '2': 5, '3': 'Great!', '4': ['House', 'Techno']},
+    {'1': 'Satisfied', '2': 4, '3': '', '4': ['House']},
+    {'1': 'Very Satisfied', '2': 5, '3': 'Excellent', '4': []},
+    {'1': None, '2': 'n/a'},
+    ['legacy', 'list', 'format'],
+]
+
+
+@pytest.fixture
+def rated_survey(staff_user, create_user):
+    survey = Survey.objects.create(
+        created_by=staff_user,
+        title='Night review',
+        description='',
+        survey_type='event',
+        start_date=timezone.now(),
+        end_date=timezone.now(),
+        questions=[
+            {'id': 1, 'type': 'single_choice', 'text': 'Overall?'},
+            {'id': 2, 'type': 'rating', 'text': 'Sound?'},
+            {'id': 3, 'type': 'text', 'text': 'Comments?'},
+            {'id': 4, 'type': 'multiple_choice', 'text': 'Genres?'},
+            {'id': 5, 'type': 'rating', 'text': 'Bar?'},
+        ],
+    )
+    for i, answers in enumerate(ANSWERS):
+        SurveyResponse.objects.create(
+            survey=survey, user=create_user(email=f'guest{i}@example.com'), responses=answers
+        )
+    return survey
+
+
+EXPECTED = {
+    '1': {'Very Satisfied': 2, 'Satisfied': 1},
+    '2': {'average': 4.67, 'count': 3},
+    '3': {'response_count': 2},
+    '4': {'House': 2, 'Techno': 1},
+}
+
+
+class TestSurveyAnalytics:
+    def test_read_from_rollups(self, rated_survey, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            assert analytics.survey_analytics(rated_survey) == EXPECTED
+
+    def test_database_aggregation_matches_streaming_fallback(self, rated_survey, monkeypatch):
+        questions = analytics.question_types(rated_survey.questions)
+        assert analytics.format_analytics(questions, analytics.compute_rows(rated_survey)) == EXPECTED
+        monkeypatch.setattr(analytics.connection, 'vendor', 'sqlite')
+        assert analytics.format_analytics(questions, analytics.compute_rows(rated_survey)) == EXPECTED
+
+    def test_other_surveys_are_ignored(self, rated_survey, staff_user):
+        empty = Survey.objects.create(
+            created_by=staff_user, title='Empty', description='', survey_type='event',
+            start_date=timezone.now(), end_date=timezone.now(),
+            questions=rated_survey.questions,
+        )
+        assert analytics.survey_analytics(empty) == {
+            '1': {}, '3': {'response_count': 0}, '4': {},
+        }
+
+
+class TestRollups:
+    def test_updates_apply_the_difference(self, rated_survey):
+        response = SurveyResponse.objects.get(survey=rated_survey, responses__contains={'1': 'Satisfied'})
+        response.responses = {'1': 'Very Satisfied', '2': 1, '4': ['Techno']}
+        response.save()
+
+        result = analytics.survey_analytics(rated_survey)
+        assert result['1'] == {'Very Satisfied': 3}
+        assert result['2'] == {'average': 3.67, 'count': 3}
+        assert result['4'] == {'House': 1, 'Techno': 2}
+        assert analytics.check_rollups(rated_survey) == {}
+
+    def test_unrelated_field_updates_leave_rollups_alone(self, rated_survey, django_assert_num_queries):
+        response = SurveyResponse.objects.filter(survey=rated_survey).first()
+        with django_assert_num_queries(1):
+            response.save(update_fields=['created_at'])
+
+    def test_deletes_subtract(self, rated_survey):
+        SurveyResponse.objects.filter(survey=rated_survey, responses__contains={'1': 'Very Satisfied'}).delete()
+        assert analytics.survey_analytics(rated_survey) == {
+            '1': {'Satisfied': 1},
+            '2': {'average': 4.0, 'count': 1},
+            '3': {'response_count': 0},
+            '4': {'House': 1},
+        }
+        assert analytics.check_rollups(rated_survey) == {}
+
+    def test_changing_question_types_rebuilds(self, rated_survey):
+        questions = rated_survey.questions
+        questions[2]['type'] = 'single_choice'
+        rated_survey.questions = questions
+        rated_survey.save()
+        assert analytics.survey_analytics(rated_survey)['3'] == {'Great!': 1, 'Excellent': 1}
+        assert analytics.check_rollups(rated_survey) == {}
+
+    def test_check_and_rebuild_command(self, rated_survey):
+        SurveyAnswerRollup.objects.filter(survey=rated_survey, question_id='2').update(answers=99)
+        out = StringIO()
+        call_command('rebuild_survey_rollups', '--check', stdout=out)
+        assert "question 2 '': stored 99 answers" in out.getvalue()
+        assert 'Found 1 survey(s) with drifted rollups' in out.getvalue()
+
+        call_command('rebuild_survey_rollups', stdout=StringIO())
+        assert analytics.check_rollups(rated_survey) == {}
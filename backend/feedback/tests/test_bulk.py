@@ -0,0 +1,120 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from feedback import analytics
+from feedback.bulk import SurveyValidator
+from feedback.models import Survey, SurveyResponse
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+QUESTIONS = [
+    {'id': 1, 'type': 'single_choice', 'text': 'Overall?', 'options': ['Good', 'Bad'], 'required': True},
+    {'id': 2, 'type': 'rating', 'text': 'Sound?', 'min': 1, 'max': 5},
+    {'id': 3, 'type': 'multiple_choice', 'text': 'Genres?', 'options': ['House', 'Techno']},
+    {'id': 4, 'type': 'text', 'text': 'Comments?'},
+]
+
+
+@pytest.fixture
+def kiosk_survey(staff_user):
+    return Survey.objects.create(
+        created_by=staff_user, title='Kiosk', description='', survey_type='event',
+        start_date=timezone.now(), end_date=timezone.now(), questions=QUESTIONS,
+    )
+
+
+@pytest.fixture
+def guests(create_user):
+    return [create_user(email=f'guest{i}@example.com') for i in range(4)]
+
+
+class TestSurveyValidator:
+    @pytest.mark.parametrize('answers, errors', [
+        ({'1': 'Good', '2': 4, '3': ['House'], '4': 'Loud'}, {}),
+        ({'1': 'Meh'}, {'1': 'Unknown option(s): Meh.'}),
+        ({'1': 'Good', '2': 9}, {'2': 'Rating must be between 1 and 5.'}),
+        ({'1': 'Good', '2': '4'}, {'2': 'Rating must be a number.'}),
+        ({'1': 'Good', '3': ['House', 'Disco']}, {'3': 'Unknown option(s): Disco.'}),
+        ({'1': 'Good', '9': 'x'}, {'9': 'Unknown question.'}),
+        ({'2': 3}, {'1': 'This question is required.'}),
+        (['Good'], {'responses': 'Responses must be an object keyed by question id.'}),
+    ])
+    def test_errors(self, answers, errors):
+        assert SurveyValidator(QUESTIONS).errors(answers) == errors
+
+
+class TestBulkResponses:
+    url = reverse('surveyresponse-bulk')
+
+    def post(self, client, survey, rows, **extra):
+        return client.post(self.url, {'survey': str(survey.pk), 'responses': rows, **extra}, format='json')
+
+    def test_creates_valid_rows_and_reports_the_rest(self, staff_client, kiosk_survey, guests):
+        rows = [
+            {'user': str(guests[0].pk), 'responses': {'1': 'Good', '2': 5, '3': ['House']}},
+            {'email': guests[1].email.upper(), 'responses': {'1': 'Bad', '2': 3}},
+            {'user': str(guests[2].pk), 'responses': {'1': 'Nope'}},
+            {'email': 'nobody@example.com', 'responses': {'1': 'Good'}},
+            {'user': str(guests[0].pk), 'responses': {'1': 'Bad'}},
+        ]
+        response = self.post(staff_client, kiosk_survey, rows)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [result['status'] for result in response.data['results']] == [
+            'created', 'created', 'invalid', 'invalid', 'skipped'
+        ]
+        assert response.data['results'][2]['errors'] == {'1': 'Unknown option(s): Nope.'}
+        kiosk_survey.refresh_from_db()
+        assert kiosk_survey.responses_count == 2
+        assert analytics.survey_analytics(kiosk_survey) == {
+            '1': {'Good': 1, 'Bad': 1},
+            '2': {'average': 4.0, 'count': 2},
+            '3': {'House': 1},
+            '4': {'response_count': 0},
+        }
+
+    def test_query_count_does_not_grow_with_batch(self, staff_client, kiosk_survey,
+                                                  django_assert_max_num_queries):
+        users = User.objects.bulk_create([User(email=f'bulk{i}@example.com') for i in range(200)])
+        rows = [{'user': str(user.pk), 'responses': {'1': 'Good', '2': 4}} for user in users]
+        with django_assert_max_num_queries(20):
+            response = self.post(staff_client, kiosk_survey, rows)
+        assert response.data['created'] == 200
+        assert SurveyResponse.objects.filter(survey=kiosk_survey).count() == 200
+
+    def test_resync_skips_or_updates(self, staff_client, kiosk_survey, guests):
+        rows = [{'user': str(guests[0].pk), 'responses': {'1': 'Good', '2': 2}}]
+        self.post(staff_client, kiosk_survey, rows)
+
+        again = self.post(staff_client, kiosk_survey, rows)
+        assert again.status_code == status.HTTP_200_OK
+        assert again.data['skipped'] == 1
+
+        rows[0]['responses'] = {'1': 'Bad', '2': 4}
+        updated = self.post(staff_client, kiosk_survey, rows, on_conflict='update')
+        assert updated.data['updated'] == 1
+        assert SurveyResponse.objects.get(user=guests[0]).responses == {'1': 'Bad', '2': 4}
+        kiosk_survey.refresh_from_db()
+        assert kiosk_survey.responses_count == 1
+        assert analytics.check_rollups(kiosk_survey) == {}
+        assert analytics.survey_analytics(kiosk_survey)['1'] == {'Bad': 1}
+
+    def test_all_invalid_is_bad_request(self, staff_client, kiosk_survey, guests):
+        response = self.post(staff_client, kiosk_survey, [{'user': str(guests[0].pk), 'responses': {}}])
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['invalid'] == 1
+
+    def test_limits(self, settings, staff_client, kiosk_survey):
+        settings.SURVEY_BULK_MAX_RESPONSES = 1
+        rows = [{'email': 'a@example.com', 'responses': {}}] * 2
+        assert self.post(staff_client, kiosk_survey, rows).status_code == status.HTTP_400_BAD_REQUEST
+        response = staff_client.post(self.url, {'survey': 'nope', 'responses': rows[:1]}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_staff_only(self, authenticated_client, kiosk_survey):
+        rows = [{'email': 'a@example.com', 'responses': {}}]
+        assert self.post(authenticated_client, kiosk_survey, rows).status_code == status.HTTP_403_FORBIDDEN
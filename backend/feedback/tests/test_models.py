@@ -56,6 +56,36 @@ class TestSurveyResponseModel:
         expected_str = f'Response to {survey.title} by {user.get_full_name()}'
         assert str(response) == expected_str
 
+    def test_responses_count_tracks_responses(self, survey, user, staff_user):
+        first = SurveyResponse.objects.create(survey=survey, user=user, responses={})
+        SurveyResponse.objects.create(survey=survey, user=staff_user, responses={})
+        survey.refresh_from_db()
+        assert survey.responses_count == 2
+
+        first.delete()
+        survey.refresh_from_db()
+        assert survey.responses_count == 1
+
+    def test_survey_save_keeps_counter(self, survey, user):
+        stale = Survey.objects.get(pk=survey.pk)
+        SurveyResponse.objects.create(survey=survey, user=user, responses={})
+
+        # Saving an instance loaded before the increment must not reset it
+        stale.title = 'Renamed Survey'
+        stale.save()
+        survey.refresh_from_db()
+        assert survey.title == 'Renamed Survey'
+        assert survey.responses_count == 1
+
+    def test_reconcile_counters_repairs_drift(self, survey, user):
+        from django.core.management import call_command
+        SurveyResponse.objects.create(survey=survey, user=user, responses={})
+        Survey.objects.filter(pk=survey.pk).update(responses_count=7)
+
+        call_command('reconcile_counters')
+        survey.refresh_from_db()
+        assert survey.responses_count == 1
+
 class TestFeedbackModel:
     def test_feedback_creation(self, feedback):
         assert feedback.subject == 'Test Feedback'
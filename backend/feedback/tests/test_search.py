@@ -0,0 +1,171 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from feedback import similarity
+from feedback.models import Feedback, FeedbackResponse
+from feedback.search import search_feedback
+from rest_framework import status
+
+pytestmark = pytest.mark.django_db
+
+COMPLAINTS = [
+    ('Sound too loud', 'The sound system near the bar was way too loud all night long.'),
+    ('Sound way too loud', 'The sound system near the bar was far too loud all night long!'),
+    ('Too loud', 'sound system near the bar was way too loud all night long'),
+    ('Coat check', 'The coat check queue took forty minutes at closing time.'),
+    ('Great lineup', 'Loved the techno lineup, please book the same DJs again.'),
+]
+
+
+@pytest.fixture(autouse=True)
+def sync_email(settings):
+    # New feedback emails staff; keep that out of the outbox worker
+    settings.EMAIL_DELIVERY = 'sync'
+
+
+@pytest.fixture
+def complaints(create_user):
+    return [
+        Feedback.objects.create(
+            user=create_user(email=f'guest{i}@example.com'),
+            feedback_type='complaint',
+            subject=subject,
+            message=message,
+        )
+        for i, (subject, message) in enumerate(COMPLAINTS)
+    ]
+
+
+@pytest.fixture
+def trigram():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            pytest.skip('pg_trgm is not installed')
+
+
+class TestSearch:
+    def test_ranked_full_text_search(self, complaints):
+        results = list(search_feedback(Feedback.objects.all(), 'loud'))
+        assert set(results) == set(complaints[:3])
+        assert all(first.rank >= second.rank for first, second in zip(results, results[1:]))
+
+    def test_stemming_and_web_search_syntax(self, complaints):
+        assert list(search_feedback(Feedback.objects.all(), 'queues')) == [complaints[3]]
+        assert set(search_feedback(Feedback.objects.all(), 'loud -far')) == {
+            complaints[0], complaints[2]
+        }
+        assert set(search_feedback(Feedback.objects.all(), 'coat or techno')) == {
+            complaints[3], complaints[4]
+        }
+        assert list(search_feedback(Feedback.objects.all(), '"book the same"')) == [complaints[4]]
+
+    def test_subject_weighs_more_than_message(self, create_user):
+        in_message = Feedback.objects.create(
+            user=create_user(email='a@example.com'), feedback_type='general',
+            subject='Night out', message='The lighting was dim',
+        )
+        in_subject = Feedback.objects.create(
+            user=create_user(email='b@example.com'), feedback_type='general',
+            subject='Lighting', message='It was dim',
+        )
+        assert list(search_feedback(Feedback.objects.all(), 'lighting')) == [in_subject, in_message]
+
+    def test_typo_falls_back_to_trigram_similarity(self, complaints, trigram):
+        assert list(search_feedback(Feedback.objects.all(), 'techo lineup'))[0] == complaints[4]
+
+    def test_search_parameter(self, staff_client, complaints):
+        response = staff_client.get(reverse('feedback-list'), {'search': 'coat check'})
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['id'] for item in response.data] == [str(complaints[3].pk)]
+
+
+class TestMinHash:
+    def test_signature_agreement_estimates_jaccard(self):
+        first = 'the sound system near the bar was way too loud all night long'
+        second = 'the sound system near the bar was far too loud all night long'
+        first_shingles, second_shingles = similarity.shingles(first), similarity.shingles(second)
+        jaccard = len(first_shingles & second_shingles) / len(first_shingles | second_shingles)
+        estimate = similarity.similarity(similarity.signature(first), similarity.signature(second))
+        assert estimate == pytest.approx(jaccard, abs=0.15)
+
+    def test_text_is_normalized(self):
+        assert similarity.shingles('Too LOUD!!') == similarity.shingles('too loud')
+        assert similarity.signature('?!') is None
+
+    def test_find_clusters(self):
+        texts = [f'{subject}\n{message}' for subject, message in COMPLAINTS]
+        duplicates = similarity.find_clusters(enumerate(texts), threshold=0.5)
+        assert duplicates == {1: 0, 2: 0}
+
+
+class TestClustering:
+    def test_cluster_feedback_marks_duplicates(self, complaints):
+        complaints[4].status = 'resolved'
+        complaints[4].save()
+        feedback = Feedback.objects.filter(status__in=similarity.OPEN_STATUSES)
+
+        duplicates = similarity.cluster_feedback(feedback, threshold=0.5)
+        assert duplicates == {complaints[1].pk: complaints[0].pk, complaints[2].pk: complaints[0].pk}
+        similarity.mark_clusters(feedback, duplicates)
+        assert set(Feedback.objects.get(pk=complaints[0].pk).duplicates.all()) == set(complaints[1:3])
+
+        # Rewritten feedback leaves its cluster on the next run
+        Feedback.objects.filter(pk=complaints[2].pk).update(
+            subject='Bar prices', message='Drinks at the bar are far too expensive.'
+        )
+        similarity.mark_clusters(feedback, similarity.cluster_feedback(feedback, threshold=0.5))
+        assert list(Feedback.objects.filter(duplicate_of__isnull=False)) == [complaints[1]]
+
+    def test_command(self, complaints):
+        out = StringIO()
+        call_command('cluster_feedback', '--threshold', '0.5', '--dry-run', stdout=out)
+        assert 'Sound too loud' in out.getvalue()
+        assert 'Found 2 duplicate(s) in 1 cluster(s)' in out.getvalue()
+        assert not Feedback.objects.filter(duplicate_of__isnull=False).exists()
+
+        call_command('cluster_feedback', '--threshold', '0.5', stdout=StringIO())
+        assert Feedback.objects.filter(duplicate_of=complaints[0]).count() == 2
+
+
+class TestClusterEndpoints:
+    @pytest.fixture
+    def clustered(self, complaints):
+        similarity.mark_clusters(Feedback.objects.all(), {
+            complaints[1].pk: complaints[0].pk, complaints[2].pk: complaints[0].pk,
+        })
+        return complaints
+
+    def test_clusters(self, staff_client, clustered):
+        response = staff_client.get(reverse('feedback-clusters'))
+        assert response.status_code == status.HTTP_200_OK
+        assert [(item['id'], item['similar_count']) for item in response.data] == [
+            (str(clustered[0].pk), 2)
+        ]
+
+    def test_similar(self, staff_client, clustered):
+        response = staff_client.get(reverse('feedback-similar', args=[clustered[1].pk]))
+        assert [item['id'] for item in response.data] == [
+            str(clustered[0].pk), str(clustered[2].pk)
+        ]
+
+    def test_respond_to_cluster(self, staff_client, clustered):
+        response = staff_client.post(
+            reverse('feedback-respond', args=[clustered[2].pk]),
+            {'feedback': str(clustered[2].pk), 'message': 'We are lowering the volume.',
+             'cluster': True},
+            format='json',
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 3
+        assert set(FeedbackResponse.objects.values_list('feedback_id', flat=True)) == {
+            feedback.pk for feedback in clustered[:3]
+        }
+        assert set(Feedback.objects.filter(status='in_progress')) == set(clustered[:3])
+
+    def test_cluster_endpoints_are_staff_only(self, authenticated_client, clustered):
+        response = authenticated_client.get(reverse('feedback-clusters'))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -10,6 +10,8 @@ def enable_email_settings(settings):
     settings.STAFF_NOTIFICATION_EMAIL = 'staff@example.com'
     settings.DEFAULT_FROM_EMAIL = 'noreply@example.com'
     settings.ADMIN_URL = 'http://example.com/admin/'
+    # Send during the request instead of through the outbox worker
+    settings.EMAIL_DELIVERY = 'sync'
     return settings
 
 class TestFeedbackSignals:
@@ -0,0 +1,204 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from events.models import DJ, Event
+from feedback import statistics
+from feedback.models import Feedback, FeedbackResponse
+from rest_framework import status
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def isolated(settings):
+    # New feedback emails staff; keep that out of the outbox worker
+    settings.EMAIL_DELIVERY = 'sync'
+    cache.clear()
+
+
+@pytest.fixture
+def event():
+    return Event.objects.create(
+        title='Warehouse Night',
+        description='Test Description',
+        date=timezone.now().date(),
+        start_time=timezone.now().time(),
+        location={'name': 'Test Venue'},
+        capacity=100,
+        status='published',
+    )
+
+
+@pytest.fixture
+def dj():
+    return DJ.objects.create(name='Jane', artist_name='DJ Jane', bio='', profile_image='dj.jpg')
+
+
+@pytest.fixture
+def make_feedback(create_user):
+    def make(days_ago=0, **fields):
+        user = create_user(email=f'guest{Feedback.objects.count()}@example.com')
+        feedback = Feedback.objects.create(
+            user=user,
+            feedback_type=fields.pop('feedback_type', 'general'),
+            subject='Subject',
+            message='Message',
+            **fields,
+        )
+        if days_ago:
+            Feedback.objects.filter(pk=feedback.pk).update(
+                created_at=timezone.now() - timedelta(days=days_ago)
+            )
+            feedback.refresh_from_db()
+        return feedback
+    return make
+
+
+def reply(feedback, responder, after, is_internal=False):
+    response = FeedbackResponse.objects.create(
+        feedback=feedback, responder=responder, message='Thanks', is_internal=is_internal
+    )
+    FeedbackResponse.objects.filter(pk=response.pk).update(created_at=feedback.created_at + after)
+
+
+class TestTotals:
+    def test_counts_come_from_one_query(self, make_feedback, django_assert_num_queries):
+        make_feedback(feedback_type='praise', rating=5)
+        make_feedback(feedback_type='praise', rating=4, status='resolved')
+        make_feedback(feedback_type='bug')
+
+        with django_assert_num_queries(1):
+            totals = statistics.totals()
+
+        assert totals == {
+            'total_feedback': 3,
+            'average_rating': 4.5,
+            'feedback_by_type': [
+                {'feedback_type': 'praise', 'count': 2},
+                {'feedback_type': 'bug', 'count': 1},
+            ],
+            'feedback_by_status': [
+                {'status': 'pending', 'count': 2},
+                {'status': 'resolved', 'count': 1},
+            ],
+        }
+
+    def test_no_feedback(self):
+        assert statistics.totals() == {
+            'total_feedback': 0,
+            'average_rating': None,
+            'feedback_by_type': [],
+            'feedback_by_status': [],
+        }
+
+
+class TestBreakdowns:
+    def test_daily_and_weekly_series(self, make_feedback):
+        make_feedback(rating=2)
+        make_feedback(rating=4)
+        make_feedback(days_ago=3)
+        make_feedback(days_ago=60)
+        since = timezone.now() - timedelta(days=30)
+
+        daily = statistics.series(since, 'day')
+        assert [row['count'] for row in daily] == [1, 2]
+        assert daily[-1]['period'] == timezone.now().date().isoformat()
+        assert daily[-1]['average_rating'] == 3.0
+        assert daily[0]['average_rating'] is None
+        assert sum(row['count'] for row in statistics.series(since, 'week')) == 3
+
+    def test_ratings_by_event_and_dj(self, make_feedback, event, dj):
+        make_feedback(event=event, dj=dj, rating=5)
+        make_feedback(event=event, rating=2)
+        make_feedback(event=event)
+        make_feedback(rating=1)
+
+        assert statistics.ratings_by('event', 'title') == [{
+            'id': event.pk, 'name': 'Warehouse Night', 'ratings': 2, 'average_rating': 3.5,
+        }]
+        assert statistics.ratings_by('dj', 'artist_name') == [{
+            'id': dj.pk, 'name': 'DJ Jane', 'ratings': 1, 'average_rating': 5.0,
+        }]
+
+    def test_response_time_percentiles(self, make_feedback, staff_user, monkeypatch):
+        for hours in (1, 2, 3, 4, 10):
+            feedback = make_feedback(days_ago=1)
+            reply(feedback, staff_user, timedelta(hours=hours))
+            reply(feedback, staff_user, timedelta(hours=hours * 2))
+        unanswered = make_feedback()
+        reply(unanswered, staff_user, timedelta(minutes=1), is_internal=True)
+        since = timezone.now() - timedelta(days=30)
+
+        times = statistics.response_times(since)
+        assert times['responded'] == 5
+        assert times['average_seconds'] == 4 * 3600
+        assert times['p50_seconds'] == 3 * 3600
+        assert times['p90_seconds'] == pytest.approx(7.6 * 3600)
+        monkeypatch.setattr(statistics.connection, 'vendor', 'sqlite')
+        assert statistics.response_times(since) == times
+
+    def test_response_time_without_replies(self, make_feedback):
+        make_feedback()
+        assert statistics.response_times(timezone.now() - timedelta(days=1)) == {
+            'responded': 0,
+            'average_seconds': None,
+            'p50_seconds': None,
+            'p90_seconds': None,
+            'p99_seconds': None,
+        }
+
+
+class TestCaching:
+    def test_report_is_cached_until_feedback_changes(
+        self, make_feedback, staff_user, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        feedback = make_feedback()
+        assert statistics.feedback_statistics()['total_feedback'] == 1
+        with django_assert_num_queries(0):
+            assert statistics.feedback_statistics()['total_feedback'] == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            make_feedback()
+        assert statistics.feedback_statistics()['total_feedback'] == 2
+
+        with django_capture_on_commit_callbacks(execute=True):
+            reply(feedback, staff_user, timedelta(hours=1))
+        assert statistics.feedback_statistics()['response_time']['responded'] == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            feedback.delete()
+        assert statistics.feedback_statistics()['total_feedback'] == 1
+
+    def test_periods_are_cached_separately(self, make_feedback):
+        make_feedback()
+        assert statistics.feedback_statistics(period='week')['series']['period'] == 'week'
+        assert statistics.feedback_statistics(days=7)['series'] == {
+            'period': 'day', 'days': 7,
+            'data': [{'period': timezone.now().date().isoformat(), 'count': 1, 'average_rating': None}],
+        }
+
+
+class TestStatisticsEndpoint:
+    url = reverse('feedback-statistics')
+
+    def test_staff_only(self, authenticated_client):
+        assert authenticated_client.get(self.url).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_report(self, staff_client, make_feedback):
+        make_feedback(feedback_type='praise', rating=5)
+
+        response = staff_client.get(self.url, {'period': 'week', 'days': 90})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['total_feedback'] == 1
+        assert response.data['feedback_by_type'] == [{'feedback_type': 'praise', 'count': 1}]
+        assert response.data['series']['period'] == 'week'
+        assert response.data['series']['days'] == 90
+        assert set(response.data) >= {'rating_by_event', 'rating_by_dj', 'response_time'}
+
+    @pytest.mark.parametrize('params', [{'period': 'month'}, {'days': 'all'}, {'days': 0}, {'days': 366}])
+    def test_invalid_parameters(self, staff_client, params):
+        response = staff_client.get(self.url, params)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -1,6 +1,8 @@
 import pytest
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
+from events.models import DJ, Event
 from feedback.models import Survey, SurveyResponse, Feedback, FeedbackResponse
 
 pytestmark = pytest.mark.django_db
@@ -138,3 +140,52 @@ class TestFeedbackViewSet:
         assert 'by_type' in response.data
         assert 'by_status' in response.data
         assert 'average_rating' in response.data
+
+class TestFeedbackQueries:
+    @pytest.fixture
+    def add_feedback(self, settings, create_user, staff_user):
+        settings.EMAIL_DELIVERY = 'sync'
+        event = Event.objects.create(
+            title='Warehouse Night', description='', date=timezone.now().date(),
+            start_time=timezone.now().time(), location={'name': 'Venue'},
+            capacity=100, status='published',
+        )
+        dj = DJ.objects.create(name='Jane', artist_name='DJ Jane', bio='', profile_image='dj.jpg')
+
+        def add(count):
+            for _ in range(count):
+                feedback = Feedback.objects.create(
+                    user=create_user(email=f'guest{Feedback.objects.count()}@example.com'),
+                    feedback_type='general', subject='Subject', message='Message',
+                    event=event, dj=dj, rating=4,
+                )
+                for message in ('Looking into it', 'Fixed'):
+                    FeedbackResponse.objects.create(
+                        feedback=feedback, responder=staff_user, message=message
+                    )
+        return add
+
+    def test_list_query_count_is_constant(self, staff_client, add_feedback, django_assert_num_queries):
+        url = reverse('feedback-list')
+        add_feedback(2)
+        # Auth user, feedback with user/event/dj, responses with responders
+        with django_assert_num_queries(3):
+            response = staff_client.get(url)
+        assert len(response.data) == 2
+
+        add_feedback(20)
+        with django_assert_num_queries(3):
+            response = staff_client.get(url)
+        assert len(response.data) == 22
+        item = response.data[0]
+        assert item['user_name'] == 'Test User'
+        assert (item['event_title'], item['dj_name']) == ('Warehouse Night', 'DJ Jane')
+        assert [r['message'] for r in item['responses']] == ['Looking into it', 'Fixed']
+        assert item['responses'][0]['responder_name'] == 'Staff User'
+
+    def test_retrieve_query_count(self, staff_client, add_feedback, django_assert_num_queries):
+        add_feedback(1)
+        feedback = Feedback.objects.get()
+        with django_assert_num_queries(3):
+            response = staff_client.get(reverse('feedback-detail', args=[feedback.pk]))
+        assert len(response.data['responses']) == 2
@@ -2,8 +2,13 @@ from rest_framework import viewsets, permissions, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.conf import settings
 from .models import Survey, SurveyResponse, Feedback, FeedbackResponse
+from .bulk import ingest_responses
+from .search import FeedbackSearchFilter
+from .statistics import PERIODS, feedback_statistics
 from .serializers import (
     SurveySerializer,
     SurveyResponseSerializer,
@@ -12,8 +17,10 @@ from .serializers import (
     SurveyAnalyticsSerializer
 )
 from events.permissions import IsStaffOrReadOnly
-from django.db.models import Count
 from django.db import models
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q
+import uuid
 
 class SurveyViewSet(viewsets.ModelViewSet):
     queryset = Survey.objects.all()
@@ -60,26 +67,84 @@ class SurveyResponseViewSet(viewsets.ModelViewSet):
             return SurveyResponse.objects.all()
         return SurveyResponse.objects.filter(user=self.request.user)
 
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAdminUser])
+    def bulk(self, request):
+        """Store many responses to one survey, e.g. synced from venue kiosks."""
+        try:
+            survey = get_object_or_404(Survey, pk=uuid.UUID(str(request.data.get('survey'))))
+        except ValueError:
+            return Response(
+                {'error': 'survey must be a survey id'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        rows = request.data.get('responses')
+        on_conflict = request.data.get('on_conflict', 'skip')
+        limit = getattr(settings, 'SURVEY_BULK_MAX_RESPONSES', 5000)
+        if not isinstance(rows, list) or not rows:
+            return Response(
+                {'error': 'responses must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(rows) > limit:
+            return Response(
+                {'error': f'At most {limit} responses per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if on_conflict not in ('skip', 'update'):
+            return Response(
+                {'error': "on_conflict must be 'skip' or 'update'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = ingest_responses(survey, rows, on_conflict=on_conflict)
+        summary = {
+            outcome: sum(result['status'] == outcome for result in results)
+            for outcome in ('created', 'updated', 'skipped', 'invalid')
+        }
+        if summary['invalid'] == len(results):
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif summary['created']:
+            response_status = status.HTTP_201_CREATED
+        else:
+            response_status = status.HTTP_200_OK
+        return Response({**summary, 'results': results}, status=response_status)
+
 class FeedbackViewSet(viewsets.ModelViewSet):
     queryset = Feedback.objects.all()
     serializer_class = FeedbackSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
-    filterset_fields = ['feedback_type', 'status', 'event', 'dj']
-    search_fields = ['subject', 'message']
+    filter_backends = [DjangoFilterBackend, FeedbackSearchFilter]
+    filterset_fields = ['feedback_type', 'status', 'event', 'dj', 'duplicate_of']
     
     def get_queryset(self):
+        queryset = Feedback.objects.select_related('user', 'event', 'dj')
+        if self.action in ('list', 'retrieve', 'similar', 'clusters'):
+            # Load only the related columns FeedbackSerializer shows
+            queryset = queryset.only(
+                *(field.name for field in Feedback._meta.concrete_fields if not field.generated),
+                'user__first_name', 'user__last_name',
+                'event__title', 'dj__artist_name',
+            ).prefetch_related(Prefetch(
+                'responses',
+                queryset=FeedbackResponse.objects.select_related('responder').only(
+                    'id', 'feedback', 'responder', 'message', 'created_at', 'is_internal',
+                    'responder__first_name', 'responder__last_name',
+                ).order_by('created_at'),
+            ))
         if self.request.user.is_staff:
-            return Feedback.objects.all()
-        return Feedback.objects.filter(user=self.request.user)
+            return queryset
+        return queryset.filter(user=self.request.user)
     
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAdminUser])
     def respond(self, request, pk=None):
-        """Add a response to feedback."""
+        """Add a response to feedback, or with ``cluster`` to all of its near-duplicates."""
         feedback = self.get_object()
         serializer = FeedbackResponseSerializer(data=request.data)
         
-        if serializer.is_valid():
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        if str(request.data.get('cluster', '')).lower() not in ('true', '1'):
             serializer.save(
                 feedback=feedback,
                 responder=request.user
@@ -91,7 +156,44 @@ class FeedbackViewSet(viewsets.ModelViewSet):
                 feedback.save()
             
             return Response(serializer.data)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        root_id = feedback.duplicate_of_id or feedback.pk
+        cluster = Feedback.objects.select_related('user').filter(
+            Q(pk=root_id) | Q(duplicate_of_id=root_id)
+        )
+        fields = {**serializer.validated_data, 'responder': request.user}
+        responses = []
+        with transaction.atomic():
+            for member in cluster:
+                # One response each, so every author is notified
+                fields['feedback'] = member
+                responses.append(FeedbackResponse.objects.create(**fields))
+                if member.status == 'pending':
+                    member.status = 'in_progress'
+                    member.save()
+        return Response(FeedbackResponseSerializer(responses, many=True).data)
+
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def similar(self, request, pk=None):
+        """Other feedback in the same near-duplicate cluster."""
+        feedback = self.get_object()
+        root_id = feedback.duplicate_of_id or feedback.pk
+        cluster = self.get_queryset().filter(
+            Q(pk=root_id) | Q(duplicate_of_id=root_id)
+        ).exclude(pk=feedback.pk).order_by('created_at')
+        serializer = self.get_serializer(cluster, many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def clusters(self, request):
+        """Feedback with near-duplicates, largest clusters first."""
+        roots = self.filter_queryset(self.get_queryset()).annotate(
+            similar_count=Count('duplicates')
+        ).filter(similar_count__gt=0).order_by('-similar_count', '-created_at')[:100]
+        data = self.get_serializer(roots, many=True).data
+        for item, root in zip(data, roots):
+            item['similar_count'] = root.similar_count
+        return Response(data)
     
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAdminUser])
     def update_status(self, request, pk=None):
@@ -112,13 +214,20 @@ class FeedbackViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAdminUser])
     def statistics(self, request):
-        """Get feedback statistics."""
-        feedback_count = Feedback.objects.count()
-        feedback_by_type = Feedback.objects.values('feedback_type').annotate(count=Count('id'))
-        feedback_by_status = Feedback.objects.values('status').annotate(count=Count('id'))
-        
-        return Response({
-            'total_feedback': feedback_count,
-            'feedback_by_type': feedback_by_type,
-            'feedback_by_status': feedback_by_status
-        })
+        """Get feedback statistics, optionally ?period=day|week&days=N for the series."""
+        period = request.query_params.get('period', 'day')
+        if period not in PERIODS:
+            return Response(
+                {'error': f'period must be one of: {", ".join(PERIODS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            days = 0
+        if not 1 <= days <= 365:
+            return Response(
+                {'error': 'days must be a number between 1 and 365'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(feedback_statistics(days=days, period=period))
@@ -0,0 +1,245 @@
+"""Write-behind buffer for image download tracking.
+
+``ImageViewSet.download`` appends a record to a buffer instead of inserting
+an ``ImageDownload`` row on the response path. ``flush_downloads`` (run by
+the ``gallery.tasks.flush_download_buffer`` periodic task) drains the buffer
+in batches with ``bulk_create`` and applies one counter update per image.
+
+Loss semantics:
+
+* ``redis`` (default): records are appended to a Redis list and survive
+  web process restarts. A batch is removed from the list atomically before
+  it is written; if the database write fails the batch is pushed back, so
+  only a worker dying between the pop and the commit loses data, bounded by
+  one batch (``GALLERY_DOWNLOAD_BATCH_SIZE``). A batch rejected for its
+  content (say a re-delivered id) is written row by row instead, and the
+  rows that still fail are moved to a dead-letter list
+  (``DEAD_LETTER_KEY``) so they can't block the buffer. Anything Redis itself drops
+  (per its persistence settings) is lost as well. When Redis can't be
+  reached the download is written synchronously instead.
+* ``memory``: a per-process buffer, flushed inline once it holds a full
+  batch. A process exit loses up to ``batch_size - 1`` records. Meant for
+  development and tests.
+* ``sync``: no buffering, one insert per request.
+
+``Image.downloads_count`` lags behind by at most one flush interval.
+"""
+
+import json
+import logging
+import threading
+import uuid
+from collections import Counter, deque
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import DataError, IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from redis.exceptions import RedisError
+from hoy.counters import adjust
+from . import leaderboards
+from .models import Image, ImageDownload
+
+logger = logging.getLogger(__name__)
+
+BUFFER_KEY = 'gallery:downloads:buffer'
+DEAD_LETTER_KEY = 'gallery:downloads:dead'
+# Dead letters kept for inspection; older ones are dropped
+DEAD_LETTER_MAX = 10000
+DEFAULT_BATCH_SIZE = 500
+# Errors a record causes by itself; retrying it would fail the same way
+RECORD_ERRORS = (IntegrityError, DataError, ValidationError, KeyError, TypeError, ValueError)
+
+
+def _batch_size():
+    return getattr(settings, 'GALLERY_DOWNLOAD_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+
+
+class MemoryBuffer:
+    """Process-local FIFO buffer."""
+
+    def __init__(self):
+        self._records = deque()
+        self.dead_letters = []
+        self._lock = threading.Lock()
+
+    def push(self, record):
+        with self._lock:
+            self._records.append(record)
+            return len(self._records)
+
+    def pop(self, count):
+        with self._lock:
+            return [self._records.popleft() for _ in range(min(count, len(self._records)))]
+
+    def requeue(self, records):
+        with self._lock:
+            self._records.extendleft(reversed(records))
+
+    def dead_letter(self, record):
+        with self._lock:
+            self.dead_letters = [*self.dead_letters, record][-DEAD_LETTER_MAX:]
+
+    def __len__(self):
+        return len(self._records)
+
+
+class RedisBuffer:
+    """FIFO buffer backed by a Redis list shared by all processes."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def push(self, record):
+        return self.connection.rpush(BUFFER_KEY, json.dumps(record))
+
+    def pop(self, count):
+        # LRANGE + LTRIM in one MULTI so concurrent flushers never share rows
+        pipe = self.connection.pipeline(transaction=True)
+        pipe.lrange(BUFFER_KEY, 0, count - 1)
+        pipe.ltrim(BUFFER_KEY, count, -1)
+        raw, _ = pipe.execute()
+        return [json.loads(item) for item in raw]
+
+    def requeue(self, records):
+        if records:
+            self.connection.lpush(BUFFER_KEY, *[json.dumps(r) for r in reversed(records)])
+
+    def dead_letter(self, record):
+        pipe = self.connection.pipeline(transaction=False)
+        pipe.rpush(DEAD_LETTER_KEY, json.dumps(record))
+        pipe.ltrim(DEAD_LETTER_KEY, -DEAD_LETTER_MAX, -1)
+        pipe.execute()
+
+    def __len__(self):
+        return self.connection.llen(BUFFER_KEY)
+
+
+_memory_buffer = MemoryBuffer()
+
+
+def get_buffer():
+    """Return the configured buffer, or ``None`` when downloads are written directly."""
+    mode = getattr(settings, 'GALLERY_DOWNLOAD_BUFFER', 'redis')
+    if mode == 'memory':
+        return _memory_buffer
+    if mode == 'redis':
+        connection = leaderboards.get_connection()
+        return RedisBuffer(connection) if connection is not None else None
+    return None
+
+
+def _to_record(download):
+    return {
+        'id': str(download.id),
+        'image': str(download.image_id),
+        'user': str(download.user_id),
+        'created_at': download.created_at.isoformat(),
+        'ip_address': download.ip_address,
+        'user_agent': download.user_agent,
+    }
+
+
+def record_download(image, user, ip_address=None, user_agent=''):
+    """Track a download of ``image`` by ``user``.
+
+    Returns the ``ImageDownload``; it is unsaved when buffered, but its id
+    and timestamp are the ones the flushed row will get.
+    """
+    download = ImageDownload(
+        id=uuid.uuid4(),
+        image=image,
+        user=user,
+        created_at=timezone.now(),
+        ip_address=ip_address,
+        user_agent=user_agent,
+    )
+    buffer = get_buffer()
+    if buffer is None:
+        download.save(force_insert=True)
+        return download
+
+    try:
+        size = buffer.push(_to_record(download))
+    except RedisError:
+        # Redis unavailable: fall back to a direct insert rather than lose it
+        download.save(force_insert=True)
+        return download
+
+    if isinstance(buffer, MemoryBuffer) and size >= _batch_size():
+        transaction.on_commit(flush_downloads)
+    return download
+
+
+def _write_batch(records):
+    """Insert ``records`` and roll their counts up per image."""
+    image_ids = {str(pk) for pk in Image.objects.filter(
+        pk__in={r['image'] for r in records}
+    ).values_list('pk', flat=True)}
+    user_ids = {str(pk) for pk in get_user_model().objects.filter(
+        pk__in={r['user'] for r in records}
+    ).values_list('pk', flat=True)}
+
+    downloads = [
+        ImageDownload(
+            id=record['id'],
+            image_id=record['image'],
+            user_id=record['user'],
+            created_at=parse_datetime(record['created_at']),
+            ip_address=record['ip_address'],
+            user_agent=record['user_agent'],
+        )
+        for record in records
+        # Skip rows whose image or user was deleted while buffered
+        if record['image'] in image_ids and record['user'] in user_ids
+    ]
+    # bulk_create doesn't send post_save, so counters are adjusted here
+    ImageDownload.objects.bulk_create(downloads)
+    for image_id, count in Counter(d.image_id for d in downloads).items():
+        adjust(Image, image_id, touch=True, downloads_count=count)
+    daily = Counter((d.image_id, leaderboards.day_of(d.created_at)) for d in downloads)
+    transaction.on_commit(lambda: leaderboards.record_images(leaderboards.DOWNLOADS, daily))
+    return len(downloads)
+
+
+def _write_each(buffer, records):
+    """Write ``records`` one at a time, dead-lettering those that fail."""
+    written = 0
+    for index, record in enumerate(records):
+        try:
+            with transaction.atomic():
+                written += _write_batch([record])
+        except RECORD_ERRORS as exc:
+            logger.warning('Dead-lettering download record %s: %s', record.get('id'), exc)
+            buffer.dead_letter({**record, 'error': str(exc)})
+        except Exception:
+            buffer.requeue(records[index:])
+            raise
+    return written
+
+
+def flush_downloads(batch_size=None, max_batches=None):
+    """Drain the buffer into the database. Returns the number of rows written."""
+    buffer = get_buffer()
+    if buffer is None:
+        return 0
+
+    batch_size = batch_size or _batch_size()
+    written = batches = 0
+    while max_batches is None or batches < max_batches:
+        records = buffer.pop(batch_size)
+        if not records:
+            break
+        try:
+            with transaction.atomic():
+                written += _write_batch(records)
+        except RECORD_ERRORS:
+            # A bad record would fail this batch on every flush
+            written += _write_each(buffer, records)
+        except Exception:
+            buffer.requeue(records)
+            raise
+        batches += 1
+    return written
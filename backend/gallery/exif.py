@@ -0,0 +1,59 @@
+"""EXIF parsing for gallery uploads.
+
+Kept free of Django imports so it can run in worker processes. Only the
+leading bytes of a file are needed: EXIF lives in the first segments of a
+JPEG/TIFF/WebP and Pillow reads it while identifying the image, without
+decoding any pixel data.
+"""
+
+from io import BytesIO
+
+from PIL import ExifTags, Image, UnidentifiedImageError
+
+HEADER_BYTES = 128 * 1024
+
+# EXIF tag name -> camera_info key
+CAMERA_TAGS = {
+    'Make': 'make',
+    'Model': 'model',
+    'LensModel': 'lens',
+    'FNumber': 'aperture',
+    'ExposureTime': 'exposure_time',
+    'ISOSpeedRatings': 'iso',
+    'FocalLength': 'focal_length',
+    'DateTimeOriginal': 'taken_at',
+}
+
+
+def _json_value(value):
+    if isinstance(value, bytes):
+        value = value.decode('utf-8', 'replace')
+    if isinstance(value, str):
+        return value.strip('\x00 ').strip()
+    if isinstance(value, (tuple, list)):
+        return [_json_value(item) for item in value]
+    if isinstance(value, int):
+        return value
+    try:
+        # IFDRational and friends
+        return round(float(value), 4)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return str(value)
+
+
+def extract_camera_info(header):
+    """Return the ``camera_info`` dict for an image given its leading bytes."""
+    try:
+        with Image.open(BytesIO(header)) as image:
+            exif = image.getexif()
+            tags = dict(exif)
+            tags.update(exif.get_ifd(ExifTags.IFD.Exif))
+    except (UnidentifiedImageError, OSError, SyntaxError, ValueError):
+        return {}
+
+    info = {}
+    for tag_id, value in tags.items():
+        key = CAMERA_TAGS.get(ExifTags.TAGS.get(tag_id))
+        if key is not None:
+            info[key] = _json_value(value)
+    return info
@@ -0,0 +1,158 @@
+"""Background ingestion of gallery images.
+
+After an image is stored, ``gallery.tasks.ingest_images`` fills in
+``camera_info`` from the EXIF header bytes, computes a 64-bit difference
+hash (dHash) used to flag near-duplicates within the gallery, and adds
+automatic tags. Values entered by hand are kept.
+
+Each task handles a chunk of images. Storage reads and hashing run in a
+small thread pool with a bounded number of files in flight, while the
+duplicate lookups and writes happen in upload order on the task's own
+database connection. Celery workers take one chunk at a time
+(``CELERY_WORKER_PREFETCH_MULTIPLIER = 1``), so a large upload queues up
+instead of monopolizing the workers, and web workers only publish tasks.
+"""
+
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image as PILImage, ImageOps, UnidentifiedImageError
+from .exif import HEADER_BYTES, extract_camera_info
+from .models import Image
+from .phash import hash_bands, similar_images
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 8
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def difference_hash(handle):
+    """64-bit dHash of an image file as 16 hex digits, plus its size."""
+    with PILImage.open(handle) as image:
+        size = image.size
+        # JPEGs are decoded at reduced scale straight from the DCT data
+        image.draft('L', (HASH_SIZE * 8, HASH_SIZE * 8))
+        small = ImageOps.exif_transpose(image).convert('L').resize(
+            (HASH_SIZE + 1, HASH_SIZE), PILImage.Resampling.LANCZOS
+        )
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            offset = row * (HASH_SIZE + 1) + col
+            bits = (bits << 1) | (pixels[offset] > pixels[offset + 1])
+    return f'{bits:016x}', size
+
+
+def auto_tags(size, camera_info):
+    """Tags derived from image geometry and EXIF."""
+    width, height = size
+    tags = []
+    if width > height * 1.05:
+        tags.append('landscape')
+    elif height > width * 1.05:
+        tags.append('portrait')
+    else:
+        tags.append('square')
+    if width * height >= 12_000_000:
+        tags.append('high-res')
+
+    taken_at = camera_info.get('taken_at', '')
+    try:
+        # EXIF timestamps look like "2024:06:01 23:15:00"
+        hour = int(taken_at[11:13])
+    except (TypeError, ValueError):
+        hour = None
+    if hour is not None:
+        tags.append('night' if hour >= 20 or hour < 6 else 'day')
+
+    make = camera_info.get('make')
+    if make:
+        tags.append(make.split()[0].lower())
+    return tags
+
+
+def analyze(image):
+    """Read and hash one image. Runs in a pool thread, without DB access."""
+    field_file = image.image
+    try:
+        with field_file.storage.open(field_file.name, 'rb') as handle:
+            camera_info = extract_camera_info(handle.read(HEADER_BYTES))
+            handle.seek(0)
+            phash, size = difference_hash(handle)
+    except (OSError, UnidentifiedImageError) as exc:
+        logger.warning('Cannot ingest %s: %s', field_file.name, exc)
+        return None
+    return {
+        'camera_info': camera_info,
+        'phash': phash,
+        'tags': auto_tags(size, camera_info),
+    }
+
+
+def find_duplicate(image, phash):
+    """Closest other original in the gallery within the duplicate distance."""
+    candidates = Image.objects.filter(
+        gallery_id=image.gallery_id, duplicate_of__isnull=True
+    ).exclude(pk=image.pk)
+    matches = similar_images(candidates, phash, _setting('GALLERY_DUPLICATE_DISTANCE', 6))
+    return matches[0][0] if matches else None
+
+
+def _apply(image, result):
+    manual_tags = [tag for tag in image.tags if tag not in result['tags']]
+    Image.objects.filter(pk=image.pk).update(
+        # Hand-entered values win over extracted ones
+        camera_info={**result['camera_info'], **image.camera_info},
+        tags=manual_tags + result['tags'],
+        phash=result['phash'],
+        **hash_bands(result['phash']),
+        duplicate_of_id=find_duplicate(image, result['phash']),
+        updated_at=timezone.now(),
+    )
+
+
+def ingest_batch(pks):
+    """Ingest the images with primary keys ``pks``. Returns how many succeeded."""
+    images = list(Image.objects.filter(pk__in=pks).order_by('created_at'))
+    workers = _setting('GALLERY_INGEST_THREADS', 4)
+    ingested = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Keep at most 2 * workers files open at once
+        in_flight = deque()
+        remaining = iter(images)
+        for image in remaining:
+            in_flight.append((image, pool.submit(analyze, image)))
+            if len(in_flight) >= workers * 2:
+                break
+        while in_flight:
+            image, future = in_flight.popleft()
+            next_image = next(remaining, None)
+            if next_image is not None:
+                in_flight.append((next_image, pool.submit(analyze, next_image)))
+            result = future.result()
+            if result is not None:
+                with transaction.atomic():
+                    _apply(image, result)
+                ingested += 1
+    return ingested
+
+
+def schedule_ingestion(pks):
+    """Queue ingestion of ``pks`` in chunks once the transaction commits."""
+    from .tasks import ingest_images
+
+    chunk_size = _setting('GALLERY_INGEST_CHUNK_SIZE', 50)
+    pks = [str(pk) for pk in pks]
+    for start in range(0, len(pks), chunk_size):
+        chunk = pks[start:start + chunk_size]
+        transaction.on_commit(lambda chunk=chunk: ingest_images.delay(chunk))
@@ -0,0 +1,189 @@
+"""Redis sorted-set leaderboards for image likes and downloads.
+
+Every like, unlike and download increments the image's score in an
+all-time set and in a per-day bucket, for three scopes: global, its gallery
+and its event. Windowed rankings ("last 7 days") are the union of the
+recent day buckets, cached briefly under their own key. Day buckets expire
+after ``GALLERY_LEADERBOARD_MAX_DAYS``.
+
+Reads return ``None`` when Redis is unavailable so callers can fall back
+to the database; ``rebuild`` recomputes everything from the database.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from redis.exceptions import RedisError
+from .models import Image, ImageDownload, ImageLike
+
+logger = logging.getLogger(__name__)
+
+LIKES = 'likes'
+DOWNLOADS = 'downloads'
+METRICS = {LIKES: ImageLike, DOWNLOADS: ImageDownload}
+
+KEY_PREFIX = 'gallery:lb'
+WINDOW_CACHE_SECONDS = 60
+
+
+def day_of(moment):
+    return timezone.localdate(moment)
+
+
+def max_days():
+    return getattr(settings, 'GALLERY_LEADERBOARD_MAX_DAYS', 30)
+
+
+def get_connection():
+    """Raw Redis connection behind the default cache, or ``None``."""
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+    except (ImportError, NotImplementedError):
+        # The default cache isn't backed by django-redis
+        return None
+
+
+def _scopes(gallery_id, event_id):
+    return ['global', f'gallery:{gallery_id}', f'event:{event_id}']
+
+
+def _key(metric, scope, day=None):
+    key = f'{KEY_PREFIX}:{metric}:{scope}'
+    return f'{key}:day:{day:%Y%m%d}' if day else key
+
+
+def record(metric, entries):
+    """Apply score changes.
+
+    ``entries`` holds ``(image_id, gallery_id, event_id, delta, day)``
+    tuples; ``day`` is the date the like/download happened, so an unlike
+    is taken off the bucket its like was counted in.
+    """
+    connection = get_connection()
+    if connection is None:
+        return
+    oldest = timezone.localdate() - timedelta(days=max_days())
+    ttl = int(timedelta(days=max_days() + 1).total_seconds())
+    touched = set()
+    pipe = connection.pipeline(transaction=False)
+    for image_id, gallery_id, event_id, delta, day in entries:
+        member = str(image_id)
+        for scope in _scopes(gallery_id, event_id):
+            keys = [_key(metric, scope)]
+            if day > oldest:
+                keys.append(_key(metric, scope, day))
+            for key in keys:
+                pipe.zincrby(key, delta, member)
+                if delta < 0:
+                    touched.add(key)
+                if key != keys[0]:
+                    pipe.expire(key, ttl)
+    for key in touched:
+        # Unliked images drop off instead of lingering with a zero score
+        pipe.zremrangebyscore(key, '-inf', 0)
+    try:
+        pipe.execute()
+    except RedisError:
+        logger.warning('Leaderboard update failed; run rebuild_leaderboards', exc_info=True)
+
+
+def record_images(metric, counts):
+    """``record`` for ``{(image_id, day): delta}``, looking up gallery and event ids."""
+    if not counts:
+        return
+    scopes = {
+        str(pk): (gallery_id, event_id)
+        for pk, gallery_id, event_id in Image.objects.filter(
+            pk__in={image_id for image_id, _ in counts}
+        ).values_list('pk', 'gallery_id', 'gallery__event_id')
+    }
+    record(metric, [
+        (image_id, *scopes[str(image_id)], delta, day)
+        for (image_id, day), delta in counts.items()
+        if str(image_id) in scopes
+    ])
+
+
+def remove_image(image_id, gallery_id):
+    """Drop a deleted image from the global and gallery all-time sets.
+
+    Day buckets expire on their own; leftovers in event sets are skipped
+    when results are loaded and cleared by ``rebuild``.
+    """
+    connection = get_connection()
+    if connection is None:
+        return
+    pipe = connection.pipeline(transaction=False)
+    for metric in METRICS:
+        for scope in _scopes(gallery_id, None)[:2]:
+            pipe.zrem(_key(metric, scope), str(image_id))
+    try:
+        pipe.execute()
+    except RedisError:
+        logger.warning('Leaderboard cleanup failed', exc_info=True)
+
+
+def top(metric, scope='global', days=None, limit=10):
+    """Top ``limit`` image ids with scores, best first, or ``None`` on error."""
+    connection = get_connection()
+    if connection is None:
+        return None
+    try:
+        if days:
+            key = f'{_key(metric, scope)}:last{days}'
+            if not connection.exists(key):
+                today = timezone.localdate()
+                buckets = [_key(metric, scope, today - timedelta(days=n)) for n in range(days)]
+                pipe = connection.pipeline()
+                pipe.zunionstore(key, buckets)
+                pipe.expire(key, WINDOW_CACHE_SECONDS)
+                pipe.execute()
+        else:
+            key = _key(metric, scope)
+        rows = connection.zrevrange(key, 0, limit - 1, withscores=True)
+    except RedisError:
+        logger.warning('Leaderboard read failed', exc_info=True)
+        return None
+    return [(member.decode(), int(score)) for member, score in rows]
+
+
+def _rebuild_entries(model, since):
+    fields = ('image_id', 'image__gallery_id', 'image__gallery__event_id')
+    totals = model.objects.values(*fields).annotate(total=Count('pk')).order_by()
+    daily = model.objects.filter(created_at__date__gte=since).annotate(
+        day=TruncDate('created_at')
+    ).values(*fields, 'day').annotate(total=Count('pk')).order_by()
+    for row in totals:
+        yield (*(row[field] for field in fields), row['total'], None)
+    for row in daily:
+        yield (*(row[field] for field in fields), row['total'], row['day'])
+
+
+def rebuild():
+    """Recompute every leaderboard from the database. Returns keys written."""
+    connection = get_connection()
+    if connection is None:
+        return 0
+    since = timezone.localdate() - timedelta(days=max_days() - 1)
+    ttl = int(timedelta(days=max_days() + 1).total_seconds())
+
+    # One MULTI so readers never see the sets half rebuilt
+    pipe = connection.pipeline(transaction=True)
+    for key in connection.scan_iter(f'{KEY_PREFIX}:*'):
+        pipe.delete(key)
+    keys = set()
+    for metric, model in METRICS.items():
+        for image_id, gallery_id, event_id, total, day in _rebuild_entries(model, since):
+            for scope in _scopes(gallery_id, event_id):
+                key = _key(metric, scope, day)
+                pipe.zadd(key, {str(image_id): total})
+                if day is not None and key not in keys:
+                    pipe.expire(key, ttl)
+                keys.add(key)
+    pipe.execute()
+    return len(keys)
@@ -0,0 +1,96 @@
+import time
+import uuid
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from django.utils import timezone
+from events.models import Event
+from gallery.downloads import flush_downloads, record_download
+from gallery.models import Gallery, Image, ImageDownload
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    """Raised to discard the benchmark fixtures and rows."""
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request ImageDownload inserts with buffered batch writes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=5000,
+            help='Number of downloads to record per strategy'
+        )
+        parser.add_argument(
+            '--images',
+            type=int,
+            default=20,
+            help='Number of images the downloads are spread over'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Flush batch size for the buffered strategy'
+        )
+
+    def handle(self, *args, **options):
+        count = options['count']
+        batch_size = options['batch_size']
+
+        # Everything runs in one transaction that is rolled back at the end
+        try:
+            with transaction.atomic():
+                user, images = self._fixtures(options['images'])
+
+                started = time.perf_counter()
+                for i in range(count):
+                    # One statement plus the counter update, as the old view did
+                    with transaction.atomic():
+                        ImageDownload.objects.create(user=user, image=images[i % len(images)])
+                direct = time.perf_counter() - started
+
+                with override_settings(
+                    GALLERY_DOWNLOAD_BUFFER='memory',
+                    GALLERY_DOWNLOAD_BATCH_SIZE=count + 1,
+                ):
+                    started = time.perf_counter()
+                    for i in range(count):
+                        record_download(images[i % len(images)], user)
+                    enqueued = time.perf_counter() - started
+                    flush_downloads(batch_size=batch_size)
+                    buffered = time.perf_counter() - started
+
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(f'Per-request inserts: {count / direct:,.0f} downloads/s ({direct:.2f}s)')
+        self.stdout.write(f'Buffered enqueue:    {count / enqueued:,.0f} downloads/s ({enqueued:.2f}s)')
+        self.stdout.write(f'Buffered end-to-end: {count / buffered:,.0f} downloads/s ({buffered:.2f}s)')
+        self.stdout.write(self.style.SUCCESS(f'Speedup: {direct / buffered:.1f}x'))
+
+    def _fixtures(self, image_count):
+        user = User.objects.create_user(
+            email=f'benchmark-{uuid.uuid4().hex[:8]}@example.com',
+            password=uuid.uuid4().hex,
+        )
+        event = Event.objects.create(
+            title='Download benchmark',
+            description='',
+            date=timezone.now().date(),
+            start_time=timezone.now().time(),
+            location={'name': 'Benchmark'},
+            capacity=1,
+        )
+        gallery = Gallery.objects.create(event=event, title='Benchmark', cover_image='c.jpg')
+        images = [
+            Image.objects.create(gallery=gallery, image=f'benchmark-{i}.jpg')
+            for i in range(image_count)
+        ]
+        return user, images
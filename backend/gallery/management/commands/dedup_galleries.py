@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from gallery.models import Gallery, Image
+from gallery.phash import BKTree
+
+
+class Command(BaseCommand):
+    help = 'Mark (or delete) near-duplicate images within each gallery'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--gallery',
+            help='Only process the gallery with this id'
+        )
+        parser.add_argument(
+            '--distance',
+            type=int,
+            default=getattr(settings, 'GALLERY_DUPLICATE_DISTANCE', 6),
+            help='Maximum differing hash bits for two images to count as duplicates'
+        )
+        parser.add_argument(
+            '--delete',
+            action='store_true',
+            help='Delete duplicates and their files instead of marking them'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report duplicates without changing anything'
+        )
+
+    def handle(self, *args, **options):
+        galleries = Gallery.objects.all()
+        if options['gallery']:
+            galleries = galleries.filter(pk=options['gallery'])
+
+        total = 0
+        for gallery in galleries.iterator():
+            duplicates = self.find_duplicates(gallery, options['distance'])
+            total += len(duplicates)
+            if duplicates:
+                self.stdout.write(f'{gallery}: {len(duplicates)} duplicate(s)')
+            if options['dry_run'] or not duplicates:
+                continue
+
+            with transaction.atomic():
+                if options['delete']:
+                    for image in Image.objects.filter(pk__in=duplicates):
+                        image.image.delete(save=False)
+                        image.delete()
+                else:
+                    for duplicate_pk, original_pk in duplicates.items():
+                        Image.objects.filter(pk=duplicate_pk).update(duplicate_of_id=original_pk)
+
+        unhashed = Image.objects.filter(phash='').count()
+        if unhashed:
+            self.stdout.write(self.style.WARNING(
+                f'{unhashed} image(s) have no hash yet and were skipped'
+            ))
+        verb = 'Found' if options['dry_run'] else ('Deleted' if options['delete'] else 'Marked')
+        self.stdout.write(self.style.SUCCESS(f'{verb} {total} duplicate(s)'))
+
+    def find_duplicates(self, gallery, distance):
+        """Map duplicate pk -> original pk; the earliest upload is the original."""
+        tree = BKTree()
+        duplicates = {}
+        images = gallery.images.exclude(phash='').order_by('created_at')
+        for pk, phash in images.values_list('pk', 'phash'):
+            matches = tree.search(phash, distance)
+            if matches:
+                duplicates[pk] = matches[0][1]
+            else:
+                tree.add(phash, pk)
+        return duplicates
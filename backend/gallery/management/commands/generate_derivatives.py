@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from events.models import DJ, Event
+from gallery.models import Gallery, Image
+from hoy.thumbnails import generate_image_derivatives
+
+MODELS = [Image, Gallery, Event, DJ]
+
+class Command(BaseCommand):
+    help = 'Queue thumbnail generation for images that have no derivatives yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sync',
+            action='store_true',
+            help='Render in this process instead of queueing Celery tasks'
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for model in MODELS:
+            pks = model.objects.exclude(
+                **{model.derivative_field: ''}
+            ).filter(derivatives={}).values_list('pk', flat=True)
+            queued = 0
+            for pk in pks.iterator():
+                if options['sync']:
+                    generate_image_derivatives(model._meta.label, str(pk))
+                else:
+                    generate_image_derivatives.delay(model._meta.label, str(pk))
+                queued += 1
+            total += queued
+            self.stdout.write(f'{model.__name__}: {queued} queued')
+
+        self.stdout.write(self.style.SUCCESS(f'Queued {total} image(s)'))
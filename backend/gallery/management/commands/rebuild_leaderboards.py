@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand, CommandError
+from gallery import leaderboards
+
+
+class Command(BaseCommand):
+    help = 'Recompute the Redis image leaderboards from likes and downloads in the database'
+
+    def handle(self, *args, **options):
+        if leaderboards.get_connection() is None:
+            raise CommandError('The default cache is not backed by Redis')
+        keys = leaderboards.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {keys} leaderboard key(s)'))
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:36
+
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    from hoy.counters import reconcile
+
+    Gallery = apps.get_model('gallery', 'Gallery')
+    Image = apps.get_model('gallery', 'Image')
+    ImageLike = apps.get_model('gallery', 'ImageLike')
+    ImageDownload = apps.get_model('gallery', 'ImageDownload')
+    reconcile(Gallery, 'images_count', Image, 'gallery')
+    reconcile(Image, 'likes_count', ImageLike, 'image')
+    reconcile(Image, 'downloads_count', ImageDownload, 'image')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0002_image_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gallery',
+            name='images_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='downloads_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
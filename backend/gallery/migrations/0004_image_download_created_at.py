@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:42
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0003_gallery_image_counters'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='imagedownload',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
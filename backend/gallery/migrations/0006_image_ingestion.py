@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0005_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='image',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='gallery.image'),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='phash',
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+    ]
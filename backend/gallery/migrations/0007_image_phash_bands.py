@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:56
+
+from django.db import migrations, models
+
+
+# Frozen copy of the gallery.phash band layout as of this migration, so
+# later changes to that module can't alter (or break) the backfill
+BANDS = 4
+BAND_BITS = 16
+
+
+def hash_bands(phash):
+    value = int(phash, 16)
+    mask = (1 << BAND_BITS) - 1
+    return {
+        f'phash_band{i}': (value >> (BAND_BITS * (BANDS - 1 - i))) & mask
+        for i in range(BANDS)
+    }
+
+
+def backfill_bands(apps, schema_editor):
+    Image = apps.get_model('gallery', 'Image')
+    images = Image.objects.exclude(phash='').only('pk', 'phash')
+    for image in images.iterator():
+        Image.objects.filter(pk=image.pk).update(**hash_bands(image.phash))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0006_image_ingestion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='image',
+            name='phash_band0',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='phash_band1',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='phash_band2',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='phash_band3',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='image',
+            index=models.Index(fields=['gallery', 'phash_band0'], name='gallery_img_phash_b0'),
+        ),
+        migrations.AddIndex(
+            model_name='image',
+            index=models.Index(fields=['gallery', 'phash_band1'], name='gallery_img_phash_b1'),
+        ),
+        migrations.AddIndex(
+            model_name='image',
+            index=models.Index(fields=['gallery', 'phash_band2'], name='gallery_img_phash_b2'),
+        ),
+        migrations.AddIndex(
+            model_name='image',
+            index=models.Index(fields=['gallery', 'phash_band3'], name='gallery_img_phash_b3'),
+        ),
+        migrations.RunPython(backfill_bands, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0007_image_phash_bands'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='image',
+            index=models.Index(fields=['gallery', '-created_at'], name='gallery_img_created'),
+        ),
+        migrations.AddIndex(
+            model_name='image',
+            index=models.Index(fields=['gallery', 'updated_at'], name='gallery_img_updated'),
+        ),
+    ]
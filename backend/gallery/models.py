@@ -1,18 +1,28 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from events.models import Event
+from hoy.counters import CounterFieldsMixin
+from hoy.thumbnails import DerivativesMixin
 import uuid
 
-class Gallery(models.Model):
+class Gallery(CounterFieldsMixin, DerivativesMixin, models.Model):
     """Model for organizing event images into galleries."""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='galleries', to_field='id')
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     cover_image = models.ImageField(upload_to='gallery_covers/')
+    # Resized renditions of cover_image, see hoy.thumbnails
+    derivatives = models.JSONField(default=dict, blank=True, editable=False)
+    # Denormalized counter, maintained by gallery.signals
+    images_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    counter_fields = ('images_count',)
+    derivative_field = 'cover_image'
+
     class Meta:
         verbose_name_plural = 'galleries'
         ordering = ['-created_at']
@@ -20,22 +30,57 @@ class Gallery(models.Model):
     def __str__(self):
         return f"{self.event.title} - {self.title}"
 
-class Image(models.Model):
+class Image(CounterFieldsMixin, DerivativesMixin, models.Model):
     """Model for individual images within a gallery."""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     gallery = models.ForeignKey(Gallery, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='event_gallery/')
+    # Resized renditions of image, see hoy.thumbnails
+    derivatives = models.JSONField(default=dict, blank=True, editable=False)
     caption = models.CharField(max_length=200, blank=True)
     photographer = models.CharField(max_length=100, blank=True)
     is_featured = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     # Image metadata
     camera_info = models.JSONField(default=dict, blank=True)
     tags = models.JSONField(default=list, blank=True)
+    # Filled in by gallery.ingest after upload
+    phash = models.CharField(max_length=16, blank=True, editable=False)
+    # 16-bit slices of phash for indexed Hamming lookups, see gallery.phash
+    phash_band0 = models.PositiveIntegerField(null=True, editable=False)
+    phash_band1 = models.PositiveIntegerField(null=True, editable=False)
+    phash_band2 = models.PositiveIntegerField(null=True, editable=False)
+    phash_band3 = models.PositiveIntegerField(null=True, editable=False)
+    duplicate_of = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='duplicates'
+    )
+    
+    # Denormalized counters, maintained by gallery.signals
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+    downloads_count = models.PositiveIntegerField(default=0, editable=False)
+    
+    counter_fields = ('likes_count', 'downloads_count')
+    derivative_field = 'image'
     
     class Meta:
         ordering = ['-created_at']
+        # Duplicates are looked up within a gallery, one index per band
+        indexes = [
+            models.Index(fields=['gallery', 'phash_band0'], name='gallery_img_phash_b0'),
+            models.Index(fields=['gallery', 'phash_band1'], name='gallery_img_phash_b1'),
+            models.Index(fields=['gallery', 'phash_band2'], name='gallery_img_phash_b2'),
+            models.Index(fields=['gallery', 'phash_band3'], name='gallery_img_phash_b3'),
+            # Cursor pages and detail ETags of a gallery's images
+            models.Index(fields=['gallery', '-created_at'], name='gallery_img_created'),
+            models.Index(fields=['gallery', 'updated_at'], name='gallery_img_updated'),
+        ]
 
     def __str__(self):
         return f"{self.gallery.title} - {self.caption or 'Untitled'}"
@@ -58,7 +103,8 @@ class ImageDownload(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, to_field='id')
     image = models.ForeignKey(Image, on_delete=models.CASCADE, related_name='downloads')
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the download happens, not when gallery.downloads flushes it
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
 
@@ -0,0 +1,17 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class GalleryImagePagination(CursorPagination):
+    """Newest-first cursor pages over a gallery's images.
+
+    Cursors encode the last ``created_at`` seen, so every page is an index
+    range scan on ``(gallery, created_at)`` however deep the client goes.
+    """
+    ordering = '-created_at'
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def get_page_size(self, request):
+        self.page_size = getattr(settings, 'GALLERY_IMAGES_PAGE_SIZE', 50)
+        return super().get_page_size(request)
@@ -1,54 +1,78 @@
+import copy
+
+from django.conf import settings
+from django.http import QueryDict
+from django.urls import reverse
 from rest_framework import serializers
+from rest_framework.request import Request
+from hoy.thumbnails import SrcsetField
 from .models import Gallery, Image, ImageLike, ImageDownload
+from .pagination import GalleryImagePagination
 
 class ImageSerializer(serializers.ModelSerializer):
-    likes_count = serializers.SerializerMethodField()
-    downloads_count = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
+    image_srcset = SrcsetField()
     
     class Meta:
         model = Image
-        fields = ('id', 'image', 'caption', 'photographer', 'is_featured',
-                 'camera_info', 'tags', 'created_at', 'likes_count',
+        fields = ('id', 'image', 'image_srcset', 'caption', 'photographer',
+                 'is_featured', 'camera_info', 'tags', 'created_at', 'likes_count',
                  'downloads_count', 'is_liked')
     
-    def get_likes_count(self, obj):
-        return obj.likes.count()
-    
-    def get_downloads_count(self, obj):
-        return obj.downloads.count()
-    
     def get_is_liked(self, obj):
+        # Views resolve the user's likes for the whole page in one query
+        liked_ids = self.context.get('liked_image_ids')
+        if liked_ids is not None:
+            return obj.pk in liked_ids
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.likes.filter(user=request.user).exists()
         return False
 
 class GallerySerializer(serializers.ModelSerializer):
-    images = ImageSerializer(many=True, read_only=True)
-    images_count = serializers.SerializerMethodField()
+    """Gallery detail embedding the first page of its images.
+
+    ``images_next`` links to the next page of ``/galleries/{id}/images/``
+    (``None`` when everything fit); ``images_count`` has the total.
+    """
     event_title = serializers.CharField(source='event.title', read_only=True)
+    cover_image_srcset = SrcsetField()
     
     class Meta:
         model = Gallery
         fields = ('id', 'event', 'event_title', 'title', 'description',
-                 'cover_image', 'created_at', 'updated_at', 'images',
+                 'cover_image', 'cover_image_srcset', 'created_at', 'updated_at',
                  'images_count')
-    
-    def get_images_count(self, obj):
-        return obj.images.count()
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        images = Image.objects.filter(gallery_id=instance.pk)
+        request = self.context.get('request')
+        if request is None:
+            paginator = None
+            page = images[:getattr(settings, 'GALLERY_IMAGES_PAGE_SIZE', 50)]
+        else:
+            paginator = GalleryImagePagination()
+            # Always the first page: the detail request's own cursor or
+            # page_size params aren't meant for the embedded images
+            first_page = copy.copy(request._request)
+            first_page.GET = QueryDict()
+            page = paginator.paginate_queryset(images, Request(first_page))
+            paginator.base_url = request.build_absolute_uri(
+                reverse('gallery-images', kwargs={'pk': instance.pk})
+            )
+        data['images'] = ImageSerializer(page, many=True, context=self.context).data
+        data['images_next'] = paginator.get_next_link() if paginator else None
+        return data
 
 class GalleryListSerializer(serializers.ModelSerializer):
-    images_count = serializers.SerializerMethodField()
     event_title = serializers.CharField(source='event.title', read_only=True)
+    cover_image_srcset = SrcsetField()
     
     class Meta:
         model = Gallery
         fields = ('id', 'event', 'event_title', 'title', 'description',
-                 'cover_image', 'created_at', 'images_count')
-    
-    def get_images_count(self, obj):
-        return obj.images.count()
+                 'cover_image', 'cover_image_srcset', 'created_at', 'images_count')
 
 class ImageLikeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -1,15 +1,67 @@
+from django.db import transaction
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Gallery, Image
+from hoy.counters import adjust
+from hoy.thumbnails import schedule_derivatives
+from .ingest import schedule_ingestion
+from . import leaderboards
+from .models import Gallery, Image, ImageLike, ImageDownload
+
+
+def _record(metric, instance, delta):
+    """Update leaderboards for a like/download row once it is committed."""
+    counts = {(instance.image_id, leaderboards.day_of(instance.created_at)): delta}
+    transaction.on_commit(lambda: leaderboards.record_images(metric, counts))
 
 
 @receiver(post_save, sender=Gallery)
 def gallery_saved(sender, instance, created, **kwargs):
     """Handle post-save actions for galleries."""
-    pass  # Add any necessary post-save logic here
+    schedule_derivatives(instance)
 
 
 @receiver(post_save, sender=Image)
 def image_saved(sender, instance, created, **kwargs):
     """Handle post-save actions for images."""
-    pass  # Add any necessary post-save logic here
+    schedule_derivatives(instance)
+    if created:
+        adjust(Gallery, instance.gallery_id, touch=True, images_count=1)
+        schedule_ingestion([instance.pk])
+
+
+@receiver(post_delete, sender=Image)
+def image_deleted(sender, instance, **kwargs):
+    """Keep the gallery image counter and leaderboards in sync."""
+    adjust(Gallery, instance.gallery_id, touch=True, images_count=-1)
+    image_id, gallery_id = instance.pk, instance.gallery_id
+    transaction.on_commit(lambda: leaderboards.remove_image(image_id, gallery_id))
+
+
+@receiver(post_save, sender=ImageLike)
+def image_like_saved(sender, instance, created, **kwargs):
+    """Keep the image like counter and leaderboards in sync."""
+    if created:
+        adjust(Image, instance.image_id, touch=True, likes_count=1)
+        _record(leaderboards.LIKES, instance, 1)
+
+
+@receiver(post_delete, sender=ImageLike)
+def image_like_deleted(sender, instance, **kwargs):
+    """Keep the image like counter and leaderboards in sync."""
+    adjust(Image, instance.image_id, touch=True, likes_count=-1)
+    _record(leaderboards.LIKES, instance, -1)
+
+
+@receiver(post_save, sender=ImageDownload)
+def image_download_saved(sender, instance, created, **kwargs):
+    """Keep the image download counter and leaderboards in sync."""
+    if created:
+        adjust(Image, instance.image_id, touch=True, downloads_count=1)
+        _record(leaderboards.DOWNLOADS, instance, 1)
+
+
+@receiver(post_delete, sender=ImageDownload)
+def image_download_deleted(sender, instance, **kwargs):
+    """Keep the image download counter and leaderboards in sync."""
+    adjust(Image, instance.image_id, touch=True, downloads_count=-1)
+    _record(leaderboards.DOWNLOADS, instance, -1)
@@ -0,0 +1,15 @@
+from celery import shared_task
+from .downloads import flush_downloads
+from .ingest import ingest_batch
+
+
+@shared_task(ignore_result=True)
+def flush_download_buffer():
+    """Write buffered image downloads to the database."""
+    return flush_downloads()
+
+
+@shared_task(ignore_result=True, acks_late=True)
+def ingest_images(pks):
+    """Extract EXIF, hash and tag a chunk of newly stored images."""
+    return ingest_batch(pks)
@@ -0,0 +1,53 @@
+import fakeredis
+import pytest
+from django.utils import timezone
+from events.models import Event
+from gallery.models import Gallery, Image
+from gallery.tasks import ingest_images
+from hoy.thumbnails import generate_image_derivatives
+
+
+@pytest.fixture
+def event():
+    return Event.objects.create(
+        title='Gallery Event',
+        description='Test Description',
+        date=timezone.now().date(),
+        start_time=timezone.now().time(),
+        location={'name': 'Test Venue'},
+        capacity=100,
+        status='published',
+    )
+
+
+@pytest.fixture
+def gallery(event):
+    return Gallery.objects.create(event=event, title='Test Gallery', cover_image='gallery_covers/test.jpg')
+
+
+@pytest.fixture
+def image(gallery):
+    return Image.objects.create(gallery=gallery, image='event_gallery/test.jpg')
+
+
+@pytest.fixture
+def run_tasks(monkeypatch):
+    """Run Celery tasks inline instead of publishing them."""
+    for task in (generate_image_derivatives, ingest_images):
+        monkeypatch.setattr(task, 'delay', task)
+
+
+@pytest.fixture
+def redis_connection(monkeypatch):
+    """In-memory Redis standing in for the django-redis connection."""
+    from gallery import leaderboards
+    connection = fakeredis.FakeRedis()
+    monkeypatch.setattr(leaderboards, 'get_connection', lambda: connection)
+    return connection
+
+
+@pytest.fixture
+def without_redis(monkeypatch):
+    """Leaderboards as if Redis were unreachable, whatever the cache backend."""
+    from gallery import leaderboards
+    monkeypatch.setattr(leaderboards, 'get_connection', lambda: None)
@@ -0,0 +1,83 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from gallery import downloads
+from gallery.models import Image, ImageDownload
+
+
+@pytest.fixture
+def memory_buffer(settings):
+    settings.GALLERY_DOWNLOAD_BUFFER = 'memory'
+    settings.GALLERY_DOWNLOAD_BATCH_SIZE = 100
+    downloads._memory_buffer.pop(len(downloads._memory_buffer))
+    downloads._memory_buffer.dead_letters = []
+    yield downloads._memory_buffer
+    downloads._memory_buffer.pop(len(downloads._memory_buffer))
+
+
+@pytest.mark.django_db
+class TestBufferedDownloads:
+    def test_download_is_buffered_until_flush(self, staff_client, image, memory_buffer):
+        url = reverse('image-download', kwargs={'pk': image.id})
+        response = staff_client.post(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(memory_buffer) == 1
+        assert not ImageDownload.objects.exists()
+
+        assert downloads.flush_downloads() == 1
+        download = ImageDownload.objects.get()
+        assert str(download.id) == response.data['download_info']['id']
+        image.refresh_from_db()
+        assert image.downloads_count == 1
+
+    def test_flush_rolls_up_counters_per_image(self, staff_user, gallery, image, memory_buffer, django_assert_num_queries):
+        other = Image.objects.create(gallery=gallery, image='event_gallery/other.jpg')
+        for _ in range(3):
+            downloads.record_download(image, staff_user)
+        downloads.record_download(other, staff_user)
+
+        # Savepoint pair, image and user checks, one insert and one counter
+        # update per image
+        with django_assert_num_queries(7):
+            assert downloads.flush_downloads() == 4
+
+        image.refresh_from_db()
+        other.refresh_from_db()
+        assert (image.downloads_count, other.downloads_count) == (3, 1)
+
+    def test_failed_flush_requeues_batch(self, staff_user, image, memory_buffer, monkeypatch):
+        downloads.record_download(image, staff_user)
+
+        def fail(records):
+            raise RuntimeError('database unavailable')
+        monkeypatch.setattr(downloads, '_write_batch', fail)
+        with pytest.raises(RuntimeError):
+            downloads.flush_downloads()
+        assert len(memory_buffer) == 1
+
+    def test_bad_records_are_dead_lettered(self, staff_user, image, memory_buffer):
+        written = downloads.record_download(image, staff_user)
+        downloads.flush_downloads()
+        # Re-delivered after it was written, next to a good record
+        memory_buffer.push(downloads._to_record(written))
+        downloads.record_download(image, staff_user)
+        memory_buffer.push({'id': 'not-a-uuid'})
+
+        assert downloads.flush_downloads() == 1
+        assert len(memory_buffer) == 0
+        assert [record['id'] for record in memory_buffer.dead_letters] == [str(written.id), 'not-a-uuid']
+        assert ImageDownload.objects.count() == 2
+        image.refresh_from_db()
+        assert image.downloads_count == 2
+
+    def test_deleted_images_are_skipped(self, staff_user, image, memory_buffer):
+        downloads.record_download(image, staff_user)
+        image.delete()
+        assert downloads.flush_downloads() == 0
+
+    def test_sync_mode_writes_immediately(self, settings, staff_user, image):
+        settings.GALLERY_DOWNLOAD_BUFFER = 'sync'
+        downloads.record_download(image, staff_user)
+        image.refresh_from_db()
+        assert image.downloads_count == 1
+        assert ImageDownload.objects.count() == 1
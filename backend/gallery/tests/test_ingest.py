@@ -0,0 +1,67 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image as PILImage, ImageDraw
+from gallery.ingest import ingest_batch
+from gallery.phash import hamming_distance
+from gallery.models import Image
+
+
+def photo(name, size=(400, 300), shift=0, exif=None):
+    image = PILImage.new('RGB', (400, 300), 'white')
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((50 + shift, 50, 200 + shift, 250), fill='black')
+    draw.ellipse((250, 40, 380, 160), fill='gray')
+    image = image.resize(size)
+    buffer = BytesIO()
+    image.save(buffer, format='JPEG', exif=exif.tobytes() if exif else b'')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.GALLERY_INGEST_THREADS = 2
+
+
+@pytest.mark.django_db
+class TestImageIngestion:
+    def test_extracts_exif_and_tags(self, gallery):
+        exif = PILImage.Exif()
+        exif[0x010F] = 'Sony'
+        exif.get_ifd(0x8769)[0x9003] = '2024:06:01 23:15:00'
+        image = Image.objects.create(gallery=gallery, image=photo('night.jpg', exif=exif), tags=['crowd'])
+
+        assert ingest_batch([image.pk]) == 1
+        image.refresh_from_db()
+        assert image.camera_info == {'make': 'Sony', 'taken_at': '2024:06:01 23:15:00'}
+        assert image.tags == ['crowd', 'landscape', 'night', 'sony']
+        assert len(image.phash) == 16
+
+    def test_manual_camera_info_wins(self, gallery):
+        exif = PILImage.Exif()
+        exif[0x010F] = 'Sony'
+        image = Image.objects.create(
+            gallery=gallery, image=photo('a.jpg', exif=exif), camera_info={'make': 'Leica'}
+        )
+        ingest_batch([image.pk])
+        image.refresh_from_db()
+        assert image.camera_info['make'] == 'Leica'
+
+    def test_flags_near_duplicates_in_gallery(self, gallery):
+        original = Image.objects.create(gallery=gallery, image=photo('a.jpg'))
+        resized = Image.objects.create(gallery=gallery, image=photo('b.jpg', size=(800, 600)))
+        different = Image.objects.create(gallery=gallery, image=photo('c.jpg', shift=140))
+
+        assert ingest_batch([original.pk, resized.pk, different.pk]) == 3
+        for image in (original, resized, different):
+            image.refresh_from_db()
+        assert hamming_distance(original.phash, resized.phash) <= 6
+        assert original.duplicate_of is None
+        assert resized.duplicate_of == original
+        assert different.duplicate_of is None
+
+    def test_unreadable_files_are_skipped(self, gallery):
+        image = Image.objects.create(gallery=gallery, image='event_gallery/missing.jpg')
+        assert ingest_batch([image.pk]) == 0
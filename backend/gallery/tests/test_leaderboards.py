@@ -0,0 +1,97 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from gallery import leaderboards
+from gallery.models import Gallery, Image, ImageDownload, ImageLike
+
+
+@pytest.fixture
+def images(gallery):
+    return [
+        Image.objects.create(gallery=gallery, image=f'event_gallery/{i}.jpg')
+        for i in range(3)
+    ]
+
+
+def ids(response):
+    return [item['id'] for item in response.data]
+
+
+@pytest.mark.django_db
+class TestLeaderboards:
+    def like(self, image, users):
+        for user in users:
+            ImageLike.objects.create(image=image, user=user)
+
+    def test_likes_update_sorted_sets(self, api_client, create_user, images, redis_connection,
+                                      django_capture_on_commit_callbacks):
+        users = [create_user(email=f'fan{i}@example.com') for i in range(3)]
+        with django_capture_on_commit_callbacks(execute=True):
+            self.like(images[1], users)
+            self.like(images[2], users[:1])
+            ImageLike.objects.filter(image=images[2]).delete()
+
+        assert leaderboards.top(leaderboards.LIKES) == [(str(images[1].pk), 3)]
+        response = api_client.get(reverse('image-most-liked'))
+        assert ids(response) == [str(images[1].pk)]
+
+    def test_served_from_redis_without_ranking_query(self, api_client, images, redis_connection,
+                                                     django_assert_num_queries):
+        gallery = images[0].gallery
+        leaderboards.record(leaderboards.DOWNLOADS, [
+            (images[0].pk, gallery.pk, gallery.event_id, 5, timezone.localdate()),
+            (images[2].pk, gallery.pk, gallery.event_id, 9, timezone.localdate()),
+        ])
+        # One in_bulk load of the ranked images
+        with django_assert_num_queries(1):
+            response = api_client.get(reverse('image-most-downloaded'))
+        assert ids(response) == [str(images[2].pk), str(images[0].pk)]
+
+    def test_scopes_and_windows(self, api_client, event, images, redis_connection):
+        other = Image.objects.create(
+            gallery=Gallery.objects.create(event=event, title='Other', cover_image='c.jpg'),
+            image='event_gallery/other.jpg',
+        )
+        today = timezone.localdate()
+        gallery = images[0].gallery
+        leaderboards.record(leaderboards.LIKES, [
+            (images[0].pk, gallery.pk, event.pk, 4, today - timedelta(days=10)),
+            (images[1].pk, gallery.pk, event.pk, 2, today),
+            (other.pk, other.gallery_id, event.pk, 3, today - timedelta(days=1)),
+        ])
+        url = reverse('image-most-liked')
+
+        assert ids(api_client.get(url, {'gallery': str(gallery.pk)})) == [str(images[0].pk), str(images[1].pk)]
+        assert ids(api_client.get(url, {'event': str(event.pk)}))[0] == str(images[0].pk)
+        assert ids(api_client.get(url, {'days': 7})) == [str(other.pk), str(images[1].pk)]
+        assert api_client.get(url, {'days': 365}).status_code == 400
+
+    def test_rebuild_from_database(self, user, images, redis_connection):
+        ImageDownload.objects.create(image=images[0], user=user)
+        ImageDownload.objects.create(image=images[0], user=user)
+        ImageDownload.objects.create(
+            image=images[1], user=user, created_at=timezone.now() - timedelta(days=20)
+        )
+        redis_connection.zadd('gallery:lb:downloads:global', {'stale': 100})
+
+        call_command('rebuild_leaderboards', stdout=StringIO())
+
+        assert leaderboards.top(leaderboards.DOWNLOADS) == [
+            (str(images[0].pk), 2), (str(images[1].pk), 1)
+        ]
+        assert leaderboards.top(leaderboards.DOWNLOADS, days=7) == [(str(images[0].pk), 2)]
+
+    def test_falls_back_to_counters_without_redis(self, api_client, images, without_redis):
+        Image.objects.filter(pk=images[2].pk).update(likes_count=7)
+        response = api_client.get(reverse('image-most-liked'))
+        assert ids(response)[0] == str(images[2].pk)
+
+    def test_empty_sets_fall_back_to_the_database(self, api_client, images, redis_connection):
+        # Redis is up but the sets are gone, e.g. after an eviction
+        Image.objects.filter(pk=images[2].pk).update(likes_count=7)
+        response = api_client.get(reverse('image-most-liked'))
+        assert ids(response)[0] == str(images[2].pk)
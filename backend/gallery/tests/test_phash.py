@@ -0,0 +1,83 @@
+import random
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from gallery.models import Image
+from gallery.phash import BKTree, hamming_distance, hash_bands, similar_images
+
+
+def flip(phash, *bits):
+    value = int(phash, 16)
+    for bit in bits:
+        value ^= 1 << bit
+    return f'{value:016x}'
+
+
+def hashed_image(gallery, phash, **kwargs):
+    return Image.objects.create(
+        gallery=gallery, image='event_gallery/x.jpg', phash=phash, **hash_bands(phash), **kwargs
+    )
+
+
+class TestHashStructures:
+    def test_bands_split_hash(self):
+        assert hash_bands('0123456789abcdef') == {
+            'phash_band0': 0x0123,
+            'phash_band1': 0x4567,
+            'phash_band2': 0x89ab,
+            'phash_band3': 0xcdef,
+        }
+
+    def test_bk_tree_matches_brute_force(self):
+        rng = random.Random(7)
+        hashes = [f'{rng.getrandbits(64):016x}' for _ in range(300)]
+        hashes += [flip(hashes[0], 1, 9, 40), flip(hashes[1], 63)]
+        tree = BKTree()
+        for index, phash in enumerate(hashes):
+            tree.add(phash, index)
+
+        for query in hashes[:5]:
+            expected = sorted(
+                i for i, other in enumerate(hashes) if hamming_distance(query, other) <= 6
+            )
+            assert sorted(item for _, item in tree.search(query, 6)) == expected
+
+
+@pytest.mark.django_db
+class TestIndexedLookup:
+    def test_finds_neighbors_in_one_query(self, gallery, django_assert_num_queries):
+        base = '0123456789abcdef'
+        # 6 bits apart, but only one of them in the last band
+        near = hashed_image(gallery, flip(base, 0, 17, 34, 51, 60, 62))
+        hashed_image(gallery, flip(base, *range(0, 64, 8)))
+
+        with django_assert_num_queries(1):
+            matches = similar_images(Image.objects.all(), base, 6)
+        assert [(pk, distance) for pk, _, distance in matches] == [(near.pk, 6)]
+
+    def test_similar_endpoint(self, api_client, gallery):
+        image = hashed_image(gallery, '0123456789abcdef')
+        twin = hashed_image(gallery, flip(image.phash, 3))
+
+        response = api_client.get(reverse('image-similar', kwargs={'pk': image.pk}))
+        assert [item['id'] for item in response.data] == [str(twin.pk)]
+
+    def test_dedup_command_marks_later_uploads(self, gallery):
+        original = hashed_image(gallery, '0123456789abcdef')
+        copy = hashed_image(gallery, flip(original.phash, 5, 20))
+        other = hashed_image(gallery, 'fedcba9876543210')
+
+        call_command('dedup_galleries', stdout=StringIO())
+        copy.refresh_from_db()
+        other.refresh_from_db()
+        assert copy.duplicate_of == original
+        assert other.duplicate_of is None
+
+    def test_most_liked_skips_duplicates(self, api_client, gallery, without_redis):
+        original = hashed_image(gallery, '0123456789abcdef')
+        hashed_image(gallery, original.phash, duplicate_of=original)
+
+        response = api_client.get(reverse('image-most-liked'))
+        assert [item['id'] for item in response.data] == [str(original.pk)]
@@ -0,0 +1,80 @@
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from rest_framework import status
+from gallery.models import Image
+
+PAYLOAD = bytes(range(256)) * 4
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.FILE_SERVING_BACKEND = 'django'
+
+
+@pytest.fixture
+def stored_image(gallery):
+    image = Image(gallery=gallery)
+    image.image.save('shot.jpg', ContentFile(PAYLOAD), save=False)
+    image.save()
+    return image
+
+
+def body(response):
+    return b''.join(response.streaming_content)
+
+
+@pytest.mark.django_db
+class TestImageFileServing:
+    def url(self, image):
+        return reverse('image-file', kwargs={'pk': image.pk})
+
+    def test_full_file(self, api_client, stored_image):
+        response = api_client.get(self.url(stored_image))
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Accept-Ranges'] == 'bytes'
+        assert response['Content-Disposition'] == 'attachment; filename="shot.jpg"'
+        assert body(response) == PAYLOAD
+
+    @pytest.mark.parametrize('header, start, end', [
+        ('bytes=10-19', 10, 19),
+        ('bytes=1000-', 1000, 1023),
+        ('bytes=-24', 1000, 1023),
+        ('bytes=1020-5000', 1020, 1023),
+    ])
+    def test_range(self, api_client, stored_image, header, start, end):
+        response = api_client.get(self.url(stored_image), HTTP_RANGE=header)
+        assert response.status_code == status.HTTP_206_PARTIAL_CONTENT
+        assert response['Content-Range'] == f'bytes {start}-{end}/1024'
+        assert response['Content-Length'] == str(end - start + 1)
+        assert body(response) == PAYLOAD[start:end + 1]
+
+    def test_unsatisfiable_range(self, api_client, stored_image):
+        response = api_client.get(self.url(stored_image), HTTP_RANGE='bytes=2000-')
+        assert response.status_code == status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        assert response['Content-Range'] == 'bytes */1024'
+
+    def test_x_accel_redirect(self, settings, api_client, stored_image):
+        settings.FILE_SERVING_BACKEND = 'x-accel'
+        response = api_client.get(self.url(stored_image))
+        assert response['X-Accel-Redirect'] == f'/protected-media/{stored_image.image.name}'
+        assert response.content == b''
+
+    def test_remote_storage_redirects_to_presigned_url(self, api_client, stored_image, monkeypatch):
+        def no_path(name):
+            raise NotImplementedError
+        def presigned(name, parameters=None, expire=None):
+            return f'https://bucket.example.com/{name}?expires={expire}'
+        monkeypatch.setattr(default_storage, 'path', no_path)
+        monkeypatch.setattr(default_storage, 'url', presigned)
+
+        response = api_client.get(self.url(stored_image))
+        assert response.status_code == status.HTTP_302_FOUND
+        assert response['Location'].endswith('?expires=300')
+
+    def test_download_points_at_file_endpoint(self, settings, staff_client, stored_image):
+        settings.GALLERY_DOWNLOAD_BUFFER = 'sync'
+        response = staff_client.post(reverse('image-download', kwargs={'pk': stored_image.pk}))
+        assert response.data['download_url'] == 'http://testserver' + self.url(stored_image)
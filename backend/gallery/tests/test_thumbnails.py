@@ -0,0 +1,98 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from PIL import Image as PILImage
+from gallery.models import Image
+from hoy import thumbnails
+
+
+def make_upload(name='photo.jpg', size=(1000, 500), color='red', format='JPEG'):
+    buffer = BytesIO()
+    PILImage.new('RGB', size, color).save(buffer, format=format)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=f'image/{format.lower()}')
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.IMAGE_DERIVATIVE_WIDTHS = (320, 640, 1280)
+    settings.IMAGE_DERIVATIVE_FORMATS = ('webp',)
+
+
+@pytest.fixture
+def uploaded_image(gallery):
+    return Image.objects.create(gallery=gallery, image=make_upload())
+
+
+@pytest.mark.django_db
+class TestImageDerivatives:
+    def test_upload_schedules_generation_after_commit(self, gallery, run_tasks, monkeypatch, django_capture_on_commit_callbacks):
+        queued = []
+        monkeypatch.setattr(thumbnails.generate_image_derivatives, 'delay', lambda *args: queued.append(args))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            image = Image.objects.create(gallery=gallery, image=make_upload())
+        assert queued == [('gallery.Image', str(image.pk))]
+
+        # Saving other fields doesn't re-render
+        with django_capture_on_commit_callbacks(execute=True):
+            image = Image.objects.get(pk=image.pk)
+            image.caption = 'Renamed'
+            image.save()
+        assert len(queued) == 1
+
+    def test_generates_each_width_once(self, uploaded_image):
+        thumbnails.generate_image_derivatives('gallery.Image', str(uploaded_image.pk))
+        uploaded_image.refresh_from_db()
+
+        renditions = uploaded_image.derivatives['webp']
+        # 1280 is wider than the 1000px original and isn't upscaled
+        assert sorted(renditions) == ['320', '640']
+        with default_storage.open(renditions['320']) as f:
+            assert PILImage.open(f).size == (320, 160)
+
+        stored = default_storage.listdir('event_gallery/derivatives')[1]
+        thumbnails.generate_image_derivatives('gallery.Image', str(uploaded_image.pk))
+        assert default_storage.listdir('event_gallery/derivatives')[1] == stored
+
+    def test_same_stem_or_name_gets_its_own_renditions(self, gallery):
+        def renditions(image):
+            thumbnails.generate_image_derivatives('gallery.Image', str(image.pk))
+            image.refresh_from_db()
+            with default_storage.open(image.derivatives['webp']['320']) as f:
+                return image.derivatives['webp']['320'], PILImage.open(f).convert('RGB').getpixel((0, 0))
+
+        jpeg = Image.objects.create(gallery=gallery, image=make_upload('stage.jpg'))
+        png = Image.objects.create(
+            gallery=gallery, image=make_upload('stage.png', color='blue', format='PNG')
+        )
+        jpeg_name, jpeg_pixel = renditions(jpeg)
+        png_name, png_pixel = renditions(png)
+        assert jpeg_name != png_name
+        assert png_pixel[2] > 200 and jpeg_pixel[0] > 200
+
+        # Replaced by a different image stored under the same name
+        name = jpeg.image.name
+        default_storage.delete(name)
+        default_storage.save(name, make_upload(color='green'))
+        replaced_name, replaced_pixel = renditions(jpeg)
+        assert replaced_name != jpeg_name
+        assert replaced_pixel[1] > 100 and replaced_pixel[0] < 100
+
+    def test_serializer_exposes_srcset(self, api_client, uploaded_image):
+        url = reverse('image-detail', kwargs={'pk': uploaded_image.pk})
+        assert api_client.get(url).data['image_srcset'] == {}
+
+        thumbnails.generate_image_derivatives('gallery.Image', str(uploaded_image.pk))
+        srcset = api_client.get(url).data['image_srcset']['webp']
+        assert srcset.startswith('http://testserver/media/event_gallery/derivatives/')
+        assert srcset.endswith(' 640w')
+
+    def test_missing_source_is_skipped(self, gallery):
+        image = Image.objects.create(gallery=gallery, image='event_gallery/missing.jpg')
+        thumbnails.generate_image_derivatives('gallery.Image', str(image.pk))
+        image.refresh_from_db()
+        assert image.derivatives == {}
@@ -0,0 +1,82 @@
+import zipfile
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from PIL import Image as PILImage
+from rest_framework import status
+from gallery.models import Image
+
+
+def jpeg_bytes(make=None, model=None):
+    exif = PILImage.Exif()
+    if make:
+        exif[0x010F] = make
+    if model:
+        exif[0x0110] = model
+    buffer = BytesIO()
+    PILImage.new('RGB', (64, 48), 'blue').save(buffer, format='JPEG', exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+
+
+@pytest.mark.django_db
+class TestBulkUpload:
+    def url(self, gallery):
+        return reverse('gallery-bulk-upload', kwargs={'pk': gallery.pk})
+
+    def test_multipart_batch(self, staff_client, gallery, run_tasks, django_capture_on_commit_callbacks):
+        files = [
+            SimpleUploadedFile('one.jpg', jpeg_bytes('Canon', 'EOS R5'), content_type='image/jpeg'),
+            SimpleUploadedFile('two.jpg', jpeg_bytes(), content_type='image/jpeg'),
+            SimpleUploadedFile('notes.txt', b'not an image', content_type='text/plain'),
+        ]
+        with django_capture_on_commit_callbacks(execute=True):
+            response = staff_client.post(
+                self.url(gallery), {'images': files, 'photographer': 'Ana'}, format='multipart'
+            )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert (response.data['created'], response.data['failed']) == (2, 1)
+        assert [r['status'] for r in response.data['results']] == ['created', 'created', 'error']
+
+        image = Image.objects.get(pk=response.data['results'][0]['id'])
+        # Filled in by the ingestion task queued on commit
+        assert image.camera_info == {'make': 'Canon', 'model': 'EOS R5'}
+        assert image.photographer == 'Ana'
+        gallery.refresh_from_db()
+        assert gallery.images_count == 2
+
+    def test_zip_archive(self, staff_client, gallery):
+        archive = BytesIO()
+        with zipfile.ZipFile(archive, 'w') as bundle:
+            bundle.writestr('set/a.jpg', jpeg_bytes())
+            bundle.writestr('set/b.jpeg', jpeg_bytes())
+            bundle.writestr('__MACOSX/set/._a.jpg', b'junk')
+            bundle.writestr('set/broken.jpg', b'garbage')
+        upload = SimpleUploadedFile('set.zip', archive.getvalue(), content_type='application/zip')
+
+        response = staff_client.post(self.url(gallery), {'archive': upload}, format='multipart')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert {r['file']: r['status'] for r in response.data['results']} == {
+            'set/a.jpg': 'created',
+            'set/b.jpeg': 'created',
+            'set/broken.jpg': 'error',
+        }
+        assert gallery.images.count() == 2
+
+    def test_nothing_valid_is_rejected(self, staff_client, gallery):
+        upload = SimpleUploadedFile('set.zip', b'not a zip', content_type='application/zip')
+        response = staff_client.post(self.url(gallery), {'archive': upload}, format='multipart')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['results'][0]['error'] == 'Not a valid zip archive'
+
+    def test_requires_staff(self, authenticated_client, gallery):
+        response = authenticated_client.post(self.url(gallery), {}, format='multipart')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,95 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from gallery.models import Gallery, Image, ImageLike
+from hoy.counters import adjust
+
+
+def add_images(gallery, count):
+    images = Image.objects.bulk_create([
+        Image(gallery=gallery, image=f'event_gallery/{gallery.pk}-{i}.jpg')
+        for i in range(count)
+    ])
+    adjust(Gallery, gallery.pk, images_count=count)
+    return images
+
+
+@pytest.mark.django_db
+class TestIsLikedBatching:
+    def count_queries(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        return response, len(context.captured_queries)
+
+    def test_gallery_detail_query_count_independent_of_size(self, authenticated_client, user, gallery):
+        url = reverse('gallery-detail', kwargs={'pk': gallery.pk})
+        images = add_images(gallery, 3)
+        ImageLike.objects.create(image=images[0], user=user)
+        _, small = self.count_queries(authenticated_client, url)
+
+        newest = add_images(gallery, 50)[-1]
+        ImageLike.objects.create(image=newest, user=user)
+        response, large = self.count_queries(authenticated_client, url)
+
+        assert large == small
+        liked = {item['id'] for item in response.data['images'] if item['is_liked']}
+        assert liked == {str(newest.pk)}
+
+    def test_image_list_resolves_likes_in_one_query(self, authenticated_client, user, gallery,
+                                                    django_assert_num_queries):
+        images = add_images(gallery, 20)
+        ImageLike.objects.create(image=images[3], user=user)
+        # Session user, conditional-GET validators, images, liked ids
+        with django_assert_num_queries(4):
+            response = authenticated_client.get(reverse('image-list'))
+        assert [item['id'] for item in response.data if item['is_liked']] == [str(images[3].pk)]
+
+    def test_anonymous_users_like_nothing(self, api_client, gallery, django_assert_num_queries):
+        add_images(gallery, 5)
+        with django_assert_num_queries(2):
+            response = api_client.get(reverse('image-list'))
+        assert not any(item['is_liked'] for item in response.data)
+
+
+@pytest.mark.django_db
+class TestGalleryImagePages:
+    def test_detail_embeds_first_page(self, settings, api_client, gallery):
+        settings.GALLERY_IMAGES_PAGE_SIZE = 5
+        add_images(gallery, 12)
+        response = api_client.get(reverse('gallery-detail', kwargs={'pk': gallery.pk}))
+        assert len(response.data['images']) == 5
+        assert response.data['images_count'] == 12
+        assert '/images/?cursor=' in response.data['images_next']
+
+    def test_detail_ignores_its_own_pagination_params(self, settings, api_client, gallery):
+        settings.GALLERY_IMAGES_PAGE_SIZE = 5
+        add_images(gallery, 12)
+        url = reverse('gallery-detail', kwargs={'pk': gallery.pk})
+        first = api_client.get(url).data
+        cursor = first['images_next'].split('cursor=')[1]
+
+        response = api_client.get(url, {'cursor': cursor, 'page_size': 2})
+        assert response.data['images'] == first['images']
+        assert response.data['images_next'] == first['images_next']
+
+    def test_cursor_walks_every_image_once(self, settings, api_client, gallery):
+        settings.GALLERY_IMAGES_PAGE_SIZE = 5
+        images = add_images(gallery, 12)
+        detail = api_client.get(reverse('gallery-detail', kwargs={'pk': gallery.pk})).data
+        seen = [item['id'] for item in detail['images']]
+        url = detail['images_next']
+        while url:
+            page = api_client.get(url).data
+            seen += [item['id'] for item in page['results']]
+            url = page['next']
+        expected = sorted(images, key=lambda image: image.created_at, reverse=True)
+        assert seen == [str(image.pk) for image in expected]
+
+    def test_small_gallery_has_no_next_page(self, api_client, gallery):
+        add_images(gallery, 2)
+        response = api_client.get(reverse('gallery-images', kwargs={'pk': gallery.pk}))
+        assert len(response.data['results']) == 2
+        assert response.data['next'] is None
+        assert response.data['results'][0]['is_liked'] is False
@@ -0,0 +1,114 @@
+"""Bulk image ingestion for galleries.
+
+Files arrive as multipart ``images`` parts and/or ``archive`` zip files.
+Each file is streamed to storage in chunks (uploads are spooled to disk by
+Django and zip members are decompressed on the fly) and all rows are written
+with a single ``bulk_create``. EXIF extraction, hashing and tagging happen
+afterwards in ``gallery.ingest`` so the request only pays for the copy.
+"""
+
+import os
+import zipfile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from PIL import Image as PILImage, UnidentifiedImageError
+from hoy.counters import adjust
+from hoy.thumbnails import schedule_derivatives
+from .exif import HEADER_BYTES
+from .ingest import schedule_ingestion
+from .models import Gallery, Image
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.tif', '.tiff'}
+
+
+def _max_files():
+    return getattr(settings, 'GALLERY_BULK_UPLOAD_MAX_FILES', 500)
+
+
+def _max_file_size():
+    return getattr(settings, 'GALLERY_BULK_UPLOAD_MAX_FILE_SIZE', 50 * 1024 * 1024)
+
+
+def iter_files(files):
+    """Yield ``(name, file, error)`` for every part of a bulk upload."""
+    for upload in files.getlist('images'):
+        yield upload.name, upload, None
+
+    for archive in files.getlist('archive'):
+        try:
+            bundle = zipfile.ZipFile(archive)
+        except zipfile.BadZipFile:
+            yield archive.name, None, 'Not a valid zip archive'
+            continue
+        with bundle:
+            for member in bundle.infolist():
+                basename = os.path.basename(member.filename)
+                if member.is_dir() or not basename or basename.startswith('.') \
+                        or member.filename.startswith('__MACOSX/'):
+                    continue
+                if member.file_size > _max_file_size():
+                    yield member.filename, None, 'File too large'
+                    continue
+                with bundle.open(member) as handle:
+                    yield member.filename, handle, None
+
+
+def _is_image(handle):
+    """Identify the file from its leading bytes without decoding it."""
+    header = handle.read(HEADER_BYTES)
+    handle.seek(0)
+    try:
+        with PILImage.open(BytesIO(header)):
+            return True
+    except (UnidentifiedImageError, OSError):
+        return False
+
+
+def ingest_files(gallery, files, photographer=''):
+    """Store every image in ``files`` in ``gallery``.
+
+    Returns ``(images, results)`` where ``results`` has one status entry per
+    file, in upload order.
+    """
+    field = Image._meta.get_field('image')
+    images, results = [], []
+
+    try:
+        for index, (name, handle, error) in enumerate(iter_files(files)):
+            if error is None and index >= _max_files():
+                error = f'Too many files (max {_max_files()})'
+            if error is None and os.path.splitext(name)[1].lower() not in IMAGE_EXTENSIONS:
+                error = 'Unsupported file type'
+            if error is None and getattr(handle, 'size', 0) > _max_file_size():
+                error = 'File too large'
+            if error is None and not _is_image(handle):
+                error = 'Not a valid image'
+            if error is not None:
+                results.append({'file': name, 'status': 'error', 'error': error})
+                continue
+
+            image = Image(gallery=gallery, photographer=photographer)
+            stored = field.storage.save(
+                field.generate_filename(image, os.path.basename(name)),
+                File(handle, name=name),
+                max_length=field.max_length,
+            )
+            image.image.name = stored
+            images.append(image)
+            results.append({'file': name, 'status': 'created', 'id': str(image.id)})
+
+        with transaction.atomic():
+            Image.objects.bulk_create(images)
+            # bulk_create skips post_save, so do what gallery.signals would
+            adjust(Gallery, gallery.pk, touch=True, images_count=len(images))
+            for image in images:
+                schedule_derivatives(image)
+            schedule_ingestion([image.pk for image in images])
+    except Exception:
+        for image in images:
+            field.storage.delete(image.image.name)
+        raise
+    return images, results
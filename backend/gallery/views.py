@@ -1,9 +1,21 @@
 from rest_framework import viewsets, permissions, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.parsers import MultiPartParser
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Gallery, Image, ImageLike, ImageDownload
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from datetime import timedelta
+import uuid
+from .models import Gallery, Image, ImageLike
+from .downloads import record_download
+from .uploads import ingest_files
+from .pagination import GalleryImagePagination
+from .phash import MAX_RADIUS, similar_images
+from . import leaderboards
 from .serializers import (
     GallerySerializer,
     GalleryListSerializer,
@@ -12,30 +24,117 @@ from .serializers import (
     ImageDownloadSerializer
 )
 from events.permissions import IsStaffOrReadOnly
+from hoy.mixins import ConditionalGetMixin
+from hoy.serving import serve_file
 
-class GalleryViewSet(viewsets.ModelViewSet):
+
+class LikedImagesMixin:
+    """Pass the requesting user's liked image ids to the serializer.
+
+    ``ImageSerializer.is_liked`` would otherwise query once per image; the
+    ids are loaded with one query for everything being serialized.
+    """
+
+    def liked_images_filter(self, instance):
+        """Lookup narrowing the user's likes to the images in ``instance``."""
+        if isinstance(instance, Image):
+            instance = [instance]
+        return {'image_id__in': [image.pk for image in instance]}
+
+    def get_serializer(self, *args, **kwargs):
+        user = self.request.user
+        if args and args[0] is not None and user.is_authenticated:
+            lookup = self.liked_images_filter(args[0])
+            if lookup is not None:
+                context = kwargs.setdefault('context', self.get_serializer_context())
+                context['liked_image_ids'] = set(
+                    ImageLike.objects.filter(user=user, **lookup).values_list('image_id', flat=True)
+                )
+        return super().get_serializer(*args, **kwargs)
+
+
+class GalleryViewSet(LikedImagesMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Gallery.objects.all()
     permission_classes = [IsStaffOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['event']
     search_fields = ['title', 'description', 'event__title']
+    conditional_vary_on_user = True
     
+    def get_conditional_validators(self, queryset):
+        validators = super().get_conditional_validators(queryset)
+        if self.action == 'retrieve':
+            # Detail responses embed the images; like/download counter
+            # updates bump Image.updated_at
+            validators.update(Image.objects.filter(
+                gallery__in=queryset
+            ).aggregate(images_last_modified=Max('updated_at')))
+        return validators
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            queryset = queryset.select_related('event')
+        return queryset
+
     def get_serializer_class(self):
         if self.action == 'list':
             return GalleryListSerializer
+        if self.action == 'images':
+            return ImageSerializer
         return GallerySerializer
 
-class ImageViewSet(viewsets.ModelViewSet):
+    def liked_images_filter(self, instance):
+        if self.action == 'images':
+            return super().liked_images_filter(instance)
+        # Detail responses embed a page of the gallery's images
+        if isinstance(instance, Gallery) and self.get_serializer_class() is GallerySerializer:
+            return {'image__gallery_id': instance.pk}
+        return None
+
+    @action(detail=True, methods=['get'])
+    def images(self, request, pk=None):
+        """Cursor-paginated images of the gallery, newest first."""
+        gallery = self.get_object()
+        paginator = GalleryImagePagination()
+        page = paginator.paginate_queryset(
+            Image.objects.filter(gallery_id=gallery.pk), request, view=self
+        )
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['post'], parser_classes=[MultiPartParser])
+    def bulk_upload(self, request, pk=None):
+        """Add many images at once from ``images`` files and/or ``archive`` zips."""
+        gallery = self.get_object()
+        images, results = ingest_files(
+            gallery,
+            request.FILES,
+            photographer=request.data.get('photographer', '')
+        )
+        return Response(
+            {
+                'created': len(images),
+                'failed': len(results) - len(images),
+                'results': results,
+            },
+            status=status.HTTP_201_CREATED if images else status.HTTP_400_BAD_REQUEST
+        )
+
+class ImageViewSet(LikedImagesMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Image.objects.all()
     serializer_class = ImageSerializer
     permission_classes = [IsStaffOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['gallery', 'is_featured', 'photographer']
     search_fields = ['caption', 'photographer', 'tags']
+    conditional_vary_on_user = True
     
     @action(detail=True, methods=['post'])
+    @transaction.atomic
     def like(self, request, pk=None):
         image = self.get_object()
+        # Counter updates happen in gallery.signals within this transaction
         like, created = ImageLike.objects.get_or_create(
             user=request.user,
             image=image
@@ -52,11 +151,11 @@ class ImageViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def download(self, request, pk=None):
         image = self.get_object()
-        
-        # Record download
-        download = ImageDownload.objects.create(
-            user=request.user,
-            image=image,
+
+        # Buffered and written in batches by gallery.tasks.flush_download_buffer
+        download = record_download(
+            image,
+            request.user,
             ip_address=request.META.get('REMOTE_ADDR'),
             user_agent=request.META.get('HTTP_USER_AGENT', '')
         )
@@ -64,8 +163,16 @@ class ImageViewSet(viewsets.ModelViewSet):
         serializer = ImageDownloadSerializer(download)
         return Response({
             'download_info': serializer.data,
-            'download_url': request.build_absolute_uri(image.image.url)
+            'download_url': request.build_absolute_uri(
+                reverse('image-file', kwargs={'pk': image.pk})
+            )
         })
+
+    @action(detail=True, methods=['get'])
+    def file(self, request, pk=None):
+        """Serve the original file, with Range support or server offload."""
+        image = self.get_object()
+        return serve_file(request, image.image)
     
     @action(detail=False, methods=['get'])
     def featured(self, request):
@@ -73,24 +180,80 @@ class ImageViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(featured_images, many=True)
         return Response(serializer.data)
     
+    def _leaderboard(self, request, metric, queryset, limit=10):
+        """Top images for ``metric``, optionally per gallery/event and recent days."""
+        params = request.query_params
+        scope = 'global'
+        try:
+            if params.get('gallery'):
+                gallery_id = uuid.UUID(params['gallery'])
+                scope = f'gallery:{gallery_id}'
+                queryset = queryset.filter(gallery_id=gallery_id)
+            elif params.get('event'):
+                event_id = uuid.UUID(params['event'])
+                scope = f'event:{event_id}'
+                queryset = queryset.filter(gallery__event_id=event_id)
+            days = int(params['days']) if params.get('days') else None
+        except ValueError:
+            return Response(
+                {'error': 'gallery and event must be ids and days an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if days is not None and not 1 <= days <= leaderboards.max_days():
+            return Response(
+                {'error': f'days must be between 1 and {leaderboards.max_days()}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Fetch extra ids: deleted or filtered-out images are skipped below
+        ranking = leaderboards.top(metric, scope, days=days, limit=limit * 2)
+        if ranking:
+            by_id = queryset.in_bulk([uuid.UUID(pk) for pk, _ in ranking])
+            images = [by_id[uuid.UUID(pk)] for pk, _ in ranking if uuid.UUID(pk) in by_id][:limit]
+        elif days is not None:
+            # Redis unavailable, or its sets are empty (flushed, evicted or not
+            # built yet; see rebuild_leaderboards): rank from the database
+            relation = 'likes' if metric == leaderboards.LIKES else 'downloads'
+            since = timezone.now() - timedelta(days=days)
+            images = queryset.annotate(recent=Count(
+                relation, filter=Q(**{f'{relation}__created_at__gte': since})
+            )).filter(recent__gt=0).order_by('-recent')[:limit]
+        else:
+            images = queryset.order_by(f'-{metric}_count')[:limit]
+
+        serializer = self.get_serializer(images, many=True)
+        return Response(serializer.data)
+
     @action(detail=False, methods=['get'])
     def most_liked(self, request):
-        from django.db.models import Count
-        most_liked = Image.objects.annotate(
-            likes_count=Count('likes')
-        ).order_by('-likes_count')[:10]
-        
-        serializer = self.get_serializer(most_liked, many=True)
-        return Response(serializer.data)
+        # Re-uploads of the same shot would otherwise crowd the list
+        return self._leaderboard(
+            request, leaderboards.LIKES, Image.objects.filter(duplicate_of__isnull=True)
+        )
     
     @action(detail=False, methods=['get'])
     def most_downloaded(self, request):
-        from django.db.models import Count
-        most_downloaded = Image.objects.annotate(
-            downloads_count=Count('downloads')
-        ).order_by('-downloads_count')[:10]
-        
-        serializer = self.get_serializer(most_downloaded, many=True)
+        return self._leaderboard(request, leaderboards.DOWNLOADS, Image.objects.all())
+
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        image = self.get_object()
+        if not image.phash:
+            return Response([])
+        try:
+            radius = min(int(request.query_params.get('radius', 10)), MAX_RADIUS)
+        except ValueError:
+            return Response(
+                {'error': 'radius must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        candidates = Image.objects.filter(gallery_id=image.gallery_id).exclude(pk=image.pk)
+        matches = similar_images(candidates, image.phash, radius)[:20]
+        images = Image.objects.in_bulk([match[0] for match in matches])
+        serializer = self.get_serializer(
+            [images[match[0]] for match in matches if match[0] in images], many=True
+        )
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
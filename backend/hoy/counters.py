@@ -0,0 +1,72 @@
+"""Helpers for denormalized counter columns.
+
+Counters are adjusted in place with ``F()`` expressions so concurrent
+writers never lose increments, and can be recomputed from the source rows
+with ``reconcile`` when they drift (e.g. after raw SQL or failed writes).
+"""
+
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+
+class CounterFieldsMixin:
+    """Model mixin that keeps regular saves away from counter columns.
+
+    A full ``save()`` would write back the counter values loaded with the
+    instance and silently undo concurrent ``F()`` increments, so updates of
+    existing rows exclude ``counter_fields`` unless they are named in
+    ``update_fields``.
+    """
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+        ):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+def adjust(model, pk, touch=False, **deltas):
+    """Atomically add ``deltas`` to the counter columns of one row.
+
+    Counters are clamped at zero. With ``touch`` the row's ``updated_at`` is
+    bumped as well, so conditional GET validators notice the change.
+    """
+    updates = {
+        field: Greatest(F(field) + delta, Value(0))
+        for field, delta in deltas.items()
+        if delta
+    }
+    if not updates:
+        return 0
+    if touch:
+        updates['updated_at'] = timezone.now()
+    return model.objects.filter(pk=pk).update(**updates)
+
+
+def exact_count(related_model, fk, **filters):
+    """Subquery expression counting ``related_model`` rows per outer row."""
+    counts = related_model.objects.filter(
+        **{fk: OuterRef('pk')}, **filters
+    ).order_by().values(fk).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts), Value(0))
+
+
+def reconcile(model, field, related_model, fk, dry_run=False, **filters):
+    """Recompute ``model.field`` from ``related_model`` rows.
+
+    Returns the number of rows whose stored counter had drifted.
+    """
+    drifted = model.objects.annotate(
+        expected_count=exact_count(related_model, fk, **filters)
+    ).exclude(**{field: F('expected_count')})
+    if dry_run:
+        return drifted.count()
+    return drifted.update(**{field: exact_count(related_model, fk, **filters)})
@@ -0,0 +1,88 @@
+"""Reusable viewset mixins shared across apps."""
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+class ConditionalGetMixin:
+    """Answer conditional GETs (If-None-Match / If-Modified-Since) with 304.
+
+    Validators are computed with a single aggregate query over the filtered
+    queryset (latest ``updated_at`` plus a row count, so deletions are seen),
+    which lets unchanged list and detail requests skip serialization
+    entirely. Views whose payload depends on related rows extend
+    ``get_conditional_validators``.
+
+    A date alone can't tell that a row was deleted or left the filter, so
+    when the validators include a ``count`` only the ETag is sent, and a
+    client's If-Modified-Since never earns a 304.
+    """
+    conditional_last_modified_field = 'updated_at'
+    # Include the requesting user in the ETag when the payload is per-user
+    conditional_vary_on_user = False
+
+    def get_conditional_validators(self, queryset):
+        """Return a dict of aggregate values describing ``queryset``."""
+        return queryset.aggregate(
+            last_modified=Max(self.conditional_last_modified_field),
+            count=Count('pk'),
+        )
+
+    def _conditional_headers(self, request, queryset):
+        validators = self.get_conditional_validators(queryset.order_by())
+        parts = [request.get_full_path()]
+        if self.conditional_vary_on_user:
+            parts.append(str(getattr(request.user, 'pk', None)))
+        parts.extend(f'{key}={validators[key]!r}' for key in sorted(validators))
+        etag = '"%s"' % hashlib.md5('|'.join(parts).encode()).hexdigest()
+        if 'count' in validators:
+            return etag, None
+
+        timestamps = [
+            value.timestamp() for value in validators.values()
+            if hasattr(value, 'timestamp')
+        ]
+        last_modified = int(max(timestamps)) if timestamps else None
+        return etag, last_modified
+
+    def conditional_response(self, request, queryset, build_response):
+        """Return 304 if the client is current, else ``build_response()``.
+
+        The returned response carries the ETag/Last-Modified validators.
+        """
+        if request.method not in ('GET', 'HEAD'):
+            return build_response()
+
+        etag, last_modified = self._conditional_headers(request, queryset)
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+
+        response = build_response()
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_response(
+            request, queryset,
+            lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        # get_object() still enforces lookups and object permissions
+        instance = self.get_object()
+        queryset = self.get_queryset().filter(pk=instance.pk)
+        return self.conditional_response(
+            request, queryset,
+            lambda: Response(self.get_serializer(instance).data)
+        )
@@ -0,0 +1,151 @@
+"""File responses that keep file bytes out of Python where possible.
+
+``serve_file`` picks the cheapest option for a stored file:
+
+* Remote storage (django-storages S3): redirect to a short-lived presigned
+  URL, so the client fetches straight from the bucket.
+* ``FILE_SERVING_BACKEND = 'x-accel'`` (nginx) or ``'x-sendfile'``
+  (Apache/lighttpd): return only a header and let the web server send the
+  file, including Range handling.
+* Otherwise a ``FileResponse`` over the open file. Under WSGI servers with
+  ``wsgi.file_wrapper`` (gunicorn, uWSGI) this goes through ``os.sendfile``;
+  a Range request seeks to the start offset and caps the length. ASGI
+  servers stream the file in chunks, so use one of the offload backends
+  there in production.
+"""
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseRedirect
+from django.utils.http import content_disposition_header
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFile:
+    """Limit reads of an open file to ``length`` bytes from its position.
+
+    ``fileno``/``tell`` are passed through so sendfile-capable servers can
+    still hand the descriptor to the kernel; they honour Content-Length.
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Return ``(start, end)`` for a single-range header, inclusive.
+
+    ``None`` means serve the whole file (no header, or a form we don't
+    handle such as multiple ranges); ``ValueError`` means unsatisfiable.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            raise ValueError('Empty suffix range')
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError('Range not satisfiable')
+    return start, end
+
+
+def _local_path(storage, name):
+    try:
+        return storage.path(name)
+    except NotImplementedError:
+        return None
+
+
+def _disposition(filename, as_attachment):
+    return content_disposition_header(as_attachment, filename)
+
+
+def _presigned_redirect(storage, name, filename, as_attachment):
+    expire = getattr(settings, 'FILE_SERVING_URL_EXPIRE', 300)
+    try:
+        url = storage.url(name, parameters={
+            'ResponseContentDisposition': _disposition(filename, as_attachment),
+        }, expire=expire)
+    except TypeError:
+        # Storage without S3-style URL options
+        url = storage.url(name)
+    return HttpResponseRedirect(url)
+
+
+def serve_file(request, field_file, filename=None, as_attachment=True):
+    """Respond with the contents of ``field_file`` (see module docstring)."""
+    storage, name = field_file.storage, field_file.name
+    filename = filename or os.path.basename(name)
+    path = _local_path(storage, name)
+    if path is None:
+        return _presigned_redirect(storage, name, filename, as_attachment)
+
+    backend = getattr(settings, 'FILE_SERVING_BACKEND', 'django')
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    if backend in ('x-accel', 'x-sendfile'):
+        response = HttpResponse(content_type=content_type)
+        if backend == 'x-accel':
+            prefix = getattr(settings, 'FILE_SERVING_ACCEL_PREFIX', '/protected-media/')
+            response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(name)
+        else:
+            response['X-Sendfile'] = path
+        response['Content-Disposition'] = _disposition(filename, as_attachment)
+        return response
+
+    size = os.path.getsize(path)
+    try:
+        byte_range = parse_range(request.headers.get('Range'), size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    file = open(path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, as_attachment=as_attachment, filename=filename)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        response = FileResponse(
+            RangeFile(file, end - start + 1),
+            status=206,
+            as_attachment=as_attachment,
+            filename=filename,
+            content_type=content_type,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    return response
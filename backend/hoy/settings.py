@@ -29,6 +29,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party apps
     'channels',
@@ -47,6 +48,7 @@ INSTALLED_APPS = [
     'gallery',
     'recommendations',  
     'dj_schedules',
+    'notifications',
 ]
 
 MIDDLEWARE = [
@@ -66,9 +68,16 @@ ROOT_URLCONF = 'hoy.urls'
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [],
-        'APP_DIRS': True,
+        'DIRS': [BASE_DIR / 'templates'],
         'OPTIONS': {
+            # Compiled templates are kept per process; email rendering
+            # looks up the same few templates thousands of times
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -92,6 +101,88 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Cache configuration
+CACHES = {
+    'default': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': config(
+            'REDIS_CACHE_URL',
+            default=f"redis://{os.getenv('REDIS_HOST', 'redis')}:6379/1"
+        ),
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'SOCKET_CONNECT_TIMEOUT': 1,
+            'SOCKET_TIMEOUT': 1,
+            # Treat Redis outages as cache misses instead of failing requests
+            'IGNORE_EXCEPTIONS': True,
+        },
+        'KEY_PREFIX': 'hoy',
+    }
+}
+DJANGO_REDIS_LOG_IGNORED_EXCEPTIONS = True
+
+# Seconds to keep cached public event listings
+EVENT_CACHE_TIMEOUT = config('EVENT_CACHE_TIMEOUT', default=300, cast=int)
+
+# Celery configuration
+CELERY_BROKER_URL = config(
+    'CELERY_BROKER_URL',
+    default=f"redis://{os.getenv('REDIS_HOST', 'redis')}:6379/0"
+)
+CELERY_TASK_IGNORE_RESULT = True
+# Take one task at a time so long jobs (image ingestion) queue up fairly
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+# Image download tracking: 'redis', 'memory' or 'sync' (see gallery.downloads)
+GALLERY_DOWNLOAD_BUFFER = config('GALLERY_DOWNLOAD_BUFFER', default='redis')
+GALLERY_DOWNLOAD_BATCH_SIZE = config('GALLERY_DOWNLOAD_BATCH_SIZE', default=500, cast=int)
+GALLERY_DOWNLOAD_FLUSH_INTERVAL = config('GALLERY_DOWNLOAD_FLUSH_INTERVAL', default=5, cast=int)
+
+# Longest "last N days" window kept for image leaderboards (gallery.leaderboards)
+GALLERY_LEADERBOARD_MAX_DAYS = 30
+
+# Images embedded in a gallery detail response and per /galleries/{id}/images/ page
+GALLERY_IMAGES_PAGE_SIZE = config('GALLERY_IMAGES_PAGE_SIZE', default=50, cast=int)
+
+# Bulk gallery uploads (see gallery.uploads)
+GALLERY_BULK_UPLOAD_MAX_FILES = config('GALLERY_BULK_UPLOAD_MAX_FILES', default=500, cast=int)
+GALLERY_BULK_UPLOAD_MAX_FILE_SIZE = 50 * 1024 * 1024
+DATA_UPLOAD_MAX_NUMBER_FILES = GALLERY_BULK_UPLOAD_MAX_FILES
+
+# Background EXIF/hash/tag ingestion (see gallery.ingest)
+GALLERY_INGEST_CHUNK_SIZE = config('GALLERY_INGEST_CHUNK_SIZE', default=50, cast=int)
+GALLERY_INGEST_THREADS = config('GALLERY_INGEST_THREADS', default=4, cast=int)
+# Max differing dHash bits for two images to count as duplicates
+GALLERY_DUPLICATE_DISTANCE = 6
+
+# Largest batch accepted by /survey-responses/bulk/ (see feedback.bulk)
+SURVEY_BULK_MAX_RESPONSES = config('SURVEY_BULK_MAX_RESPONSES', default=5000, cast=int)
+
+# Seconds a /feedback/statistics/ report is cached (see feedback.statistics)
+FEEDBACK_STATISTICS_CACHE_TIMEOUT = config('FEEDBACK_STATISTICS_CACHE_TIMEOUT', default=60, cast=int)
+
+# Minimum MinHash similarity for feedback to be clustered (see feedback.similarity)
+FEEDBACK_SIMILARITY_THRESHOLD = config('FEEDBACK_SIMILARITY_THRESHOLD', default=0.6, cast=float)
+
+# Seconds DJ schedule changes are collected before one broadcast per event,
+# 0 sends during the request (see dj_schedules.broadcast)
+DJ_SCHEDULE_BROADCAST_WINDOW = config('DJ_SCHEDULE_BROADCAST_WINDOW', default=0.5, cast=float)
+
+# Responsive image renditions rendered by hoy.thumbnails
+IMAGE_DERIVATIVE_WIDTHS = (320, 640, 1280)
+IMAGE_DERIVATIVE_FORMATS = ('avif', 'webp')
+
+CELERY_BEAT_SCHEDULE = {
+    'flush-image-downloads': {
+        'task': 'gallery.tasks.flush_download_buffer',
+        'schedule': GALLERY_DOWNLOAD_FLUSH_INTERVAL,
+    },
+    'cluster-similar-feedback': {
+        'task': 'feedback.tasks.cluster_similar_feedback',
+        'schedule': config('FEEDBACK_CLUSTER_INTERVAL', default=3600, cast=int),
+    },
+}
+
 # Database
 DATABASES = {
     'default': dj_database_url.config(default=config('DATABASE_URL', default='postgres://postgres:postgres@db:5432/hoy_db')),
@@ -141,6 +232,13 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = 'media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# How hoy.serving sends media files: 'django' (FileResponse/sendfile),
+# 'x-accel' (nginx internal location at FILE_SERVING_ACCEL_PREFIX mapped to
+# MEDIA_ROOT) or 'x-sendfile'. Remote storages always get presigned URLs.
+FILE_SERVING_BACKEND = config('FILE_SERVING_BACKEND', default='django')
+FILE_SERVING_ACCEL_PREFIX = '/protected-media/'
+FILE_SERVING_URL_EXPIRE = 300
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -259,6 +357,26 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='HOY <noreply@houseofyoung.com>')
 
+# Notification emails go through an outbox sent by Celery ('outbox') or
+# are sent during the request ('sync'), see notifications.outbox
+EMAIL_DELIVERY = config('EMAIL_DELIVERY', default='outbox')
+EMAIL_OUTBOX_BATCH_SIZE = config('EMAIL_OUTBOX_BATCH_SIZE', default=100, cast=int)
+EMAIL_OUTBOX_RATE_LIMIT = config('EMAIL_OUTBOX_RATE_LIMIT', default=10, cast=float)  # per second, 0 = unlimited
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+# How long a worker may hold a claimed batch before others take it over
+EMAIL_OUTBOX_LEASE_SECONDS = config('EMAIL_OUTBOX_LEASE_SECONDS', default=300, cast=int)
+CELERY_BEAT_SCHEDULE['send-outbound-emails'] = {
+    # Picks up retries and anything a lost task left behind
+    'task': 'notifications.tasks.send_outbound_emails',
+    'schedule': config('EMAIL_OUTBOX_INTERVAL', default=30, cast=int),
+}
+# Sent and failed emails are deleted after this many days
+EMAIL_OUTBOX_RETENTION_DAYS = config('EMAIL_OUTBOX_RETENTION_DAYS', default=30, cast=int)
+CELERY_BEAT_SCHEDULE['purge-outbound-emails'] = {
+    'task': 'notifications.tasks.purge_outbound_emails',
+    'schedule': 24 * 60 * 60,
+}
+
 # Frontend URL for password reset links
 FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:3000')
 
@@ -0,0 +1,190 @@
+"""Responsive image derivatives (thumbnails) for uploaded images.
+
+Models opt in with ``DerivativesMixin``, naming their image field in
+``derivative_field`` and adding a ``derivatives`` JSON column. Once an
+upload is committed, the ``generate_image_derivatives`` task renders every
+configured width and format with Pillow, stores the files next to the
+original (``<dir>/derivatives/<stem>-<digest>-<width>w.<ext>``, with a
+digest of the source's content) and records them in ``derivatives``.
+Renditions recorded for the same source content are reused, so each size
+is only rendered once per source image; a replaced file that gets the
+same name back is rendered afresh.
+"""
+
+import hashlib
+import logging
+import os
+from io import BytesIO
+
+from celery import shared_task
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image as PILImage, ImageOps, UnidentifiedImageError
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WIDTHS = (320, 640, 1280)
+DEFAULT_FORMATS = ('avif', 'webp')
+QUALITY = 80
+
+
+def derivative_widths():
+    return tuple(sorted(getattr(settings, 'IMAGE_DERIVATIVE_WIDTHS', DEFAULT_WIDTHS)))
+
+
+def derivative_formats():
+    """Configured formats that this Pillow build can encode."""
+    PILImage.init()
+    return tuple(
+        fmt for fmt in getattr(settings, 'IMAGE_DERIVATIVE_FORMATS', DEFAULT_FORMATS)
+        if fmt.upper() in PILImage.SAVE
+    )
+
+
+def derivative_name(name, digest, width, fmt):
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, 'derivatives', f'{stem}-{digest}-{width}w.{fmt}')
+
+
+class DerivativesMixin:
+    """Model mixin tracking whether the image in ``derivative_field`` changed."""
+    derivative_field = None
+    # Image name the instance was loaded with; None for unsaved instances
+    _derivative_source = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if cls.derivative_field in field_names:
+            instance._derivative_source = instance.derivative_source_name()
+        return instance
+
+    def derivative_source_name(self):
+        return getattr(self, self.derivative_field).name or ''
+
+
+def schedule_derivatives(instance):
+    """Queue derivative generation after commit if the image is new or replaced."""
+    name = instance.derivative_source_name()
+    if not name or name == instance._derivative_source:
+        return
+    instance._derivative_source = name
+    label, pk = instance._meta.label, instance.pk
+    transaction.on_commit(lambda: generate_image_derivatives.delay(label, str(pk)))
+
+
+def _prepare(image):
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGB', 'RGBA'):
+        return image
+    has_alpha = image.mode in ('LA', 'PA') or 'transparency' in image.info
+    return image.convert('RGBA' if has_alpha else 'RGB')
+
+
+def generate_derivatives(instance):
+    """Render the missing derivatives of ``instance``'s image.
+
+    Returns the ``derivatives`` mapping, or ``None`` if the source can't be
+    read. Widths larger than the original are skipped rather than upscaled.
+    """
+    field_file = getattr(instance, instance.derivative_field)
+    if not field_file:
+        return {}
+    storage, name = field_file.storage, field_file.name
+
+    try:
+        with storage.open(name, 'rb') as source:
+            data = source.read()
+        with PILImage.open(BytesIO(data)) as original:
+            original = _prepare(original)
+            original.load()
+    except (OSError, UnidentifiedImageError) as exc:
+        logger.warning('Cannot render derivatives of %s: %s', name, exc)
+        return None
+
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    previous = instance.derivatives or {}
+    if (previous.get('source'), previous.get('digest')) != (name, digest):
+        # A different image, even if it has the same name: render everything
+        previous = {}
+    derivatives = {'source': name, 'digest': digest, 'width': original.width}
+    for fmt in derivative_formats():
+        renditions = {}
+        for width in derivative_widths():
+            if width >= original.width:
+                break
+            target = previous.get(fmt, {}).get(str(width))
+            if not target or not storage.exists(target):
+                height = max(1, round(original.height * width / original.width))
+                resized = original.resize((width, height), PILImage.Resampling.LANCZOS)
+                buffer = BytesIO()
+                resized.save(buffer, format=fmt.upper(), quality=QUALITY)
+                target = storage.save(
+                    derivative_name(name, digest, width, fmt), ContentFile(buffer.getvalue())
+                )
+            renditions[str(width)] = target
+        if renditions:
+            derivatives[fmt] = renditions
+    return derivatives
+
+
+@shared_task(ignore_result=True)
+def generate_image_derivatives(model_label, pk):
+    """Render and record derivatives for one model instance."""
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+    derivatives = generate_derivatives(instance)
+    if derivatives is None:
+        return
+
+    with transaction.atomic():
+        current = model.objects.select_for_update().filter(pk=pk).first()
+        # Skip if the image was replaced while rendering; its own task follows
+        if current is None or current.derivative_source_name() != derivatives.get('source', ''):
+            return
+        current.derivatives = derivatives
+        update_fields = ['derivatives']
+        if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+            update_fields.append('updated_at')
+        current.save(update_fields=update_fields)
+
+
+class SrcsetField(serializers.Field):
+    """Read-only field exposing derivatives as ``srcset`` strings per format.
+
+    Represents as ``{"webp": "<url> 320w, <url> 640w", ...}``; empty until
+    the derivatives have been generated, so clients fall back to the
+    original image.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        derivatives = instance.derivatives or {}
+        if derivatives.get('source') != instance.derivative_source_name():
+            return {}
+        storage = getattr(instance, instance.derivative_field).storage
+        request = self.context.get('request')
+
+        srcset = {}
+        for fmt in derivative_formats():
+            renditions = derivatives.get(fmt)
+            if not renditions:
+                continue
+            entries = []
+            for width, name in sorted(renditions.items(), key=lambda item: int(item[0])):
+                url = storage.url(name)
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                entries.append(f'{url} {width}w')
+            srcset[fmt] = ', '.join(entries)
+        return srcset
@@ -0,0 +1,12 @@
+from django.contrib import admin
+from .models import OutboundEmail
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('subject', 'last_error')
+    # Context and body can hold reset links and other one-time secrets
+    exclude = ('context', 'body')
+    readonly_fields = ('attempts', 'last_error', 'created_at', 'sent_at')
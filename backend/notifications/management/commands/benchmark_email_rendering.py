@@ -0,0 +1,74 @@
+import time
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.template import Engine, engines
+from django.template.loader import render_to_string
+from notifications.rendering import render_parts
+
+User = get_user_model()
+
+HTML_TEMPLATE = 'emails/verify_email.html'
+TEXT_TEMPLATE = 'emails/verify_email.txt'
+
+
+class Command(BaseCommand):
+    help = 'Compare per-email render cost of notification templates'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=10000,
+            help='Number of emails to render per strategy'
+        )
+
+    def handle(self, *args, **options):
+        count = options['count']
+        # Unsaved users: rendering is measured, not queries
+        contexts = [
+            {
+                'user': User(first_name=f'Guest {i}', email=f'guest{i}@example.com'),
+                'verification_url': f'{settings.FRONTEND_URL}/verify-email?token={i:064d}',
+            }
+            for i in range(count)
+        ]
+
+        # What render_to_string did with no cached loader configured
+        configured = engines['django'].engine
+        uncached = Engine(
+            dirs=configured.dirs,
+            loaders=[
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ],
+            libraries=configured.libraries,
+        )
+        results = [
+            ('Uncached loaders', self._time(contexts, lambda context: (
+                uncached.render_to_string(HTML_TEMPLATE, context),
+                uncached.render_to_string(TEXT_TEMPLATE, context),
+            ))),
+            ('Cached loader', self._time(contexts, lambda context: (
+                render_to_string(HTML_TEMPLATE, context),
+                render_to_string(TEXT_TEMPLATE, context),
+            ))),
+            ('Notification renderer', self._time(contexts, lambda context: (
+                render_parts(HTML_TEMPLATE, TEXT_TEMPLATE, context)
+            ))),
+        ]
+
+        for label, elapsed in results:
+            self.stdout.write(
+                f'{label + ":":<23} {elapsed / count * 1e6:,.1f} us/email ({elapsed:.2f}s)'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Speedup: {results[0][1] / results[-1][1]:.1f}x over uncached loaders'
+        ))
+
+    def _time(self, contexts, render):
+        render(contexts[0])  # Warm up: compile templates
+        started = time.perf_counter()
+        for context in contexts:
+            render(context)
+        return time.perf_counter() - started
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from notifications.outbox import delivery_stats, send_pending
+
+
+class Command(BaseCommand):
+    help = 'Show email outbox delivery metrics, optionally sending due emails first'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--send',
+            action='store_true',
+            help='Deliver due emails in batches until none are left'
+        )
+
+    def handle(self, *args, **options):
+        if options['send']:
+            total_sent = total_failed = 0
+            while True:
+                claimed, sent, failed = send_pending()
+                total_sent += sent
+                total_failed += failed
+                if not claimed:
+                    break
+            self.stdout.write(self.style.SUCCESS(
+                f'Sent {total_sent} emails, {total_failed} failed'
+            ))
+
+        for key, value in delivery_stats().items():
+            self.stdout.write(f'{key}: {value}')
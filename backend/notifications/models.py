@@ -0,0 +1,40 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboundEmail(models.Model):
+    """An email waiting in (or delivered from) the outbox, see notifications.outbox."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    from_email = models.CharField(max_length=254, blank=True)
+    # Rendered by the worker; without a text template the plain body is
+    # the HTML with tags stripped, without either it is ``body``
+    html_template = models.CharField(max_length=200, blank=True)
+    text_template = models.CharField(max_length=200, blank=True)
+    body = models.TextField(blank=True)
+    # JSON values, with model instances stored as references
+    context = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # While 'sending', when the worker's lease on the row runs out
+    send_after = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'send_after'], name='outbound_email_due'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)}"
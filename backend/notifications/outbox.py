@@ -0,0 +1,240 @@
+"""Transactional outbox for notification emails.
+
+``queue_email`` stores an ``OutboundEmail`` row in the caller's
+transaction, so an email exists exactly when the change that triggered it
+commits, and once it has committed asks a worker to deliver it. The
+``notifications.tasks.send_outbound_emails`` task claims due rows in
+batches: a short transaction (``SELECT ... FOR UPDATE SKIP LOCKED``, so
+workers never share a row) marks them ``sending`` under a lease of
+``EMAIL_OUTBOX_LEASE_SECONDS`` and commits. The batch is then rendered
+(``notifications.rendering``) and sent over one SMTP connection, paced to
+``EMAIL_OUTBOX_RATE_LIMIT`` messages per second, with no transaction or
+row lock held, and each result is saved as soon as it is known. If a
+worker dies mid-batch only the email in flight can go out twice; the rest
+of the batch is claimed again once the lease has expired.
+
+A failed message is retried with exponential backoff until
+``EMAIL_OUTBOX_MAX_ATTEMPTS``, then marked ``failed``; ``delivery_stats``
+summarizes the outbox. With ``EMAIL_DELIVERY = 'sync'`` emails are rendered
+and sent during the request, as before the outbox existed.
+
+Rows keep their recipients and context (user references, reset links), so
+``purge_finished`` deletes sent and failed emails once they are
+``EMAIL_OUTBOX_RETENTION_DAYS`` old.
+"""
+
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import models, transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+from .models import OutboundEmail
+from .rendering import render_parts
+
+logger = logging.getLogger(__name__)
+
+MODEL_KEY = '__model__'
+# Coalesces the "work available" pings sent after each commit
+KICK_KEY = 'notifications:outbox:kick'
+RETRY_BASE_SECONDS = 30
+RESULT_FIELDS = ['status', 'attempts', 'last_error', 'send_after', 'sent_at']
+PURGE_CHUNK_SIZE = 1000
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _dump_context(context):
+    """Make ``context`` JSON-safe, replacing model instances with references."""
+    return {
+        key: {MODEL_KEY: value._meta.label, 'pk': str(value.pk)}
+        if isinstance(value, models.Model) else value
+        for key, value in context.items()
+    }
+
+
+def queue_email(subject, to, html_template='', text_template='', body='',
+                context=None, from_email=None):
+    """Store an email for background delivery and return it."""
+    email = OutboundEmail.objects.create(
+        subject=subject,
+        to=list(to),
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        html_template=html_template,
+        text_template=text_template,
+        body=body,
+        context=_dump_context(context or {}),
+    )
+    if _setting('EMAIL_DELIVERY', 'outbox') == 'sync':
+        deliver([email])
+    else:
+        transaction.on_commit(_kick)
+    return email
+
+
+def _kick():
+    from .tasks import send_outbound_emails
+
+    if cache.add(KICK_KEY, 1, timeout=1):
+        send_outbound_emails.delay()
+
+
+def _load_contexts(emails):
+    """Resolve model references for a batch with one query per model."""
+    wanted = defaultdict(set)
+    for email in emails:
+        for value in email.context.values():
+            if isinstance(value, dict) and MODEL_KEY in value:
+                wanted[value[MODEL_KEY]].add(value['pk'])
+    loaded = {
+        label: {str(pk): obj for pk, obj in apps.get_model(label).objects.in_bulk(pks).items()}
+        for label, pks in wanted.items()
+    }
+
+    contexts = {}
+    for email in emails:
+        context = {}
+        for key, value in email.context.items():
+            if isinstance(value, dict) and MODEL_KEY in value:
+                value = loaded[value[MODEL_KEY]].get(value['pk'])
+                if value is None:
+                    # Deleted since the email was queued
+                    break
+            context[key] = value
+        else:
+            contexts[email.pk] = context
+    return contexts
+
+
+def render(email, context):
+    """Build the message for ``email``."""
+    text, html = render_parts(email.html_template, email.text_template, context, email.body)
+    message = EmailMultiAlternatives(email.subject, text, email.from_email, email.to)
+    if html:
+        message.attach_alternative(html, 'text/html')
+    return message
+
+
+def _fail(email, error, now):
+    email.attempts += 1
+    email.last_error = str(error)[:1000]
+    if email.attempts >= _setting('EMAIL_OUTBOX_MAX_ATTEMPTS', 5):
+        email.status = 'failed'
+    else:
+        email.status = 'pending'
+        email.send_after = now + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (email.attempts - 1))
+
+
+def deliver(emails):
+    """Render and send ``emails`` over one connection. Returns (sent, failed)."""
+    contexts = _load_contexts(emails)
+    rate = _setting('EMAIL_OUTBOX_RATE_LIMIT', 0)
+    interval = 1 / rate if rate else 0
+    sent = failed = 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as exc:
+        logger.warning('Cannot open email connection: %s', exc)
+        now = timezone.now()
+        for email in emails:
+            _fail(email, exc, now)
+        OutboundEmail.objects.bulk_update(emails, RESULT_FIELDS)
+        return 0, len(emails)
+
+    try:
+        next_send = time.monotonic()
+        for email in emails:
+            now = timezone.now()
+            if email.pk not in contexts:
+                email.status = 'failed'
+                email.last_error = 'Referenced object no longer exists'
+                email.save(update_fields=RESULT_FIELDS)
+                failed += 1
+                continue
+            delay = next_send - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            next_send = time.monotonic() + interval
+            try:
+                connection.send_messages([render(email, contexts[email.pk])])
+            except Exception as exc:
+                logger.warning('Email %s failed: %s', email.pk, exc)
+                _fail(email, exc, now)
+                failed += 1
+            else:
+                email.status = 'sent'
+                email.sent_at = timezone.now()
+                email.attempts += 1
+                sent += 1
+            # Saved per email, so a crash later in the batch can't resend it
+            email.save(update_fields=RESULT_FIELDS)
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def send_pending(batch_size=None):
+    """Deliver one batch of due emails. Returns (claimed, sent, failed)."""
+    batch_size = batch_size or _setting('EMAIL_OUTBOX_BATCH_SIZE', 100)
+    started = time.monotonic()
+    now = timezone.now()
+    with transaction.atomic():
+        # A 'sending' row that is due again was left behind by a lost worker
+        emails = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status__in=['pending', 'sending'], send_after__lte=now)
+            .order_by('send_after')[:batch_size]
+        )
+        if not emails:
+            return 0, 0, 0
+        lease_until = now + timedelta(seconds=_setting('EMAIL_OUTBOX_LEASE_SECONDS', 300))
+        OutboundEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+            status='sending', send_after=lease_until
+        )
+    for email in emails:
+        email.status, email.send_after = 'sending', lease_until
+    sent, failed = deliver(emails)
+    logger.info(
+        'Email outbox: sent %d, failed %d in %.2fs', sent, failed, time.monotonic() - started
+    )
+    return len(emails), sent, failed
+
+
+def purge_finished(days=None):
+    """Delete sent and failed emails older than ``days``. Returns the count."""
+    days = _setting('EMAIL_OUTBOX_RETENTION_DAYS', 30) if days is None else days
+    finished = OutboundEmail.objects.filter(
+        status__in=['sent', 'failed'], created_at__lt=timezone.now() - timedelta(days=days)
+    )
+    deleted = 0
+    while True:
+        # In chunks, so no single delete locks a large part of the table
+        pks = list(finished.values_list('pk', flat=True)[:PURGE_CHUNK_SIZE])
+        if not pks:
+            return deleted
+        deleted += OutboundEmail.objects.filter(pk__in=pks).delete()[0]
+
+
+def delivery_stats():
+    """Counts per status plus the age of the oldest due email, in one query."""
+    now = timezone.now()
+    stats = OutboundEmail.objects.aggregate(
+        pending=Count('pk', filter=Q(status='pending')),
+        sending=Count('pk', filter=Q(status='sending')),
+        sent=Count('pk', filter=Q(status='sent')),
+        failed=Count('pk', filter=Q(status='failed')),
+        retrying=Count('pk', filter=Q(status='pending', attempts__gt=0)),
+        oldest_due=Min('created_at', filter=Q(status='pending', send_after__lte=now)),
+    )
+    oldest = stats.pop('oldest_due')
+    stats['oldest_pending_seconds'] = (now - oldest).total_seconds() if oldest else 0
+    return stats
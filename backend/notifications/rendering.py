@@ -0,0 +1,45 @@
+"""Rendering of the HTML and plain-text parts of notification emails.
+
+``render_to_string`` resolves the template through the engine and its
+loaders and builds a new context on every call, twice per email. Here the
+compiled templates are kept per process (outside ``DEBUG``, where edits
+should show up) and both parts are rendered from a single ``Context``.
+"""
+
+from functools import lru_cache
+
+from django.conf import settings
+from django.template import Context
+from django.template.loader import get_template
+from django.utils.html import strip_tags
+
+
+@lru_cache(maxsize=128)
+def _cached_template(name):
+    return get_template(name).template
+
+
+def compiled_template(name):
+    """The compiled ``django.template.Template`` for ``name``."""
+    if settings.DEBUG:
+        return get_template(name).template
+    return _cached_template(name)
+
+
+def render_parts(html_template, text_template, context, body=''):
+    """Return ``(text, html)`` for an email.
+
+    Without a text template the text part is the HTML with tags stripped;
+    without either template it is ``body``. ``html`` is ``None`` when there
+    is no HTML template.
+    """
+    if not html_template and not text_template:
+        return body, None
+    # Same autoescaping as render_to_string; both renders share the context
+    context = Context(context)
+    html = compiled_template(html_template).render(context) if html_template else None
+    if text_template:
+        text = compiled_template(text_template).render(context)
+    else:
+        text = strip_tags(html)
+    return text, html
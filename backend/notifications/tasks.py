@@ -0,0 +1,18 @@
+from celery import shared_task
+from django.conf import settings
+from .outbox import purge_finished, send_pending
+
+
+@shared_task(ignore_result=True)
+def send_outbound_emails():
+    """Deliver a batch of due outbox emails, re-queueing while more are due."""
+    claimed, sent, failed = send_pending()
+    if claimed and claimed >= getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 100):
+        send_outbound_emails.delay()
+    return sent
+
+
+@shared_task(ignore_result=True)
+def purge_outbound_emails():
+    """Delete sent and failed outbox emails past the retention period."""
+    return purge_finished()
@@ -0,0 +1,175 @@
+from contextlib import contextmanager
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from notifications import outbox
+from notifications.models import OutboundEmail
+from notifications.tasks import purge_outbound_emails, send_outbound_emails
+
+
+@pytest.fixture
+def kick(monkeypatch):
+    delay = mock.Mock()
+    monkeypatch.setattr(send_outbound_emails, 'delay', delay)
+    return delay
+
+
+def queue_reset(user):
+    return outbox.queue_email(
+        'Reset your password',
+        [user.email],
+        html_template='authentication/password_reset_email.html',
+        context={'user': user, 'reset_url': 'https://example.com/reset', 'site_name': 'HOY'},
+    )
+
+
+@pytest.mark.django_db
+class TestOutbox:
+    def test_queued_email_is_sent_by_worker(self, user, kick, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            email = queue_reset(user)
+        assert email.status == 'pending'
+        assert email.context['user'] == {'__model__': 'users.User', 'pk': str(user.pk)}
+        assert mail.outbox == []
+        kick.assert_called_once_with()
+
+        assert outbox.send_pending() == (1, 1, 0)
+        email.refresh_from_db()
+        assert email.status == 'sent' and email.sent_at is not None
+        message = mail.outbox[0]
+        assert message.to == [user.email]
+        assert 'https://example.com/reset' in message.body
+        assert message.alternatives[0][1] == 'text/html'
+
+    def test_batch_shares_one_connection(self, create_user, kick, monkeypatch):
+        users = [create_user(email=f'user{i}@example.com') for i in range(5)]
+        for user in users:
+            queue_reset(user)
+        opened = mock.Mock(wraps=outbox.get_connection)
+        monkeypatch.setattr(outbox, 'get_connection', opened)
+
+        assert outbox.send_pending() == (5, 5, 0)
+        assert opened.call_count == 1
+        assert len(mail.outbox) == 5
+
+    def test_html_only_and_plain_body_emails(self, kick):
+        outbox.queue_email('Hello', ['a@example.com'], body='Plain text')
+        outbox.send_pending()
+        assert mail.outbox[0].body == 'Plain text'
+        assert mail.outbox[0].alternatives == []
+
+    def test_failures_back_off_then_give_up(self, settings, user, kick, monkeypatch):
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        monkeypatch.setattr(EmailBackend, 'send_messages', mock.Mock(side_effect=OSError('refused')))
+        email = queue_reset(user)
+
+        assert outbox.send_pending() == (1, 0, 1)
+        email.refresh_from_db()
+        assert email.status == 'pending' and email.attempts == 1
+        assert email.send_after > timezone.now()
+        assert email.last_error == 'refused'
+        # Not due again until the backoff has passed
+        assert outbox.send_pending() == (0, 0, 0)
+
+        OutboundEmail.objects.filter(pk=email.pk).update(send_after=timezone.now() - timedelta(seconds=1))
+        outbox.send_pending()
+        email.refresh_from_db()
+        assert email.status == 'failed' and email.attempts == 2
+
+    def test_sends_outside_the_claiming_transaction(self, create_user, kick, monkeypatch):
+        for i in range(2):
+            queue_reset(create_user(email=f'user{i}@example.com'))
+        seen = []
+        in_claim = []
+
+        @contextmanager
+        def atomic():
+            # The test itself runs in a transaction, so track the outbox's own
+            in_claim.append(True)
+            with transaction.atomic():
+                yield
+            in_claim.pop()
+
+        def send_messages(backend, messages):
+            # Claimed rows are committed and earlier results already saved
+            seen.append((
+                bool(in_claim),
+                list(OutboundEmail.objects.order_by('pk').values_list('status', flat=True)),
+            ))
+            return len(messages)
+
+        monkeypatch.setattr(EmailBackend, 'send_messages', send_messages)
+        monkeypatch.setattr(outbox, 'transaction', SimpleNamespace(atomic=atomic))
+        assert outbox.send_pending() == (2, 2, 0)
+        assert seen == [(False, ['sending', 'sending']), (False, ['sent', 'sending'])]
+
+    def test_expired_lease_is_claimed_again(self, settings, user, kick):
+        email = queue_reset(user)
+        OutboundEmail.objects.filter(pk=email.pk).update(
+            status='sending', send_after=timezone.now() + timedelta(seconds=60)
+        )
+        # Another worker holds the lease
+        assert outbox.send_pending() == (0, 0, 0)
+
+        OutboundEmail.objects.filter(pk=email.pk).update(send_after=timezone.now() - timedelta(seconds=1))
+        assert outbox.send_pending() == (1, 1, 0)
+        email.refresh_from_db()
+        assert email.status == 'sent'
+
+    def test_deleted_reference_fails_without_sending(self, create_user, kick):
+        gone = create_user(email='gone@example.com')
+        email = queue_reset(gone)
+        gone.delete()
+
+        assert outbox.send_pending() == (1, 0, 1)
+        email.refresh_from_db()
+        assert email.status == 'failed'
+        assert mail.outbox == []
+
+    def test_sync_delivery(self, settings, user):
+        settings.EMAIL_DELIVERY = 'sync'
+        email = queue_reset(user)
+        assert email.status == 'sent'
+        assert len(mail.outbox) == 1
+
+    def test_delivery_stats(self, user, kick, capsys):
+        queue_reset(user)
+        queue_reset(user)
+        OutboundEmail.objects.filter(pk=queue_reset(user).pk).update(status='failed')
+
+        stats = outbox.delivery_stats()
+        assert stats['pending'] == 2 and stats['failed'] == 1 and stats['sent'] == 0
+
+        call_command('email_outbox', '--send')
+        assert 'Sent 2 emails, 0 failed' in capsys.readouterr().out
+        assert outbox.delivery_stats()['sent'] == 2
+
+    def test_purge_keeps_recent_and_unfinished_emails(self, settings, user, kick):
+        settings.EMAIL_OUTBOX_RETENTION_DAYS = 30
+        old = timezone.now() - timedelta(days=31)
+        emails = {status: queue_reset(user) for status in ('sent', 'failed', 'pending')}
+        for status, email in emails.items():
+            OutboundEmail.objects.filter(pk=email.pk).update(status=status, created_at=old)
+        recent = queue_reset(user)
+        OutboundEmail.objects.filter(pk=recent.pk).update(status='sent')
+
+        assert purge_outbound_emails() == 2
+        assert set(OutboundEmail.objects.values_list('pk', flat=True)) == {
+            emails['pending'].pk, recent.pk
+        }
+
+    def test_admin_hides_context_and_body(self, admin_client, user, kick):
+        email = queue_reset(user)
+        response = admin_client.get(
+            reverse('admin:notifications_outboundemail_change', args=[email.pk])
+        )
+        assert response.status_code == 200
+        assert 'https://example.com/reset' not in response.content.decode()
@@ -0,0 +1,23 @@
+import pytest
+from django.template.loader import render_to_string
+from notifications.rendering import render_parts
+
+
+@pytest.mark.django_db
+class TestRenderParts:
+    def test_matches_render_to_string(self, settings, user):
+        settings.DEBUG = False
+        context = {'user': user, 'verification_url': 'https://example.com/verify?token=<abc>'}
+        text, html = render_parts('emails/verify_email.html', 'emails/verify_email.txt', context)
+        assert html == render_to_string('emails/verify_email.html', context)
+        assert text == render_to_string('emails/verify_email.txt', context)
+        assert '&lt;abc&gt;' in html
+
+    def test_text_falls_back_to_stripped_html_then_body(self, user):
+        text, html = render_parts(
+            'authentication/password_reset_email.html', '',
+            {'user': user, 'reset_url': 'https://example.com/reset', 'site_name': 'HOY'}
+        )
+        assert '<html>' in html and '<html>' not in text
+        assert 'https://example.com/reset' in text
+        assert render_parts('', '', {}, body='Plain') == ('Plain', None)
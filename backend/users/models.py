@@ -40,6 +40,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_staff = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
     date_joined = models.DateTimeField(default=timezone.now)
+    # Bumped on every save, so profile ETags notice name and email changes
+    updated_at = models.DateTimeField(auto_now=True)
     
     # Social Auth fields
     google_id = models.CharField(max_length=255, blank=True, null=True)
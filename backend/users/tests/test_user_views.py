@@ -52,3 +52,20 @@ class UserViewTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['bio'], data['bio'])
         self.assertEqual(response.data['location'], data['location'])
+
+    def test_profile_etag_changes_with_user(self):
+        # Staff see every profile, without the friends lookup
+        self.user.is_staff = True
+        self.user.save()
+        url = reverse('profile-detail', kwargs={'pk': str(self.user.profile.id)})
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code,
+            status.HTTP_304_NOT_MODIFIED
+        )
+
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user']['first_name'], 'Renamed')
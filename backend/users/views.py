@@ -4,7 +4,6 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
@@ -16,9 +15,10 @@ import requests
 from datetime import datetime, timedelta
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
-from django.db.models import Q
+from django.db.models import Count, Max, Q
 from django.contrib.auth.models import User
 import logging
+from notifications.outbox import queue_email
 from .models import Profile, UserSettings
 from .serializers import (
     UserSerializer, UserRegistrationSerializer, SocialAuthSerializer,
@@ -36,6 +36,7 @@ logger = logging.getLogger(__name__)
 
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
+from hoy.mixins import ConditionalGetMixin
 
 User = get_user_model()
 
@@ -286,12 +287,10 @@ class PasswordResetRequestView(generics.GenericAPIView):
         uid = urlsafe_base64_encode(force_bytes(user.pk))
         reset_link = f"{settings.FRONTEND_URL}/reset-password/{uid}/{token}"
         
-        send_mail(
+        queue_email(
             'Reset your password',
-            f'Click this link to reset your password: {reset_link}',
-            settings.DEFAULT_FROM_EMAIL,
             [email],
-            fail_silently=False,
+            body=f'Click this link to reset your password: {reset_link}'
         )
         
         return Response({
@@ -329,11 +328,21 @@ class PasswordResetConfirmView(generics.GenericAPIView):
                 'error': 'Invalid uid'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-class ProfileViewSet(viewsets.ModelViewSet):
+class ProfileViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for Profile model."""
     serializer_class = ProfileSerializer
     permission_classes = [IsAuthenticated]
     http_method_names = ['get', 'put', 'patch', 'post', 'delete']
+    # Privacy filtering in ProfileSerializer depends on who is asking
+    conditional_vary_on_user = True
+
+    def get_conditional_validators(self, queryset):
+        # Profiles embed their user's name and email
+        return queryset.aggregate(
+            last_modified=Max('updated_at'),
+            user_last_modified=Max('user__updated_at'),
+            count=Count('pk'),
+        )
 
     def get_queryset(self):
         """Filter queryset to return only profiles that are visible to the user."""